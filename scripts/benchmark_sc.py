@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+
+from siliconcompiler import Chip
+from siliconcompiler.schema import Schema
+from siliconcompiler.schema.schema_cfg import schema_cfg
+import argparse
+import copy
+import heapq
+import os
+import pickle
+import random
+import re
+import tempfile
+import time
+
+
+def report(name, count, duration):
+    rate = count / duration if duration > 0 else float('inf')
+    print(f'  {name:<36} {count:>8} ops {duration:>10.4f} s {rate:>14.1f} ops/s')
+
+
+def measure(name, func, count, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    report(name, count * repeat, time.perf_counter() - start)
+
+
+def run_schema_getset(repeat):
+    chip = Chip('')
+    chip.load_target('asic_demo')
+    schema = chip.schema
+
+    keypaths = []
+    for keypath in chip.allkeys():
+        if 'default' in keypath or keypath[0] in ('history', 'library'):
+            continue
+        keypaths.append(keypath)
+
+    metric = ('metric', 'holdwns')
+    tool = ('tool', 'openroad', 'task', 'route', 'threads')
+
+    def get_all(indexed):
+        def func():
+            for keypath in keypaths:
+                if not indexed:
+                    schema._reset_keypath_index()
+                schema.get(*keypath, field='type')
+        return func
+
+    def set_keypath(keypath, value, indexed):
+        def func():
+            for _ in range(1000):
+                if not indexed:
+                    schema._reset_keypath_index()
+                schema.set(*keypath, value, step='route', index='0')
+        return func
+
+    # Unindexed results emulate a full dictionary descent on every access
+    for indexed in (False, True):
+        mode = 'indexed' if indexed else 'unindexed'
+        measure(f'get [{mode}]', get_all(indexed), len(keypaths), repeat)
+        measure(f'set metric [{mode}]', set_keypath(metric, 1.0, indexed), 1000, repeat)
+        measure(f'set tool [{mode}]', set_keypath(tool, 4, indexed), 1000, repeat)
+
+
+def run_schema_copy(repeat):
+    chip = Chip('')
+    chip.load_target('asic_demo')
+    schema = chip.schema
+
+    def deep_copy():
+        copy.deepcopy(schema.cfg)
+
+    def cow_copy():
+        new_schema = schema.copy()
+        new_schema.set('option', 'jobname', 'copy')
+        new_schema.set('metric', 'holdwns', 1.0, step='route', index='0')
+
+    measure('copy [deepcopy]', deep_copy, 1, repeat)
+    measure('copy [copy-on-write, 2 sets]', cow_copy, 1, repeat)
+
+    # Target data may require downloads, so resolve paths on a plain chip
+    abspath_chip = Chip('test')
+    abspath_chip.input(__file__, fileset='rtl', filetype='verilog')
+    measure('_abspath', abspath_chip._abspath, 1, repeat)
+
+    nodes = 50
+    chip_state = pickle.dumps(chip)
+
+    def pickle_per_node():
+        for _ in range(nodes):
+            pickle.dumps(chip)
+
+    def pickle_once():
+        state = pickle.dumps(chip)
+        for _ in range(nodes):
+            pickle.dumps(state)
+
+    print(f'  pickled chip size: {len(chip_state)} bytes')
+    measure(f'handoff {nodes} nodes [per node]', pickle_per_node, nodes, repeat)
+    measure(f'handoff {nodes} nodes [shared state]', pickle_once, nodes, repeat)
+
+
+def run_schema_init(repeat):
+    Chip('')
+
+    measure('schema_cfg()', schema_cfg, 1, repeat * 10)
+    measure('Schema()', Schema, 1, repeat * 10)
+    measure('Chip()', lambda: Chip(''), 1, repeat * 10)
+
+
+def _completed_run_chip():
+    chip = Chip('')
+    chip.load_target('asic_demo')
+    flow = chip.get('option', 'flow')
+
+    # Emulate a completed run by recording metrics on every node
+    for step, index in chip.nodes_to_execute(flow):
+        for metric in chip.getkeys('metric'):
+            if chip.get('metric', metric, field='type') in ('int', 'float'):
+                chip.set('metric', metric, 1, step=step, index=index)
+
+    return chip
+
+
+def run_manifest_merge(repeat):
+    chip = _completed_run_chip()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest = os.path.join(tmpdir, 'asic_demo.pkg.json')
+        chip.write_manifest(manifest)
+
+        src = Schema(manifest=manifest)
+        # A version mismatch forces the normalizing set()/add() replay
+        untrusted = src.copy()
+        untrusted.set('schemaversion', '0.0.0')
+
+        def merge(src):
+            def func():
+                Schema()._merge_schema(src)
+            return func
+
+        measure('merge [set() replay]', merge(untrusted), 1, repeat)
+        measure('merge [trusted]', merge(src), 1, repeat)
+        measure('read_manifest', lambda: chip._read_manifest(manifest), 1, repeat)
+
+
+def run_manifest_format(repeat):
+    chip = _completed_run_chip()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for ext in ('json', 'json.gz', 'msgpack', 'msgpack.gz'):
+            manifest = os.path.join(tmpdir, f'asic_demo.pkg.{ext}')
+
+            measure(f'write [{ext}]', lambda: chip.write_manifest(manifest), 1, repeat)
+            print(f'  size [{ext}]: {os.path.getsize(manifest)} bytes')
+            measure(f'read [{ext}]', lambda: Schema(manifest=manifest), 1, repeat)
+
+
+def run_scheduler(repeat):
+    from siliconcompiler.tools.builtin import nop
+
+    def run_flow(workerpool, width=8, depth=4):
+        chip = Chip('')
+        flow = 'bench'
+        chip.set('option', 'flow', flow)
+        chip.set('option', 'mode', 'asic')
+        chip.set('option', 'quiet', True)
+        chip.set('option', 'scheduler', 'workerpool', workerpool)
+        chip.node(flow, 'import', nop)
+        prev = 'import'
+        for n in range(depth):
+            step = f'step{n}'
+            for index in range(width):
+                chip.node(flow, step, nop, index=index)
+                if prev == 'import':
+                    chip.edge(flow, prev, step, head_index=index)
+                else:
+                    chip.edge(flow, prev, step, tail_index=index, head_index=index)
+            prev = step
+        chip.run()
+        return 1 + width * depth
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cwd = os.getcwd()
+        os.chdir(tmpdir)
+        try:
+            for workerpool in (False, True):
+                mode = 'worker pool' if workerpool else 'process per node'
+                nodes = run_flow(workerpool)
+                measure(f'run [{mode}]', lambda: run_flow(workerpool), nodes, repeat)
+        finally:
+            os.chdir(cwd)
+
+
+def _simulate_schedule(nodes_to_run, tasktimes, slots, priorities=None):
+    '''
+    Simulates running nodes_to_run on slots parallel slots and returns the
+    makespan. Without priorities, ready nodes start in the order they became
+    ready.
+    '''
+    waiting = {node: set(deps) for node, deps in nodes_to_run.items()}
+    dependents = {}
+    for node, deps in nodes_to_run.items():
+        for in_node in deps:
+            dependents.setdefault(in_node, []).append(node)
+
+    ready = [node for node, deps in waiting.items() if not deps]
+    running = []
+    now = 0.0
+    while ready or running:
+        if priorities:
+            ready.sort(key=lambda node: priorities[node], reverse=True)
+        while ready and len(running) < slots:
+            node = ready.pop(0)
+            heapq.heappush(running, (now + tasktimes[node], node))
+
+        now, node = heapq.heappop(running)
+        for next_node in dependents.get(node, []):
+            waiting[next_node].discard(node)
+            if not waiting[next_node]:
+                ready.append(next_node)
+
+    return now
+
+
+def run_scheduler_simulation(repeat):
+    from siliconcompiler.scheduler import _get_node_priorities
+
+    rng = random.Random(0)
+
+    # Parallel branches of different lengths, similar to the syn_np/place_np
+    # fan-outs, joined at the end
+    nodes_to_run = {('import', '0'): []}
+    branch_ends = []
+    for index in range(16):
+        prev = ('import', '0')
+        for n in range(rng.randint(1, 6)):
+            node = (f'step{n}', str(index))
+            nodes_to_run[node] = [prev]
+            prev = node
+        branch_ends.append(prev)
+    nodes_to_run[('join', '0')] = branch_ends
+    tasktimes = {node: rng.uniform(10, 100) for node in nodes_to_run}
+
+    print(f'  nodes: {len(nodes_to_run)}')
+    measure('priorities [node count]',
+            lambda: _get_node_priorities(nodes_to_run), 1, repeat)
+    measure('priorities [tasktime]',
+            lambda: _get_node_priorities(nodes_to_run, tasktimes), 1, repeat)
+
+    for slots in (2, 4, 8):
+        orders = {
+            'prepared order': None,
+            'critical path [node count]': _get_node_priorities(nodes_to_run),
+            'critical path [tasktime]': _get_node_priorities(nodes_to_run, tasktimes)
+        }
+        for name, priorities in orders.items():
+            makespan = _simulate_schedule(nodes_to_run, tasktimes, slots, priorities)
+            print(f'  {name + f" [{slots} slots]":<36} makespan {makespan:>10.1f} s')
+
+
+def run_archive(repeat):
+    from siliconcompiler import archive
+    import gzip
+    import tarfile
+
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Text outputs, similar to netlists and DEF files
+        words = [f'net_{n}' for n in range(1000)]
+        for n in range(4):
+            with open(os.path.join(tmpdir, f'design{n}.def'), 'w') as f:
+                for _ in range(50000):
+                    f.write(' '.join(rng.choices(words, k=8)) + '\n')
+        # Compressed outputs, similar to gzipped GDS files
+        with gzip.open(os.path.join(tmpdir, 'design.gds.gz'), 'wb') as f:
+            f.write(rng.randbytes(16 * 1024 * 1024))
+
+        files = sorted(os.listdir(tmpdir))
+        size = sum([os.path.getsize(os.path.join(tmpdir, name)) for name in files])
+        print(f'  input size: {size} bytes')
+
+        archive_name = os.path.join(tmpdir, 'archive.tgz')
+
+        def write(open_func):
+            with open_func() as tar:
+                for name in files:
+                    tar.add(os.path.join(tmpdir, name), arcname=name)
+
+        modes = {
+            'tarfile': lambda: tarfile.open(archive_name, 'w:gz'),
+            'parallel': lambda: archive.open_archive(archive_name, skip_compressed=False),
+            'parallel [skip compressed]': lambda: archive.open_archive(archive_name)
+        }
+        for mode, open_func in modes.items():
+            measure(f'archive [{mode}]', lambda: write(open_func), 1, repeat)
+            print(f'  size [{mode}]: {os.path.getsize(archive_name)} bytes')
+
+
+def _legacy_grep(args, line):
+    '''
+    Chip.grep() before the log scanner, which parses and compiles the
+    pattern on every call.
+    '''
+    match = re.match(r'\s*((?:\-\w\s)*)(.*)', args)
+    pattern = match.group(2)
+    invert = '-v' in match.group(1).strip().split(' ')
+    if bool(re.search(rf"({pattern})", line)) == invert:
+        return None
+    return line
+
+
+def run_check_logfile(repeat, size=1024):
+    from siliconcompiler import logscan
+
+    rng = random.Random(0)
+
+    regexes = {
+        'errors': ['^\\[ERROR', '-v XYZ-0000'],
+        'warnings': ['^\\[WARNING', '-v DPL'],
+        'timing': ['-i slack', '-o [0-9.]+']
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logfile = os.path.join(tmpdir, 'place.log')
+
+        # Synthetic log similar to the output of OpenROAD, with a few
+        # warnings and errors among informational messages
+        lines = []
+        for n in range(20000):
+            kind = rng.random()
+            if kind < 0.001:
+                lines.append(f'[ERROR GRT-{n % 100:04d}] Routing congestion too high.')
+            elif kind < 0.01:
+                lines.append(f'[WARNING DRT-{n % 100:04d}] No via found for net_{n}.')
+            elif kind < 0.02:
+                lines.append(f'Worst slack {rng.uniform(-1, 1):.3f}')
+            else:
+                lines.append(f'[INFO DPL-{n % 100:04d}] Placed instance inst_{n} '
+                             f'at ({rng.randint(0, 9999)}, {rng.randint(0, 9999)}).')
+        block = ('\n'.join(lines) + '\n').encode()
+        with open(logfile, 'wb') as f:
+            for _ in range(max(1, size * 1024 * 1024 // len(block))):
+                f.write(block)
+        print(f'  log size: {os.path.getsize(logfile)} bytes')
+
+        def legacy():
+            with open(logfile) as f:
+                sum(1 for _ in f)
+                for suffix, chain in regexes.items():
+                    f.seek(0)
+                    for line in f:
+                        string = line
+                        for item in chain:
+                            if string is None:
+                                break
+                            string = _legacy_grep(item, string)
+
+        def scanner():
+            with open(logfile) as f:
+                logscan.LogScanner(regexes).scan(f)
+
+        measure('check_logfile [pass per regex]', legacy, 1, repeat)
+        measure('check_logfile [single pass]', scanner, 1, repeat)
+
+
+def _generated_flow_chip(nodes, diamonds=False):
+    '''
+    Returns a chip with a flow of about the given number of nodes. The flow
+    is a chain of fan-outs of 8 nodes joined by the next step, or a chain of
+    diamonds, with a number of paths exponential in its length.
+    '''
+    from siliconcompiler.tools.builtin import nop
+
+    chip = Chip('')
+    flow = 'bench'
+    chip.set('option', 'flow', flow)
+    chip.node(flow, 'step0', nop)
+    width = 2 if diamonds else 8
+    for n in range(1, max(2, nodes // (width + 1) + 1)):
+        for index in range(width):
+            chip.node(flow, f'fanout{n}', nop, index=index)
+            chip.edge(flow, f'step{n - 1}', f'fanout{n}', head_index=index)
+        chip.node(flow, f'step{n}', nop)
+        for index in range(width):
+            chip.edge(flow, f'fanout{n}', f'step{n}', tail_index=index)
+    return chip
+
+
+def run_flowgraph(repeat):
+    from siliconcompiler import flowgraph
+
+    for nodes in (100, 500, 1000):
+        for diamonds in (False, True):
+            chip = _generated_flow_chip(nodes, diamonds=diamonds)
+            flow = chip.get('option', 'flow')
+            shape = 'diamonds' if diamonds else 'fan-outs'
+            all_nodes = flowgraph._get_flowgraph_nodes(chip, flow)
+            middle = [all_nodes[len(all_nodes) // 2]]
+
+            def cold(func):
+                def wrapper():
+                    # Drops the flowgraph index, as modifying the flow does
+                    chip.schema._reset_keypath_index('flowgraph')
+                    func()
+                return wrapper
+
+            def pruned_inputs():
+                for node in all_nodes:
+                    flowgraph._get_pruned_node_inputs(chip, flow, node)
+
+            funcs = {
+                'nodes_to_execute': lambda: chip.nodes_to_execute(flow),
+                'get_nodes_from': lambda: flowgraph.get_nodes_from(chip, flow, middle),
+                'pruned inputs': pruned_inputs
+            }
+            for name, func in funcs.items():
+                measure(f'{name} [{len(all_nodes)} {shape}, cold]', cold(func), 1, repeat)
+                measure(f'{name} [{len(all_nodes)} {shape}]', func, 1, repeat)
+
+
+if __name__ == "__main__":
+    benchmarks = {
+        'schema_getset': run_schema_getset,
+        'schema_copy': run_schema_copy,
+        'schema_init': run_schema_init,
+        'manifest_merge': run_manifest_merge,
+        'manifest_format': run_manifest_format,
+        'scheduler': run_scheduler,
+        'scheduler_simulation': run_scheduler_simulation,
+        'archive': run_archive,
+        'check_logfile': run_check_logfile,
+        'flowgraph': run_flowgraph,
+        'all': None
+    }
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--benchmark', choices=benchmarks.keys(), default='all')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--log-size', type=int, default=1024,
+                        help='size in MB of the log used by check_logfile')
+
+    args = parser.parse_args()
+
+    benchmarks['check_logfile'] = lambda repeat: run_check_logfile(repeat, size=args.log_size)
+
+    benchmark_set = args.benchmark
+    if benchmark_set == 'all':
+        benchmark_set = [b for b in benchmarks.keys() if b != 'all']
+    else:
+        benchmark_set = [benchmark_set]
+
+    for benchmark in benchmark_set:
+        print(f'Running {benchmark}')
+        benchmarks[benchmark](args.repeat)
@@ -0,0 +1,172 @@
+# Copyright 2024 Silicon Compiler Authors. All Rights Reserved.
+
+import collections
+import gzip
+import io
+import os
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Amount of uncompressed data in each independently compressed gzip member.
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Files which are already compressed, so compressing them again only costs time.
+COMPRESSED_SUFFIXES = ('.gz', '.tgz', '.bz2', '.xz', '.zst', '.zip', '.png', '.jpg', '.jpeg')
+
+
+def is_compressed(path):
+    '''
+    Returns True if the file at path is already compressed, based on its name.
+
+    Args:
+        path (str): Path to the file.
+    '''
+    return path.lower().endswith(COMPRESSED_SUFFIXES)
+
+
+class ParallelGzipWriter(io.RawIOBase):
+    '''
+    Write-only file object which compresses data into a gzip file using
+    multiple threads.
+
+    Data is split into chunks which are compressed concurrently and written
+    in order, each as a separate gzip member. A gzip file made of several
+    members is read back by any gzip reader as a single stream.
+
+    Args:
+        path (str): Path of the gzip file to write.
+        compresslevel (int): Compression level, from 1 to 9.
+        executor (concurrent.futures.Executor): Executor to compress chunks
+            with. If not provided, a thread pool owned by the writer is used.
+        chunk_size (int): Amount of data in each compressed chunk.
+    '''
+
+    def __init__(self, path, compresslevel=9, executor=None, chunk_size=CHUNK_SIZE):
+        super().__init__()
+
+        self.name = path
+        self.compress = True
+
+        self.__file = open(path, 'wb')
+        self.__compresslevel = compresslevel
+        self.__chunk_size = chunk_size
+        self.__buffer = bytearray()
+        self.__offset = 0
+
+        self.__own_executor = executor is None
+        if self.__own_executor:
+            executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        self.__executor = executor
+        # Limit the number of chunks held in memory
+        self.__max_pending = 2 * (getattr(executor, '_max_workers', None) or os.cpu_count())
+        self.__pending = collections.deque()
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self.__offset
+
+    def write(self, data):
+        self.__buffer.extend(data)
+        self.__offset += len(data)
+        while len(self.__buffer) >= self.__chunk_size:
+            chunk = bytes(self.__buffer[:self.__chunk_size])
+            del self.__buffer[:self.__chunk_size]
+            self.__submit(chunk)
+        return len(data)
+
+    def set_compress(self, compress):
+        '''
+        Selects whether the data written next is compressed, or only stored.
+
+        Args:
+            compress (bool): If False, the data is stored without compression.
+        '''
+        if compress == self.compress:
+            return
+        # Chunks are compressed with a single setting
+        self.__flush_buffer()
+        self.compress = compress
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self.__flush_buffer()
+            while self.__pending:
+                self.__file.write(self.__pending.popleft().result())
+        finally:
+            if self.__own_executor:
+                self.__executor.shutdown()
+            self.__file.close()
+            super().close()
+
+    def __flush_buffer(self):
+        if self.__buffer:
+            self.__submit(bytes(self.__buffer))
+            self.__buffer = bytearray()
+
+    def __submit(self, chunk):
+        level = self.__compresslevel if self.compress else 0
+        self.__pending.append(self.__executor.submit(gzip.compress, chunk,
+                                                     compresslevel=level, mtime=0))
+        while len(self.__pending) > self.__max_pending or \
+                (self.__pending and self.__pending[0].done()):
+            self.__file.write(self.__pending.popleft().result())
+
+
+class _ArchiveFile(tarfile.TarFile):
+    '''
+    Tar file written through a :class:`ParallelGzipWriter`.
+    '''
+
+    skip_compressed = True
+
+    def addfile(self, tarinfo, fileobj=None):
+        if self.skip_compressed:
+            self.fileobj.set_compress(not (tarinfo.isfile() and is_compressed(tarinfo.name)))
+        super().addfile(tarinfo, fileobj)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.fileobj.close()
+
+    def __exit__(self, type, value, traceback):
+        try:
+            super().__exit__(type, value, traceback)
+        finally:
+            # Also release the writer if the archive was abandoned
+            self.fileobj.close()
+
+
+def open_archive(path, compresslevel=9, skip_compressed=True, executor=None):
+    '''
+    Opens a gzip compressed tar archive for writing, which is compressed
+    using multiple threads. The archive can be read as any .tar.gz file.
+
+    Args:
+        path (str): Path of the archive to write.
+        compresslevel (int): Compression level, from 1 to 9.
+        skip_compressed (bool): If True, files which are already compressed
+            are stored without compressing them again.
+        executor (concurrent.futures.Executor): Executor to compress with.
+            If not provided, the archive uses its own thread pool.
+
+    Returns:
+        tarfile.TarFile opened for writing.
+
+    Examples:
+        >>> with open_archive('results.tgz') as tar:
+        ...     tar.add('build')
+    '''
+    writer = ParallelGzipWriter(path, compresslevel=compresslevel, executor=executor)
+    try:
+        tar = _ArchiveFile(path, mode='w', fileobj=writer)
+    except Exception:
+        writer.close()
+        raise
+    tar.skip_compressed = skip_compressed
+    return tar
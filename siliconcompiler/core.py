@@ -1,6 +1,5 @@
 # Copyright 2020 Silicon Compiler Authors. All Rights Reserved.
 
-import tarfile
 import os
 import pathlib
 import sys
@@ -27,6 +26,9 @@ from siliconcompiler.report import _generate_summary_image, _open_summary_image
 from siliconcompiler.report import _generate_html_report, _open_html_report
 from siliconcompiler.report import Dashboard
 from siliconcompiler import package as sc_package
+from siliconcompiler import archive as sc_archive
+from siliconcompiler import filehash as sc_filehash
+from siliconcompiler import logscan as sc_logscan
 from siliconcompiler import sc_open
 import glob
 from siliconcompiler.scheduler import run as sc_runner
@@ -85,6 +87,13 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
 
         # Cache of file hashes
         self.__hashes = {}
+        self.__file_hash_cache = None
+
+        # Schemas that the node manifest is written against, at the start of
+        # the node and when its inputs manifest is written,
+        # see ['option', 'deltamanifest']
+        self._manifest_start = None
+        self._manifest_base = None
 
         # Controls whether find_files returns an abspath or relative to this
         # this is primarily used when generating standalone testcases
@@ -556,7 +565,7 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
 
             elif isinstance(use_module, (Library, Chip)):
                 self._loaded_modules['libs'].append(use_module.design)
-                self._import_library(use_module.design, use_module.schema.cfg)
+                self._import_library(use_module.design, use_module.schema.getdict())
 
             else:
                 module_name = module.__name__
@@ -601,7 +610,7 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
 
         importname = module.design
 
-        src_cfg = self.schema.cfg[group]
+        src_cfg = self.schema._search(group, writable=True)
 
         if importname in src_cfg:
             self.logger.warning(f'Overwriting existing {group} {importname}')
@@ -609,7 +618,8 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
 
         # Copy
         src_cfg[importname] = module.getdict(group, importname)
-        self.__import_data_sources(module.schema.cfg)
+        self.schema._reset_keypath_index(group, importname)
+        self.__import_data_sources(module.schema._search())
 
     ###########################################################################
     def help(self, *keypath):
@@ -1388,50 +1398,16 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         else:
             dest = self.schema
 
-        for keylist in src.allkeys():
-            if keylist[0] in ('history', 'library'):
-                continue
-            if partial and not self._key_may_be_updated(keylist):
-                continue
-            # only read in valid keypaths without 'default'
-            key_valid = True
-            if check:
-                key_valid = dest.valid(*keylist, default_valid=True)
-                if not key_valid:
-                    self.logger.warning(f'Keypath {keylist} is not valid')
-            if key_valid and 'default' not in keylist:
-                typestr = src.get(*keylist, field='type')
-                should_append = re.match(r'\[', typestr) and not clear
-                key_cfg = src._search(*keylist)
-                for val, step, index in src._getvals(*keylist, return_defvalue=False):
-                    # update value, handling scalars vs. lists
-                    if should_append:
-                        dest.add(*keylist, val, step=step, index=index)
-                    else:
-                        dest.set(*keylist, val, step=step, index=index, clobber=clobber)
-
-                    # update other pernode fields
-                    # TODO: only update these if clobber is successful
-                    step_key = Schema.GLOBAL_KEY if not step else step
-                    idx_key = Schema.GLOBAL_KEY if not index else index
-                    for field in key_cfg['node'][step_key][idx_key].keys():
-                        if field == 'value':
-                            continue
-                        v = src.get(*keylist, step=step, index=index, field=field)
-                        if should_append:
-                            dest.add(*keylist, v, step=step, index=index, field=field)
-                        else:
-                            dest.set(*keylist, v, step=step, index=index, field=field)
-
-                # update other fields that a user might modify
-                for field in key_cfg.keys():
-                    if field in ('node', 'switch', 'type', 'require',
-                                 'shorthelp', 'example', 'help'):
-                        # skip these fields (node handled above, others are static)
-                        continue
-                    # TODO: should we be taking into consideration clobber for these fields?
-                    v = src.get(*keylist, field=field)
-                    dest.set(*keylist, v, field=field)
+        keypath_filter = None
+        if partial:
+            keypath_filter = self._key_may_be_updated
+
+        invalid_keys = dest._merge_schema(src, clear=clear, clobber=clobber, check=check,
+                                          keypath_filter=keypath_filter,
+                                          skip_fields=('node', 'switch', 'type', 'require',
+                                                       'shorthelp', 'example', 'help'))
+        for keylist in invalid_keys:
+            self.logger.warning(f'Keypath {keylist} is not valid')
 
     ###########################################################################
     def check_filepaths(self):
@@ -1827,7 +1803,7 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         Reads a manifest from disk and merges it with the current compilation manifest.
 
         The file format read is determined by the filename suffix. Currently
-        json (*.json) and yaml(*.yaml) formats are supported.
+        json (*.json), yaml(*.yaml) and msgpack (*.msgpack) formats are supported.
 
         Args:
             filename (filepath): Path to a manifest file to be loaded.
@@ -1850,14 +1826,19 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         that may have been updated during run().
         """
         # Read from file into new schema object
-        schema = Schema(manifest=filename, logger=self.logger)
+        if partial:
+            # Only keypaths which may be updated are merged, so delta
+            # manifests do not need to be reconstructed
+            schema = Schema._read_delta_manifest(filename, logger=self.logger)
+        else:
+            schema = Schema(manifest=filename, logger=self.logger)
 
         # Merge data in schema with Chip configuration
         self._merge_manifest(schema, job=job, clear=clear, clobber=clobber, partial=partial)
 
         # Read history, if we're not already reading into a job
-        if 'history' in schema.cfg and not partial and not job:
-            for historic_job in schema.cfg['history'].keys():
+        if 'history' in schema.getkeys() and not partial and not job:
+            for historic_job in schema.getkeys('history'):
                 self._merge_manifest(schema.history(historic_job),
                                      job=historic_job,
                                      clear=clear,
@@ -1865,9 +1846,9 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                                      partial=False)
 
         # TODO: better way to handle this?
-        if 'library' in schema.cfg and not partial:
-            for libname in schema.cfg['library'].keys():
-                self._import_library(libname, schema.cfg['library'][libname],
+        if 'library' in schema.getkeys() and not partial:
+            for libname in schema.getkeys('library'):
+                self._import_library(libname, schema.getdict('library', libname),
                                      job=job,
                                      clobber=clobber)
 
@@ -1877,8 +1858,9 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         Writes the compilation manifest to a file.
 
         The write file format is determined by the filename suffix. Currently
-        json (*.json), yaml (*.yaml), tcl (*.tcl), and (*.csv) formats are
-        supported.
+        json (*.json), yaml (*.yaml), msgpack (*.msgpack), tcl (*.tcl), and
+        (*.csv) formats are supported. The msgpack format is a compact binary
+        alternative to json, which is faster to write and read.
 
         Args:
             filename (filepath): Output filepath
@@ -1901,17 +1883,26 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         # resolve absolute paths
         if abspath:
             schema = self._abspath()
-        else:
+        elif prune:
             schema = self.schema.copy()
+        else:
+            # Writing does not modify the schema
+            schema = self.schema
 
         if prune:
             self.logger.debug('Pruning dictionary before writing file %s', filepath)
             schema.prune()
 
         is_csv = re.search(r'(\.csv)(\.gz)*$', filepath)
+        is_msgpack = re.search(r'(\.msgpack)(\.gz)*$', filepath)
 
         # format specific dumping
-        if filepath.endswith('.gz'):
+        if is_msgpack:
+            if filepath.endswith('.gz'):
+                fout = gzip.open(filepath, 'wb')
+            else:
+                fout = open(filepath, 'wb')
+        elif filepath.endswith('.gz'):
             fout = gzip.open(filepath, 'wt', encoding='UTF-8')
         elif is_csv:
             # Files written using csv library should be opened with newline=''
@@ -1926,6 +1917,8 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                 schema.write_json(fout)
             elif re.search(r'(\.yaml|\.yml)(\.gz)*$', filepath):
                 schema.write_yaml(fout)
+            elif is_msgpack:
+                schema.write_msgpack(fout)
             elif re.search(r'(\.tcl)(\.gz)*$', filepath):
                 # TCL only gets values associated with the current node.
                 step = self.get('arg', 'step')
@@ -2061,10 +2054,11 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
     def _import_library(self, libname, libcfg, job=None, clobber=True):
         '''Helper to import library with config 'libconfig' as a library
         'libname' in current Chip object.'''
+        cfg = self.schema._search('library', job=job, writable=True)
         if job:
-            cfg = self.schema.cfg['history'][job]['library']
+            index_prefix = ('history', job, 'library', libname)
         else:
-            cfg = self.schema.cfg['library']
+            index_prefix = ('library', libname)
 
         if 'library' in libcfg:
             for sublib_name, sublibcfg in libcfg['library'].items():
@@ -2077,6 +2071,7 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                 return
 
         cfg[libname] = libcfg
+        self.schema._reset_keypath_index(*index_prefix)
         self.__import_data_sources(libcfg)
 
         if 'pdk' in cfg:
@@ -2274,6 +2269,12 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             if os.path.isfile(logfile):
                 tar.add(logfile, arcname=arcname(logfile))
 
+            # Delta output manifests are reconstructed from the inputs manifest
+            if self.get('option', 'deltamanifest'):
+                manifest = os.path.join(basedir, 'inputs', f'{self.get("design")}.pkg.json')
+                if os.path.isfile(manifest):
+                    tar.add(manifest, arcname=arcname(manifest))
+
     ###########################################################################
     def __archive_job(self, tar, job, flowgraph_nodes, index=None, include=None):
         design = self.get('design')
@@ -2335,7 +2336,7 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
 
         self.logger.info(f'Creating archive {archive_name}...')
 
-        with tarfile.open(archive_name, "w:gz") as tar:
+        with sc_archive.open_archive(archive_name) as tar:
             for job in jobs:
                 if len(jobs) > 0:
                     self.logger.info(f'Archiving job {job}...')
@@ -2396,40 +2397,26 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
             self.logger.error(f"Unable to use {algo} as the hashing algorithm for [{keypathstr}].")
             return []
 
-        def hash_file(filename, hashobj=None):
-            if not hashobj:
-                hashobj = hashfunc()
-            with open(filename, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    hashobj.update(byte_block)
-            return hashobj.hexdigest()
-
         # cycle through all paths
         hashlist = []
         if filelist and verbose:
             self.logger.info(f'Computing hash value for [{keypathstr}]')
+
+        to_hash = [filename for filename in filelist
+                   if not (allow_cache and filename in self.__hashes)]
+        hashes = dict(zip(to_hash, sc_filehash.hash_paths(to_hash, algo=algo,
+                                                          cache=self._get_file_hash_cache())))
+
         for filename in filelist:
             if allow_cache and filename in self.__hashes:
                 hashlist.append(self.__hashes[filename])
                 continue
 
-            if os.path.isfile(filename):
-                hashlist.append(hash_file(filename))
-            elif os.path.isdir(filename):
-                all_files = []
-                for root, dirs, files in os.walk(filename):
-                    all_files.extend([os.path.join(root, f) for f in files])
-                dirhash = None
-                hashobj = hashfunc()
-                for file in sorted(all_files):
-                    posix_path = self.__convert_paths_to_posix([os.path.relpath(file, filename)])
-                    hashobj.update(posix_path[0].encode("utf-8"))
-                    dirhash = hash_file(file, hashobj=hashobj)
-                hashlist.append(dirhash)
-            else:
+            if not os.path.exists(filename):
                 self.logger.error("Internal hashing error, file not found")
                 continue
 
+            hashlist.append(hashes[filename])
             self.__hashes[filename] = hashlist[-1]
 
         if check:
@@ -2441,6 +2428,7 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
                     self.logger.error(f"Hash mismatch for [{keypath}]")
                     check_failed = True
             if check_failed:
+                self._report_hash_changes(keypath, oldhash, hashlist, log=self.logger.error)
                 self.error("Hash mismatches detected")
 
         if update:
@@ -2467,6 +2455,45 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
 
         return hashlist
 
+    def _get_file_hash_cache(self):
+        '''
+        Returns the file hash cache kept in the user cache directory, or None
+        if it cannot be used.
+        '''
+        if self.__file_hash_cache is None:
+            try:
+                self.__file_hash_cache = sc_filehash.FileHashCache(
+                    os.path.join(sc_package.get_cache_path(self), sc_filehash.CACHE_FILE))
+            except OSError:
+                self.__file_hash_cache = False
+        return self.__file_hash_cache or None
+
+    def _report_hash_changes(self, keypath, old_hashes, new_hashes, log=None):
+        '''
+        Logs the paths which changed within the directories of a parameter,
+        given its previous and current hashes. Directories whose previous
+        hashes were not computed on this machine are not reported.
+        '''
+        cache = self._get_file_hash_cache()
+        if not cache:
+            return
+        if log is None:
+            log = self.logger.warning
+
+        algo = self.get(*keypath, field='hashalgo')
+        max_changes = 10
+        for old_hash, new_hash in zip(old_hashes, new_hashes):
+            if old_hash == new_hash:
+                continue
+            changes = sc_filehash.get_directory_changes(cache, old_hash, new_hash, algo=algo)
+            if not changes:
+                continue
+            log(f'Changes in [{",".join(keypath)}]:')
+            for path, change in changes[:max_changes]:
+                log(f'  {change}: {path}')
+            if len(changes) > max_changes:
+                log(f'  and {len(changes) - max_changes} more')
+
     ###########################################################################
     def audit_manifest(self):
         '''Verifies the integrity of the post-run compilation manifest.
@@ -2657,8 +2684,9 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         Emulates the Unix grep command on a string.
 
         Emulates the behavior of the Unix grep command that is etched into
-        our muscle memory. Partially implemented, not all features supported.
-        The function returns None if no match is found.
+        our muscle memory. Partially implemented, the supported switches are
+        ``-v``, ``-i``, ``-x``, ``-w``, ``-o``, ``-E`` and ``-e``. The
+        function returns None if no match is found.
 
         Args:
             arg (string): Command line arguments for grep command
@@ -2667,50 +2695,15 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         Returns:
             Result of grep command (string).
 
+        Examples:
+            >>> chip.grep('-i -w error', 'ERROR: timing violated')
+            Returns the line, since it contains the word 'error'.
         """
 
-        # Quick return if input is None
-        if line is None:
-            return None
-
-        # Partial list of supported grep options
-        options = {
-            '-v': False,  # Invert the sense of matching
-            '-i': False,  # Ignore case distinctions in patterns and data
-            '-E': False,  # Interpret PATTERNS as extended regular expressions.
-            '-e': False,  # Safe interpretation of pattern starting with "-"
-            '-x': False,  # Select only matches that exactly match the whole line.
-            '-o': False,  # Print only the match parts of a matching line
-            '-w': False}  # Select only lines containing matches that form whole words.
-
-        # Split into repeating switches and everything else
-        match = re.match(r'\s*((?:\-\w\s)*)(.*)', args)
-
-        pattern = match.group(2)
-
-        # Split space separated switch string into list
-        switches = match.group(1).strip().split(' ')
-
-        # Find special -e switch update the pattern
-        for i in range(len(switches)):
-            if switches[i] == "-e":
-                if i != (len(switches)):
-                    pattern = ' '.join(switches[i + 1:]) + " " + pattern
-                    switches = switches[0:i + 1]
-                    break
-                options["-e"] = True
-            elif switches[i] in options.keys():
-                options[switches[i]] = True
-            elif switches[i] != '':
-                self.logger.error(switches[i])
-
-        # REGEX
-        # TODO: add all the other optinos
-        match = re.search(rf"({pattern})", line)
-        if bool(match) == bool(options["-v"]):
-            return None
-        else:
-            return line
+        command = sc_logscan.compile_grep(args)
+        for switch in command.unsupported:
+            self.logger.error(switch)
+        return command(line)
 
     ###########################################################################
     def check_logfile(self, jobname=None, step=None, index='0',
@@ -2762,16 +2755,11 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         # Creating local dictionary (for speed)
         # self.get is slow
         checks = {}
-        matches = {}
         for suffix in self.getkeys('tool', tool, 'task', task, 'regex'):
             regexes = self.get('tool', tool, 'task', task, 'regex', suffix, step=step, index=index)
             if not regexes:
                 continue
-
-            checks[suffix] = {}
-            checks[suffix]['report'] = open(f"{step}.{suffix}", "w")
-            checks[suffix]['args'] = regexes
-            matches[suffix] = 0
+            checks[suffix] = regexes
 
         # Order suffixes as follows: [..., 'warnings', 'errors']
         ordered_suffixes = list(filter(lambda key:
@@ -2781,37 +2769,56 @@ If you are sure that your working directory is valid, try running `cd $(pwd)`.""
         if 'errors' in checks:
             ordered_suffixes.append('errors')
 
-        # Looping through patterns for each line
-        with sc_open(logfile) as f:
-            line_count = sum(1 for _ in f)
-            right_align = len(str(line_count))
+        scanner = sc_logscan.LogScanner(checks)
+        for switch in scanner.unsupported:
+            self.logger.error(switch)
+
+        matches = {suffix: 0 for suffix in ordered_suffixes}
+
+        def write_match(suffix, report):
+            def write(num, string):
+                matches[suffix] += 1
+                print(f'{num}: {string.strip()}', file=report)
+            return write
+
+        # All patterns are checked in a single pass over the log, and matches
+        # are written to the reports as they are found
+        reports = {}
+        try:
             for suffix in ordered_suffixes:
-                # Start at the beginning of file again
-                f.seek(0)
-                for num, line in enumerate(f, start=1):
-                    string = line
-                    for item in checks[suffix]['args']:
-                        if string is None:
-                            break
-                        else:
-                            string = self.grep(item, string)
-                    if string is not None:
-                        matches[suffix] += 1
-                        # always print to file
-                        line_with_num = f'{num: >{right_align}}: {string.strip()}'
-                        print(line_with_num, file=checks[suffix]['report'])
-                        # selectively print to display
-                        if display:
-                            if suffix == 'errors':
-                                self.logger.error(line_with_num)
-                            elif suffix == 'warnings':
-                                self.logger.warning(line_with_num)
-                            else:
-                                self.logger.info(f'{suffix}: {line_with_num}')
+                reports[suffix] = open(f"{step}.{suffix}.unaligned", "w")
+            with sc_open(logfile) as f:
+                line_count, _ = scanner.scan(
+                    f, handlers={suffix: write_match(suffix, report)
+                                 for suffix, report in reports.items()})
+        finally:
+            for report in reports.values():
+                report.close()
+
+        # Line numbers are aligned to the number of lines of the log, which is
+        # only known once it has been scanned
+        right_align = len(str(line_count))
+        for suffix in ordered_suffixes:
+            unaligned = f"{step}.{suffix}.unaligned"
+            with open(unaligned) as src, open(f"{step}.{suffix}", "w") as report:
+                for line in src:
+                    num, string = line.rstrip('\n').split(': ', 1)
+                    line_with_num = f'{num: >{right_align}}: {string}'
+                    print(line_with_num, file=report)
+
+                    # selectively print to display
+                    if not display:
+                        continue
+                    if suffix == 'errors':
+                        self.logger.error(line_with_num)
+                    elif suffix == 'warnings':
+                        self.logger.warning(line_with_num)
+                    else:
+                        self.logger.info(f'{suffix}: {line_with_num}')
+            os.remove(unaligned)
 
         for suffix in ordered_suffixes:
             self.logger.info(f'Number of {suffix}: {matches[suffix]}')
-            checks[suffix]['report'].close()
 
         return matches
 
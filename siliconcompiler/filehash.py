@@ -0,0 +1,355 @@
+# Copyright 2024 Silicon Compiler Authors. All Rights Reserved.
+
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Amount of data read from a file at a time while hashing it.
+BLOCK_SIZE = 1024 * 1024
+
+# Name of the file hash cache in the user cache directory.
+CACHE_FILE = 'filehashes.sqlite'
+
+# Files modified this recently may change again without their modification
+# time changing, so their hashes are not cached.
+RACY_INTERVAL = 2.0
+
+
+def hash_file(path, algo='sha256', hashobj=None):
+    '''
+    Returns the hash of the contents of a file.
+
+    Args:
+        path (str): Path to the file.
+        algo (str): Name of the hashlib algorithm to use.
+        hashobj (hashlib hash object): If provided, the contents of the file
+            are added to this hash instead of a new one.
+    '''
+    if hashobj is None:
+        hashobj = hashlib.new(algo)
+    buffer = bytearray(BLOCK_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            hashobj.update(view[:size])
+    return hashobj.hexdigest()
+
+
+def _scan_directory(path):
+    '''
+    Returns the files and subdirectories of each directory in a tree, keyed
+    by their posix path relative to the root, which is ''. Links to
+    directories are not followed.
+    '''
+    tree = {}
+    for root, dirs, files in os.walk(path):
+        rel_root = os.path.relpath(root, path)
+        rel_root = '' if rel_root == '.' else pathlib.PureWindowsPath(rel_root).as_posix()
+        dirs[:] = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+        tree[rel_root] = (sorted(files), sorted(dirs))
+    return tree
+
+
+def _join(root, name):
+    return f'{root}/{name}' if root else name
+
+
+def _get_tree_files(path, tree):
+    '''
+    Returns the posix paths of the files in a tree returned by
+    :func:`_scan_directory`, relative to the root, and their paths.
+    '''
+    files = [_join(root, name) for root, (names, _) in tree.items() for name in names]
+    return [(file, os.path.join(path, file)) for file in files]
+
+
+def _hash_tree(path, tree, file_hashes, algo, cache):
+    '''
+    Returns the Merkle tree hash of a directory scanned by
+    :func:`_scan_directory`, given the hashes of its files.
+    '''
+    entries = {}
+    for file, file_path in _get_tree_files(path, tree):
+        # Broken links have no contents
+        if file_hashes.get(file_path) is not None:
+            entries[file] = ('file', file_hashes[file_path])
+
+    # Children are hashed before their parents
+    for root in sorted(tree, key=lambda root: root.count('/') + bool(root), reverse=True):
+        names, dirs = tree[root]
+        hashobj = hashlib.new(algo)
+        for name in sorted(names + dirs):
+            if _join(root, name) not in entries:
+                continue
+            kind, entry_hash = entries[_join(root, name)]
+            hashobj.update(f'{kind} {name} {entry_hash}\n'.encode('utf-8'))
+        entries[root] = ('dir', hashobj.hexdigest())
+
+    dir_hash = entries.pop('')[1]
+    if cache:
+        cache.store_tree(dir_hash, algo, entries)
+    return dir_hash
+
+
+def hash_directory(path, algo='sha256', cache=None, jobs=None):
+    '''
+    Returns the Merkle tree hash of a directory.
+
+    The hash of a directory covers the names and hashes of its files and
+    subdirectories, so the files are hashed independently, in parallel, and
+    their cached hashes are reused. If a cache is provided, the hashes of
+    the entries of the tree are recorded along with the hash of the
+    directory, so the changes between two hashes of the directory can be
+    found with :func:`get_directory_changes`.
+
+    Args:
+        path (str): Path to the directory.
+        algo (str): Name of the hashlib algorithm to use.
+        cache (FileHashCache): Cache to look up and record hashes in.
+        jobs (int): Maximum number of files hashed at once.
+    '''
+    tree = _scan_directory(path)
+    file_hashes = _hash_files([file_path for _, file_path in _get_tree_files(path, tree)],
+                              algo, cache, jobs)
+    return _hash_tree(path, tree, file_hashes, algo, cache)
+
+
+def get_directory_changes(cache, old_hash, new_hash, algo='sha256'):
+    '''
+    Returns the changes between two hashes of a directory, as a list of
+    (path, change) pairs. Changes are 'added', 'removed' or 'modified', and
+    paths are relative to the directory. Added and removed subdirectories
+    are reported without their contents.
+
+    Args:
+        cache (FileHashCache): Cache the hashes of the directory were
+            recorded in.
+        old_hash (str): Previous hash of the directory.
+        new_hash (str): Current hash of the directory.
+        algo (str): Name of the hashlib algorithm of the hashes.
+
+    Returns:
+        List of changes, or None if either hash is not a recorded directory hash.
+    '''
+    old = cache.lookup_tree(old_hash, algo)
+    new = cache.lookup_tree(new_hash, algo)
+    if old is None or new is None:
+        return None
+
+    changes = []
+    for path in sorted(set(old) | set(new)):
+        old_entry = old.get(path)
+        new_entry = new.get(path)
+        if old_entry == new_entry:
+            continue
+        parent = path.rpartition('/')[0]
+        if parent and (parent not in old or parent not in new):
+            # Within an added or removed directory
+            continue
+        if old_entry is None:
+            changes.append((path, 'added'))
+        elif new_entry is None:
+            changes.append((path, 'removed'))
+        elif old_entry[0] == 'dir' and new_entry[0] == 'dir':
+            # Reported through the entries which changed within it
+            continue
+        else:
+            changes.append((path, 'modified'))
+    return changes
+
+
+class FileHashCache:
+    '''
+    Hashes of files stored on disk, so they are shared by the processes of a
+    run and reused across runs.
+
+    A hash is reused as long as the path, size, modification time and inode
+    of the file match the ones recorded when it was hashed. The cache is
+    only an optimization, so errors accessing it are ignored.
+
+    Args:
+        path (str): Path of the cache database.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+
+    def __connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute('CREATE TABLE IF NOT EXISTS hashes ('
+                   'path TEXT, algo TEXT, size INTEGER, mtime INTEGER, inode INTEGER, '
+                   'hash TEXT, PRIMARY KEY (path, algo))')
+        return db
+
+    def __connect_trees(self):
+        db = self.__connect()
+        db.execute('CREATE TABLE IF NOT EXISTS trees ('
+                   'hash TEXT, algo TEXT, entries TEXT, PRIMARY KEY (hash, algo))')
+        return db
+
+    def lookup(self, files, algo):
+        '''
+        Returns the cached hashes of files.
+
+        Args:
+            files (dict): Maps the absolute paths of files to their os.stat()
+                results.
+            algo (str): Name of the hashlib algorithm.
+
+        Returns:
+            Dictionary mapping paths to hashes, for the files found in the
+            cache.
+        '''
+        hashes = {}
+        try:
+            db = self.__connect()
+            try:
+                for path, stat in files.items():
+                    row = db.execute('SELECT size, mtime, inode, hash FROM hashes '
+                                     'WHERE path = ? AND algo = ?', (path, algo)).fetchone()
+                    if row and tuple(row[:3]) == (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+                        hashes[path] = row[3]
+            finally:
+                db.close()
+        except sqlite3.Error:
+            pass
+        return hashes
+
+    def store(self, entries, algo):
+        '''
+        Records the hashes of files.
+
+        Args:
+            entries (list of (path, stat, hash)): Absolute path of each file,
+                its os.stat() result from before it was hashed, and its hash.
+            algo (str): Name of the hashlib algorithm.
+        '''
+        # Changes within the resolution of the modification time would go unnoticed
+        racy = time.time() - RACY_INTERVAL
+        rows = [(path, algo, stat.st_size, stat.st_mtime_ns, stat.st_ino, filehash)
+                for path, stat, filehash in entries if stat.st_mtime < racy]
+        if not rows:
+            return
+        try:
+            db = self.__connect()
+            try:
+                with db:
+                    db.executemany('INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)', rows)
+            finally:
+                db.close()
+        except sqlite3.Error:
+            pass
+
+    def store_tree(self, dir_hash, algo, entries):
+        '''
+        Records the hashes of the entries of a directory tree.
+
+        Args:
+            dir_hash (str): Hash of the directory.
+            algo (str): Name of the hashlib algorithm.
+            entries (dict): Maps the paths of the files and subdirectories,
+                relative to the directory, to a ('file' or 'dir', hash) pair.
+        '''
+        try:
+            db = self.__connect_trees()
+            try:
+                with db:
+                    db.execute('INSERT OR IGNORE INTO trees VALUES (?, ?, ?)',
+                               (dir_hash, algo, json.dumps(entries)))
+            finally:
+                db.close()
+        except sqlite3.Error:
+            pass
+
+    def lookup_tree(self, dir_hash, algo):
+        '''
+        Returns the entries of a directory tree recorded by
+        :meth:`store_tree`, or None if the hash was not recorded.
+        '''
+        try:
+            db = self.__connect_trees()
+            try:
+                row = db.execute('SELECT entries FROM trees WHERE hash = ? AND algo = ?',
+                                 (dir_hash, algo)).fetchone()
+            finally:
+                db.close()
+        except sqlite3.Error:
+            return None
+        if not row:
+            return None
+        return {path: tuple(entry) for path, entry in json.loads(row[0]).items()}
+
+
+def _hash_files(paths, algo, cache, jobs):
+    '''
+    Returns a dictionary mapping the paths which are files to their hashes.
+    Files which are not cached are hashed by a single pool of threads.
+    '''
+    files = {}
+    for path in dict.fromkeys(paths):
+        if os.path.isfile(path):
+            files[path] = os.stat(path)
+
+    hashes = {}
+    if cache and files:
+        cached = cache.lookup({os.path.abspath(path): stat for path, stat in files.items()},
+                              algo)
+        for path in files:
+            if os.path.abspath(path) in cached:
+                hashes[path] = cached[os.path.abspath(path)]
+    todo = [path for path in files if path not in hashes]
+
+    if len(todo) > 1:
+        # hashlib releases the GIL while hashing, so threads hash in parallel
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            hashes.update(zip(todo, executor.map(lambda path: hash_file(path, algo), todo)))
+    else:
+        hashes.update([(path, hash_file(path, algo)) for path in todo])
+
+    if cache:
+        cache.store([(os.path.abspath(path), files[path], hashes[path]) for path in todo], algo)
+
+    return hashes
+
+
+def hash_paths(paths, algo='sha256', cache=None, jobs=None):
+    '''
+    Returns the hashes of files and directories. The files given and the
+    files in the directories given are hashed concurrently.
+
+    Args:
+        paths (list of str): Paths to hash.
+        algo (str): Name of the hashlib algorithm to use.
+        cache (FileHashCache): Cache to look up and record file hashes in.
+        jobs (int): Maximum number of files hashed at once.
+
+    Returns:
+        List with the hash of each path, or None for the paths which do not
+        exist.
+    '''
+    files = []
+    trees = {}
+    for path in dict.fromkeys(paths):
+        if os.path.isfile(path):
+            files.append(path)
+        elif os.path.isdir(path):
+            trees[path] = _scan_directory(path)
+            files.extend(file_path for _, file_path in _get_tree_files(path, trees[path]))
+
+    file_hashes = _hash_files(files, algo, cache, jobs)
+
+    hashes = {}
+    for path in dict.fromkeys(paths):
+        if path in trees:
+            hashes[path] = _hash_tree(path, trees[path], file_hashes, algo, cache)
+        else:
+            hashes[path] = file_hashes.get(path)
+
+    return [hashes[path] for path in paths]
@@ -1,12 +1,156 @@
+import heapq
 import os
 from siliconcompiler import SiliconCompilerError
 from siliconcompiler import NodeStatus
 from siliconcompiler.schema import Schema
 
 
+class _FlowgraphIndex:
+    '''
+    Adjacency index of a flowgraph.
+
+    The index is built once per flow and kept in the schema of the chip
+    until the nodes or edges of the flow change, so walking the flowgraph
+    does not search every node for the successors of each node visited.
+
+    Args:
+        chip (Chip): Chip holding the flowgraph.
+        flow (str): Name of the flow.
+    '''
+
+    def __init__(self, chip, flow):
+        #: Nodes of the flowgraph, in the order they were added.
+        self.nodes = _get_flowgraph_nodes(chip, flow)
+        self.__position = {node: n for n, node in enumerate(self.nodes)}
+
+        #: Maps nodes to the nodes they take inputs from.
+        self.inputs = {}
+        #: Maps nodes to the nodes taking inputs from them, in the order of
+        #: :attr:`nodes`.
+        self.outputs = {node: [] for node in self.nodes}
+        for node in self.nodes:
+            self.inputs[node] = tuple(_get_flowgraph_node_inputs(chip, flow, node))
+            for input_node in self.inputs[node]:
+                self.outputs.setdefault(input_node, []).append(node)
+
+        self.__reachable = {}
+        self.__execution_order = {}
+
+    def has_node(self, step, index):
+        return (step, index) in self.__position
+
+    def get_outputs(self, node):
+        return self.outputs.get(node, [])
+
+    def reachable(self, from_nodes, prune_nodes=(), cond=None):
+        '''
+        Returns the set of nodes reachable from from_nodes without going
+        through prune_nodes or nodes for which cond returns False. Results
+        without cond are cached.
+        '''
+        key = None
+        if cond is None:
+            key = (frozenset(from_nodes), frozenset(prune_nodes))
+            if key in self.__reachable:
+                return self.__reachable[key]
+
+        prune_nodes = set(prune_nodes)
+        visited = set()
+        stack = list(from_nodes)
+        while stack:
+            node = stack.pop()
+            if node in visited or node in prune_nodes:
+                continue
+            if cond is not None and not cond(node):
+                continue
+            visited.add(node)
+            stack.extend(self.get_outputs(node))
+
+        if key is not None:
+            self.__reachable[key] = frozenset(visited)
+        return visited
+
+    def check_acyclic(self, nodes):
+        '''
+        Raises an error if the edges between nodes form a cycle.
+        '''
+        # Depth first search, nodes on the current path are marked active
+        active, done = set(), set()
+        for start in nodes:
+            if start in done:
+                continue
+            path = [start]
+            active.add(start)
+            iters = [iter(self.get_outputs(start))]
+            while iters:
+                for node in iters[-1]:
+                    if node not in nodes or node in done:
+                        continue
+                    if node in active:
+                        raise SiliconCompilerError(
+                            f'Path {path} would form a circle with {node}')
+                    path.append(node)
+                    active.add(node)
+                    iters.append(iter(self.get_outputs(node)))
+                    break
+                else:
+                    iters.pop()
+                    node = path.pop()
+                    active.remove(node)
+                    done.add(node)
+
+    def sort(self, nodes):
+        '''
+        Returns nodes in execution order, where each node comes after the
+        nodes it takes inputs from. Otherwise, nodes keep the order they
+        were added in.
+        '''
+        unknown = len(self.nodes)
+        pending = {node: sum(1 for input_node in self.inputs.get(node, ())
+                             if input_node in nodes)
+                   for node in nodes}
+        ready = [(self.__position.get(node, unknown), node)
+                 for node, count in pending.items() if not count]
+        heapq.heapify(ready)
+
+        order = []
+        while ready:
+            _, node = heapq.heappop(ready)
+            order.append(node)
+            for output_node in self.get_outputs(node):
+                if output_node not in pending:
+                    continue
+                pending[output_node] -= 1
+                if not pending[output_node]:
+                    heapq.heappush(ready, (self.__position[output_node], output_node))
+        return order
+
+    def execution_order(self, reverse):
+        '''
+        Returns the cached levels of :func:`_get_flowgraph_execution_order`.
+        '''
+        return self.__execution_order.get(reverse)
+
+    def set_execution_order(self, reverse, order):
+        self.__execution_order[reverse] = order
+
+
+def _get_flowgraph_index(chip, flow):
+    '''
+    Returns the :class:`_FlowgraphIndex` of a flow, building it if the
+    flowgraph changed since it was last built.
+    '''
+    index = chip.schema._get_flowgraph_index(flow)
+    if index is None:
+        index = _FlowgraphIndex(chip, flow)
+        chip.schema._set_flowgraph_index(flow, index)
+    return index
+
+
 def _check_execution_nodes_inputs(chip, flow):
+    entry_nodes = set(_get_execution_entry_nodes(chip, flow))
     for node in chip.nodes_to_execute(flow):
-        if node in _get_execution_entry_nodes(chip, flow):
+        if node in entry_nodes:
             continue
         pruned_node_inputs = set(_get_pruned_node_inputs(chip, flow, node))
         node_inputs = set(_get_flowgraph_node_inputs(chip, flow, node))
@@ -24,35 +168,27 @@ def _check_execution_nodes_inputs(chip, flow):
 def _nodes_to_execute(chip, flow, from_nodes, to_nodes, prune_nodes):
     '''
     Assumes a flowgraph with valid edges for the inputs
-    '''
-    nodes_to_execute = []
-    for from_node in from_nodes:
-        for node in _nodes_to_execute_recursive(chip, flow, from_node, to_nodes, prune_nodes):
-            if node not in nodes_to_execute:
-                nodes_to_execute.append(node)
-    return nodes_to_execute
-
 
-def _nodes_to_execute_recursive(chip, flow, from_node, to_nodes, prune_nodes, path=[]):
-    path = path.copy()
-    nodes_to_execute = []
+    Returns the nodes on the paths from from_nodes to to_nodes which do not
+    go through prune_nodes, in execution order.
+    '''
+    index = _get_flowgraph_index(chip, flow)
 
-    if from_node in prune_nodes:
-        return []
-    if from_node in path:
-        raise SiliconCompilerError(f'Path {path} would form a circle with {from_node}')
-    path.append(from_node)
+    reachable = index.reachable(from_nodes, prune_nodes=prune_nodes)
+    index.check_acyclic(reachable)
 
-    if from_node in to_nodes:
-        for node in path:
-            nodes_to_execute.append(node)
-    for output_node in _get_flowgraph_node_outputs(chip, flow, from_node):
-        for node in _nodes_to_execute_recursive(chip, flow, output_node, to_nodes,
-                                                prune_nodes, path=path):
-            if node not in nodes_to_execute:
-                nodes_to_execute.append(node)
+    # Walk back from to_nodes through the nodes reachable from from_nodes
+    nodes = set()
+    stack = [node for node in to_nodes if node in reachable]
+    while stack:
+        node = stack.pop()
+        if node in nodes:
+            continue
+        nodes.add(node)
+        stack.extend(input_node for input_node in index.inputs.get(node, ())
+                     if input_node in reachable)
 
-    return nodes_to_execute
+    return index.sort(nodes)
 
 
 def _unreachable_steps_to_execute(chip, flow, cond=lambda _: True):
@@ -62,30 +198,17 @@ def _unreachable_steps_to_execute(chip, flow, cond=lambda _: True):
     reachable_nodes = set(_reachable_flowgraph_nodes(chip, flow, from_nodes, cond=cond,
                                                      prune_nodes=prune_nodes))
     unreachable_nodes = to_nodes.difference(reachable_nodes)
+    reachable_steps = set(node[0] for node in reachable_nodes)
     unreachable_steps = set()
     for unreachable_node in unreachable_nodes:
-        if not any(filter(lambda node: node[0] == unreachable_node[0], reachable_nodes)):
+        if unreachable_node[0] not in reachable_steps:
             unreachable_steps.add(unreachable_node[0])
     return unreachable_steps
 
 
-def _reachable_flowgraph_nodes(chip, flow, from_nodes, cond=lambda _: True, prune_nodes=[]):
-    visited_nodes = set()
-    current_nodes = from_nodes.copy()
-    while current_nodes:
-        current_nodes_copy = current_nodes.copy()
-        for current_node in current_nodes_copy:
-            if current_node in prune_nodes:
-                current_nodes.remove(current_node)
-                continue
-            if cond(current_node):
-                visited_nodes.add(current_node)
-                current_nodes.remove(current_node)
-                outputs = _get_flowgraph_node_outputs(chip, flow, current_node)
-                current_nodes.update(outputs)
-        if current_nodes == current_nodes_copy:
-            break
-    return visited_nodes
+def _reachable_flowgraph_nodes(chip, flow, from_nodes, cond=None, prune_nodes=[]):
+    index = _get_flowgraph_index(chip, flow)
+    return set(index.reachable(from_nodes, prune_nodes=prune_nodes, cond=cond))
 
 
 def _get_flowgraph_node_inputs(chip, flow, node):
@@ -95,8 +218,8 @@ def _get_flowgraph_node_inputs(chip, flow, node):
 
 def _get_pruned_flowgraph_nodes(chip, flow, prune_nodes):
     # Ignore option from/to, we want reachable nodes of the whole flowgraph
-    from_nodes = set(_get_flowgraph_entry_nodes(chip, flow))
-    return _reachable_flowgraph_nodes(chip, flow, from_nodes, prune_nodes=prune_nodes)
+    from_nodes = _get_flowgraph_entry_nodes(chip, flow)
+    return _get_flowgraph_index(chip, flow).reachable(from_nodes, prune_nodes=prune_nodes)
 
 
 def _get_pruned_node_inputs(chip, flow, node):
@@ -107,15 +230,7 @@ def _get_pruned_node_inputs(chip, flow, node):
 
 
 def _get_flowgraph_node_outputs(chip, flow, node):
-    node_outputs = []
-
-    iter_nodes = _get_flowgraph_nodes(chip, flow)
-    for iter_node in iter_nodes:
-        iter_node_inputs = _get_flowgraph_node_inputs(chip, flow, iter_node)
-        if node in iter_node_inputs:
-            node_outputs.append(iter_node)
-
-    return node_outputs
+    return list(_get_flowgraph_index(chip, flow).get_outputs(node))
 
 
 def _get_flowgraph_nodes(chip, flow, steps=None, indices=None):
@@ -176,10 +291,13 @@ def _get_flowgraph_entry_nodes(chip, flow, steps=None):
     Collect all step/indices that represent the entry
     nodes for the flowgraph
     '''
+    flowgraph_index = _get_flowgraph_index(chip, flow)
     nodes = []
-    for (step, index) in _get_flowgraph_nodes(chip, flow, steps=steps):
-        if not _get_flowgraph_node_inputs(chip, flow, (step, index)):
-            nodes.append((step, index))
+    for node in flowgraph_index.nodes:
+        if steps and node[0] not in steps:
+            continue
+        if not flowgraph_index.inputs[node]:
+            nodes.append(node)
     return nodes
 
 
@@ -201,13 +319,16 @@ def _get_flowgraph_exit_nodes(chip, flow, steps=None):
     Collect all step/indices that represent the exit
     nodes for the flowgraph
     '''
-    inputnodes = []
-    for (step, index) in _get_flowgraph_nodes(chip, flow, steps=steps):
-        inputnodes.extend(_get_flowgraph_node_inputs(chip, flow, (step, index)))
+    flowgraph_index = _get_flowgraph_index(chip, flow)
+    flowgraph_nodes = [node for node in flowgraph_index.nodes
+                       if not steps or node[0] in steps]
+    inputnodes = set()
+    for node in flowgraph_nodes:
+        inputnodes.update(flowgraph_index.inputs[node])
     nodes = []
-    for (step, index) in _get_flowgraph_nodes(chip, flow, steps=steps):
-        if (step, index) not in inputnodes:
-            nodes.append((step, index))
+    for node in flowgraph_nodes:
+        if node not in inputnodes:
+            nodes.append(node)
     return nodes
 
 
@@ -217,10 +338,16 @@ def _get_flowgraph_execution_order(chip, flow, reverse=False):
     Generates a list of nodes in the order they will be executed.
     '''
 
+    flowgraph_index = _get_flowgraph_index(chip, flow)
+    exec_order = flowgraph_index.execution_order(reverse)
+    if exec_order is not None:
+        # Callers may modify the returned lists
+        return [list(level_nodes) for level_nodes in exec_order]
+
     # Generate execution edges lookup map
     ex_map = {}
-    for step, index in _get_flowgraph_nodes(chip, flow):
-        for istep, iindex in _get_flowgraph_node_inputs(chip, flow, (step, index)):
+    for step, index in flowgraph_index.nodes:
+        for istep, iindex in flowgraph_index.inputs[(step, index)]:
             if reverse:
                 ex_map.setdefault((step, index), set()).add((istep, iindex))
             else:
@@ -253,6 +380,9 @@ def _get_flowgraph_execution_order(chip, flow, reverse=False):
 
     exec_order.reverse()
 
+    flowgraph_index.set_execution_order(reverse, [list(level_nodes)
+                                                  for level_nodes in exec_order])
+
     return exec_order
 
 
@@ -0,0 +1,289 @@
+# Copyright 2024 Silicon Compiler Authors. All Rights Reserved.
+
+import functools
+import re
+
+# Partial list of supported grep options
+GREP_OPTIONS = (
+    '-v',  # Invert the sense of matching
+    '-i',  # Ignore case distinctions in patterns and data
+    '-E',  # Interpret PATTERNS as extended regular expressions.
+    '-e',  # Safe interpretation of pattern starting with "-"
+    '-x',  # Select only matches that exactly match the whole line.
+    '-o',  # Print only the match parts of a matching line
+    '-w')  # Select only lines containing matches that form whole words.
+
+# Amount of the log searched at a time.
+CHUNK_SIZE = 16 * 1024 * 1024
+
+# Patterns which only match themselves
+_PLAIN_TEXT = re.compile(r'[A-Za-z0-9_ :-]+')
+
+# Anchors to the start or end of the searched text, which differ between a
+# line and a block of lines
+_TEXT_ANCHOR = re.compile(r'\\[AZ]')
+
+
+def parse_grep(args):
+    '''
+    Splits the command line arguments of a grep command into its switches
+    and its pattern.
+
+    Args:
+        args (str): Command line arguments for grep command.
+
+    Returns:
+        Tuple of the set of switches found, the pattern, and the list of
+        unsupported switches.
+    '''
+
+    options = set()
+    unsupported = []
+
+    # Split into repeating switches and everything else
+    match = re.match(r'\s*((?:\-\w\s)*)(.*)', args)
+
+    pattern = match.group(2)
+
+    # Split space separated switch string into list
+    switches = match.group(1).strip().split(' ')
+
+    # Find special -e switch update the pattern
+    for i in range(len(switches)):
+        if switches[i] == "-e":
+            if i != (len(switches)):
+                pattern = ' '.join(switches[i + 1:]) + " " + pattern
+                switches = switches[0:i + 1]
+                break
+            options.add("-e")
+        elif switches[i] in GREP_OPTIONS:
+            options.add(switches[i])
+        elif switches[i] != '':
+            unsupported.append(switches[i])
+
+    return options, pattern, unsupported
+
+
+class GrepCommand:
+    '''
+    Grep command with its pattern compiled, which is applied to lines.
+
+    Args:
+        args (str): Command line arguments for grep command.
+    '''
+
+    def __init__(self, args):
+        self.options, self.pattern, self.unsupported = parse_grep(args)
+
+        flags = re.IGNORECASE if '-i' in self.options else 0
+        pattern = f'({self.pattern})'
+        if '-w' in self.options:
+            pattern = rf'(?<!\w){pattern}(?!\w)'
+        self.regex = re.compile(pattern, flags)
+
+        self.invert = '-v' in self.options
+        self.only_matching = '-o' in self.options and not self.invert
+        self.whole_line = '-x' in self.options
+
+    def __call__(self, line):
+        '''
+        Returns the output of the command for a line, which is None if the
+        line is not selected.
+        '''
+        if line is None:
+            return None
+
+        if self.whole_line:
+            match = self.regex.fullmatch(line.rstrip('\r\n'))
+        else:
+            match = self.regex.search(line)
+
+        if bool(match) == self.invert:
+            return None
+        if self.only_matching:
+            return match.group(0)
+        return line
+
+    def block_regex(self):
+        '''
+        Returns a regex which finds, in a block of lines, a match starting in
+        each line selected by this command, or None if lines must be checked
+        one at a time. Matches found may also start in lines which are not
+        selected, so the lines found must be checked with the command.
+
+        Returns:
+            Tuple of the regex, and whether it searches the block in lower
+            case.
+        '''
+        if self.invert or _TEXT_ANCHOR.search(self.pattern):
+            return None
+
+        pattern = self.pattern
+        if pattern.startswith('^'):
+            # Removing an anchor only finds more lines, and allows the regex
+            # engine to search for a leading literal
+            pattern = pattern[1:]
+
+        if self.regex.flags & re.IGNORECASE and _PLAIN_TEXT.fullmatch(pattern):
+            # Searching for a literal ignoring case is much slower than
+            # searching for it in lower case
+            return re.compile(re.escape(pattern.lower()), re.MULTILINE), True
+        return re.compile(f'({pattern})', self.regex.flags | re.MULTILINE), False
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_grep(args):
+    '''
+    Returns the :class:`GrepCommand` for the command line arguments of a
+    grep command. Commands are cached, so patterns are only compiled once.
+
+    Args:
+        args (str): Command line arguments for grep command.
+    '''
+    return GrepCommand(args)
+
+
+class LogScanner:
+    '''
+    Applies several chains of piped together grep commands to the lines of a
+    log in a single pass.
+
+    The log is read in blocks of lines. The first command of each chain
+    searches a whole block at once, and the rest of the chain is only applied
+    to the lines found, so most lines are never handled one at a time.
+    Chains starting with an inverted command are applied to every line.
+
+    Args:
+        chains (dict): Maps names to lists of grep command line arguments,
+            applied in order.
+    '''
+
+    def __init__(self, chains):
+        self.__chains = {}
+        self.__block_regexes = {}
+        self.__line_chains = []
+        for name, chain in chains.items():
+            commands = [compile_grep(args) for args in chain]
+            self.__chains[name] = commands
+
+            block_regex = commands[0].block_regex() if commands else None
+            if block_regex is None:
+                self.__line_chains.append(name)
+            else:
+                self.__block_regexes[name] = block_regex
+
+    @property
+    def unsupported(self):
+        '''
+        List of the unsupported grep switches found in the chains.
+        '''
+        switches = []
+        for commands in self.__chains.values():
+            for command in commands:
+                switches.extend(command.unsupported)
+        return switches
+
+    def __apply(self, name, line):
+        for command in self.__chains[name]:
+            line = command(line)
+            if line is None:
+                return None
+        return line
+
+    def __find_lines(self, block):
+        '''
+        Returns the offsets of the lines of a block which may match each chain.
+        '''
+        lower_block = None
+        candidates = {}
+        for name, (regex, lower) in self.__block_regexes.items():
+            search_block = block
+            if lower:
+                if lower_block is None:
+                    # Lowering other characters may change the offsets of lines
+                    lower_block = block.lower() if block.isascii() else False
+                if lower_block is False:
+                    regex = self.__chains[name][0].regex
+                else:
+                    search_block = lower_block
+
+            pos = 0
+            while pos < len(block):
+                match = regex.search(search_block, pos)
+                if not match:
+                    break
+                line_start = block.rfind('\n', 0, match.start()) + 1
+                candidates.setdefault(line_start, []).append(name)
+                # Matches may span lines, so continue with the next line
+                pos = block.find('\n', match.start())
+                if pos < 0:
+                    break
+                pos += 1
+        return candidates
+
+    def scan(self, f, handlers=None):
+        '''
+        Applies the chains to the lines of a file.
+
+        Args:
+            f (file): Text file to read the lines from.
+            handlers (dict): Maps chain names to functions called with the
+                line number and output of each line the chain matches, in
+                the order of the lines. The matches of these chains are
+                passed on as they are found instead of being collected.
+
+        Returns:
+            Tuple of the number of lines and a dictionary mapping the name of
+            each chain without a handler to the list of (line number, output)
+            of the lines it matched.
+        '''
+        handlers = dict(handlers or {})
+        matches = {name: [] for name in self.__chains if name not in handlers}
+        for name in matches:
+            handlers[name] = functools.partial(self.__collect, matches[name])
+
+        line_count = 0
+        while True:
+            # Blocks end on complete lines
+            block = f.read(CHUNK_SIZE)
+            if not block:
+                break
+            if not block.endswith('\n'):
+                block += f.readline()
+
+            candidates = self.__find_lines(block)
+            if self.__line_chains:
+                for line_start in self.__line_starts(block):
+                    candidates.setdefault(line_start, []).extend(self.__line_chains)
+
+            num = line_count + 1
+            pos = 0
+            for line_start in sorted(candidates):
+                num += block.count('\n', pos, line_start)
+                pos = line_start
+                line_end = block.find('\n', line_start) + 1 or len(block)
+                line = block[line_start:line_end]
+                for name in candidates[line_start]:
+                    output = self.__apply(name, line)
+                    if output is not None:
+                        handlers[name](num, output)
+
+            line_count += block.count('\n')
+            if not block.endswith('\n'):
+                # Last line of the file, without a newline
+                line_count += 1
+
+        return line_count, matches
+
+    @staticmethod
+    def __collect(matches, num, output):
+        matches.append((num, output))
+
+    @staticmethod
+    def __line_starts(block):
+        pos = 0
+        while pos < len(block):
+            yield pos
+            pos = block.find('\n', pos) + 1
+            if not pos:
+                break
@@ -9,11 +9,13 @@ import urllib.parse
 import tarfile
 import tempfile
 import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 
 from siliconcompiler import utils, SiliconCompilerError
 from siliconcompiler._metadata import default_server
 from siliconcompiler.schema import Schema
 from siliconcompiler.utils import default_credentials_file
+from siliconcompiler.remote import transfer
 from siliconcompiler.scheduler import _setup_node, _runtask, _executenode
 from siliconcompiler.flowgraph import _get_flowgraph_entry_nodes, _get_flowgraph_node_outputs
 
@@ -23,6 +25,9 @@ remote_step_name = 'remote'
 # Client / server timeout
 __timeout = 10
 
+# Maximum number of concurrent file transfers
+__max_transfers = 8
+
 # Generate warning if no server is configured
 __warn_if_no_server = True
 
@@ -252,6 +257,9 @@ def _process_progress_info(chip, progress_info, nodes_to_print=3):
         nodes_to_log = {'completed': [], 'failed': [], 'timeout': [],
                         'running': [], 'queued': [], 'pending': []}
         for node, node_info in job_info.items():
+            if not isinstance(node_info, dict):
+                # Not a node, such as the status of the job
+                continue
             status = node_info['status']
             nodes_to_log[status].append((node, node_info))
             if (status == 'completed'):
@@ -416,20 +424,31 @@ def __remote_run_loop(chip, check_interval):
     for (step, index) in chip.nodes_to_execute():
         all_nodes.append(f'{step}{index}')
     completed = []
-    result_procs = []
+    result_futures = []
+    # Downloads are I/O bound, so they run in threads
+    download_pool = ThreadPoolExecutor(max_workers=__max_transfers)
+
+    def download(node):
+        try:
+            fetch_results(chip, node)
+        except SiliconCompilerError:
+            # Already reported, a failure in one node does not stop other downloads
+            pass
 
     def schedule_download(node):
-        node_proc = multiprocessor.Process(target=fetch_results,
-                                           args=(chip, node))
-        node_proc.start()
-        result_procs.append(node_proc)
+        result_futures.append(download_pool.submit(download, node))
         if node is None:
             node = 'final result'
         chip.logger.info(f'    {node}')
 
+    # Servers which push status changes return a status version, which is
+    # sent back to wait for the next change. Otherwise, fall back to polling.
+    status_version = -1
     while is_busy:
-        time.sleep(check_interval)
-        new_completed, is_busy = check_progress(chip)
+        if status_version is None:
+            time.sleep(check_interval)
+        new_completed, is_busy, status_version = \
+            _check_progress(chip, status_version=status_version, wait=check_interval)
         nodes_to_fetch = []
         for node in new_completed:
             if node not in completed:
@@ -449,8 +468,9 @@ def __remote_run_loop(chip, check_interval):
 
     # Make sure all results are fetched before letting the client issue
     # a deletion request.
-    for proc in result_procs:
-        proc.join()
+    for future in result_futures:
+        future.result()
+    download_pool.shutdown()
 
     # Un-set the 'remote' option to avoid from/to-based summary/show errors
     chip.unset('option', 'remote')
@@ -458,20 +478,25 @@ def __remote_run_loop(chip, check_interval):
 
 ###################################
 def check_progress(chip):
+    completed, is_busy, _ = _check_progress(chip)
+    return completed, is_busy
+
+
+def _check_progress(chip, status_version=None, wait=0):
     try:
-        is_busy_info = is_job_busy(chip)
+        is_busy_info = is_job_busy(chip, status_version=status_version, wait=wait)
         is_busy = is_busy_info['busy']
         completed = []
         if is_busy:
             completed = _process_progress_info(chip,
                                                is_busy_info)
-        return completed, is_busy
+        return completed, is_busy, is_busy_info.get('status_version', None)
     except Exception as e:
         # Sometimes an exception is raised if the request library cannot
         # reach the server due to a transient network issue.
         # Retrying ensures that jobs don't break off when the connection drops.
         chip.logger.info(f"Unknown network error encountered: retrying: {e}")
-        return [], True
+        return [], True, None
 
 
 ###################################
@@ -504,13 +529,6 @@ def _request_remote_run(chip):
     '''
 
     remote_resume = (chip.get('option', 'resume') and chip.get('record', 'remoteid'))
-    # Only package and upload the entry steps if starting a new job.
-    if not remote_resume:
-        upload_file = tempfile.TemporaryFile(prefix='sc', suffix='remote.tar.gz')
-        with tarfile.open(fileobj=upload_file, mode='w:gz') as tar:
-            tar.add(chip._getworkdir(), arcname='')
-        # Flush file to ensure everything is written
-        upload_file.flush()
 
     remote_status = _remote_ping(chip)
 
@@ -523,18 +541,33 @@ def _request_remote_run(chip):
         chip.logger.info(remote_status['pre_upload']['message'])
         time.sleep(remote_status['pre_upload']['delay'])
 
+    # Only package and upload the entry steps if starting a new job.
+    upload_file = None
+    upload_manifest = None
+    if not remote_resume:
+        upload_manifest = upload_files(chip)
+        if upload_manifest is None:
+            # Server does not provide a file store, so send the whole directory
+            upload_file = tempfile.TemporaryFile(prefix='sc', suffix='remote.tar.gz')
+            with tarfile.open(fileobj=upload_file, mode='w:gz') as tar:
+                tar.add(chip._getworkdir(), arcname='')
+            # Flush file to ensure everything is written
+            upload_file.flush()
+
     # Make the actual request, streaming the bulk data as a multipart file.
     # Redirected POST requests are translated to GETs. This is actually
     # part of the HTTP spec, so we need to manually follow the trail.
     post_params = {
-        'chip_cfg': chip.schema.cfg,
+        'chip_cfg': chip.schema.getdict(),
         'params': __build_post_params(chip,
                                       False,
                                       job_hash=chip.get('record', 'remoteid'))
     }
 
     post_files = {'params': json.dumps(post_params)}
-    if not remote_resume:
+    if upload_manifest is not None:
+        post_files['files'] = json.dumps(upload_manifest)
+    elif upload_file:
         post_files['import'] = upload_file
         upload_file.seek(0)
 
@@ -547,7 +580,7 @@ def _request_remote_run(chip):
         return resp.json()
 
     resp = __post(chip, '/remote_run/', post_action, success_action)
-    if not remote_resume:
+    if upload_file:
         upload_file.close()
 
     if 'message' in resp and resp['message']:
@@ -560,11 +593,101 @@ def _request_remote_run(chip):
 
 
 ###################################
-def is_job_busy(chip):
+def check_files_request(chip, hashes):
+    '''
+    Helper method to ask the server which input files it does not have yet.
+
+       Returns:
+       * List of the hashes of the missing files.
+       * None if the server does not provide a file store.
+    '''
+
+    def post_action(url):
+        params = __build_post_params(chip, False)
+        params['hashes'] = hashes
+        return requests.post(url,
+                             data=json.dumps(params),
+                             timeout=__timeout)
+
+    def success_action(resp):
+        return resp.json()['missing']
+
+    def error_action(code, msg):
+        return None
+
+    return __post(chip,
+                  '/check_files/',
+                  post_action,
+                  success_action,
+                  error_action=error_action)
+
+
+###################################
+def upload_file_request(chip, entry, path):
+    '''
+    Helper method to upload a single input file to the server's file store.
+    '''
+
+    def post_action(url):
+        with open(path, 'rb') as f:
+            return requests.post(url,
+                                 files={'params': json.dumps(__build_post_params(chip, False)),
+                                        'file': f},
+                                 timeout=__timeout)
+
+    def success_action(resp):
+        return resp.json()
+
+    return __post(chip,
+                  f'/upload_file/{entry["hash"]}',
+                  post_action,
+                  success_action)
+
+
+###################################
+def upload_files(chip):
+    '''
+    Helper method to upload the job's input files. Only files which the server
+    does not already have in its file store are transferred.
+
+       Returns:
+       * Manifest of the 'path', 'hash' and 'size' of each input file.
+       * None if the server does not provide a file store.
+    '''
+
+    workdir = chip._getworkdir()
+    manifest = transfer.get_file_manifest(workdir, [workdir])
+
+    missing = check_files_request(chip, [entry['hash'] for entry in manifest])
+    if missing is None:
+        return None
+
+    entries = {entry['hash']: entry for entry in manifest}
+    upload_size = sum([entries[file_hash]['size'] for file_hash in missing])
+    chip.logger.info(f'Uploading {len(missing)} of {len(entries)} input files '
+                     f'({upload_size} bytes).')
+
+    with ThreadPoolExecutor(max_workers=__max_transfers) as executor:
+        uploads = [executor.submit(upload_file_request,
+                                   chip,
+                                   entries[file_hash],
+                                   transfer.get_local_path(workdir, entries[file_hash]))
+                   for file_hash in missing]
+        for upload in uploads:
+            upload.result()
+
+    return manifest
+
+
+###################################
+def is_job_busy(chip, status_version=None, wait=0):
     '''
     Helper method to make an async request asking the remote server
     whether a job is busy, or ready to accept a new step.
     Returns True if the job is busy, False if not.
+
+    If status_version is provided, servers which push status changes wait
+    up to wait seconds for the status to change from that version.
     '''
 
     # Make the request and print its response.
@@ -573,9 +696,12 @@ def is_job_busy(chip):
                                      False,
                                      job_hash=chip.get('record', 'remoteid'),
                                      job_name=chip.get('option', 'jobname'))
+        if status_version is not None:
+            params['status_version'] = status_version
+            params['wait'] = wait
         return requests.post(url,
                              data=json.dumps(params),
-                             timeout=__timeout)
+                             timeout=__timeout + wait)
 
     def error_action(code, msg):
         return {
@@ -587,20 +713,22 @@ def is_job_busy(chip):
         # Determine job completion based on response message, or preferably JSON parameter.
         # TODO: Only accept JSON response's "status" field once server changes are rolled out.
         is_busy = ("Job has no running steps." not in resp.text)
+        info = {
+            'busy': is_busy,
+            'message': resp.text
+        }
         try:
             json_response = json.loads(resp.text)
             if ('status' in json_response) and (json_response['status'] == 'completed'):
-                is_busy = False
+                info['busy'] = False
             elif ('status' in json_response) and (json_response['status'] == 'canceled'):
                 chip.logger.info('Job was canceled.')
-                is_busy = False
+                info['busy'] = False
+            if 'status_version' in json_response:
+                info['status_version'] = json_response['status_version']
         except requests.JSONDecodeError:
             # Message may have been text-formatted.
             pass
-        info = {
-            'busy': is_busy,
-            'message': resp.text
-        }
         return info
 
     info = __post(chip,
@@ -702,6 +830,125 @@ def fetch_results_request(chip, node, results_fd):
                   error_action=error_action)
 
 
+###################################
+def fetch_result_files_request(chip, node):
+    '''
+    Helper method to fetch the manifest of the result files of a node.
+
+       Returns:
+       * List of the 'path', 'hash' and 'size' of each file.
+       * None if the server does not provide file manifests.
+    '''
+
+    job_hash = chip.get('record', 'remoteid')
+
+    def post_action(url):
+        return requests.post(url,
+                             data=json.dumps(__build_post_params(chip, False)),
+                             timeout=__timeout)
+
+    def success_action(resp):
+        return resp.json()
+
+    def error_action(code, msg):
+        return None
+
+    return __post(chip,
+                  f'/get_results/{job_hash}/{node}/files.json',
+                  post_action,
+                  success_action,
+                  error_action=error_action)
+
+
+###################################
+def fetch_result_file_request(chip, node, entry, path):
+    '''
+    Helper method to fetch a single result file into path. If a partial
+    download of the file exists, the transfer is resumed.
+
+       Returns:
+       * 0 if no error was encountered.
+       * [response code] if the file could not be retrieved.
+    '''
+
+    job_hash = chip.get('record', 'remoteid')
+    partial_path = path + transfer.PARTIAL_SUFFIX
+
+    def post_action(url):
+        headers = {}
+        if os.path.isfile(partial_path):
+            headers['Range'] = f'bytes={os.path.getsize(partial_path)}-'
+        return requests.post(url,
+                             data=json.dumps(__build_post_params(chip, False)),
+                             headers=headers,
+                             stream=True,
+                             timeout=__timeout)
+
+    def success_action(resp):
+        # Append if the server resumed the transfer
+        mode = 'ab' if resp.status_code == 206 else 'wb'
+        with open(partial_path, mode) as f:
+            for chunk in resp.iter_content(chunk_size=transfer.BLOCK_SIZE):
+                f.write(chunk)
+        return 0
+
+    def error_action(code, msg):
+        if code == 416 and os.path.exists(partial_path):
+            # Partial file is complete or invalid, so start over
+            os.remove(partial_path)
+        return code
+
+    code = __post(chip,
+                  f'/get_results/{job_hash}/{node}/files/{entry["hash"]}',
+                  post_action,
+                  success_action,
+                  error_action=error_action)
+    if code:
+        return code
+
+    if not transfer.is_file_current(partial_path, entry):
+        chip.logger.warning(f'Result file {entry["path"]} does not match its hash.')
+        os.remove(partial_path)
+        return 400
+
+    os.replace(partial_path, path)
+    return 0
+
+
+###################################
+def fetch_result_files(chip, node):
+    '''
+    Helper method to fetch the result files of a node directly into the
+    build directory. Only files which are missing or differ locally are
+    transferred, and interrupted transfers are resumed.
+
+       Returns:
+       * True if the results were fetched.
+       * False if the server does not provide file manifests.
+    '''
+
+    manifest = fetch_result_files_request(chip, node)
+    if manifest is None:
+        return False
+
+    local_dir = chip.get('option', 'builddir')
+    for entry in manifest:
+        path = transfer.get_local_path(local_dir, entry)
+        if transfer.is_file_current(path, entry):
+            continue
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        code = fetch_result_file_request(chip, node, entry, path)
+        if code == 416:
+            # Retry once without the partial file
+            code = fetch_result_file_request(chip, node, entry, path)
+        if code:
+            chip.error(f"Sorry, something went wrong and your job results could not be retrieved. "
+                       f"(Response code: {code})", fatal=True)
+
+    return True
+
+
 ###################################
 def fetch_results(chip, node):
     '''
@@ -710,6 +957,10 @@ def fetch_results(chip, node):
     flowgraph node (e.g. "floorplan0")
     '''
 
+    # Fetch only the missing files of the node, if the server supports it.
+    if node and fetch_result_files(chip, node):
+        return
+
     # Collect local values.
     job_hash = chip.get('record', 'remoteid')
     local_dir = chip.get('option', 'builddir')
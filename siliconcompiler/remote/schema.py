@@ -2,7 +2,7 @@ from siliconcompiler.schema.schema_cfg import scparam
 from siliconcompiler.schema import Schema
 
 
-SCHEMA_VERSION = '0.0.1'
+SCHEMA_VERSION = '0.0.2'
 
 
 def schema_cfg():
@@ -65,6 +65,34 @@ def schema_cfg():
                      "api: server.set('option', 'auth', True)"],
             schelp="""Flag determining whether to enable authenticated and encrypted jobs.""")
 
+    scparam(cfg, ['option', 'maxjobs'],
+            sctype='int',
+            scope='global',
+            defvalue=2,
+            require='all',
+            shorthelp="Maximum number of jobs to run concurrently.",
+            switch="-maxjobs <int>",
+            example=["cli: -maxjobs 4",
+                     "api: server.set('option', 'maxjobs', 4)"],
+            schelp="""
+            Maximum number of jobs to run concurrently. Jobs submitted while
+            the limit is reached are queued and started in submission order.""")
+
+    scparam(cfg, ['option', 'maxuserjobs'],
+            sctype='int',
+            scope='global',
+            defvalue=1,
+            require='all',
+            shorthelp="Maximum number of jobs to run concurrently per user.",
+            switch="-maxuserjobs <int>",
+            example=["cli: -maxuserjobs 2",
+                     "api: server.set('option', 'maxuserjobs', 2)"],
+            schelp="""
+            Maximum number of jobs to run concurrently for each user. Jobs
+            submitted without a username are only limited by
+            ['option', 'maxjobs']. Jobs of other users can be started ahead
+            of queued jobs of a user which has reached the limit.""")
+
     scparam(cfg, ['option', 'cfg'],
             sctype='[file]',
             scope='job',
@@ -4,22 +4,29 @@ from aiohttp import web
 import asyncio
 import json
 import logging as log
+import multiprocessing
 import os
+import re
 import shutil
 import uuid
 import tarfile
 import sys
 import fastjsonschema
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 from pathlib import Path
 from fastjsonschema import JsonSchemaException
 import io
 
-from siliconcompiler import Chip, Schema
+from siliconcompiler import Chip, Schema, NodeStatus
+from siliconcompiler import archive as sc_archive
 from siliconcompiler._metadata import version as sc_version
 from siliconcompiler.schema import SCHEMA_VERSION as sc_schema_version
 from siliconcompiler.remote.schema import ServerSchema
 from siliconcompiler.remote import banner
-from siliconcompiler.scheduler.slurm import get_configuration_directory
+from siliconcompiler.remote import transfer
+from siliconcompiler.scheduler.backend import get_configuration_directory
+from siliconcompiler.utils import link_symlink_copy
 
 
 # Compile validation code for API request bodies.
@@ -50,6 +57,33 @@ with open(api_dir / 'delete_job.json') as schema:
 with open(api_dir / 'get_results.json') as schema:
     validate_get_results = fastjsonschema.compile(json.loads(schema.read()))
 
+# 'check_files': Check which input files are missing from the file store.
+with open(api_dir / 'check_files.json') as schema:
+    validate_check_files = fastjsonschema.compile(json.loads(schema.read()))
+
+# 'upload_file': Add an input file to the file store.
+# Currently, the 'file_hash' is included in the URL for this call.
+with open(api_dir / 'upload_file.json') as schema:
+    validate_upload_file = fastjsonschema.compile(json.loads(schema.read()))
+
+# Multiprocessing interface used to run jobs.
+multiprocessor = multiprocessing.get_context('spawn')
+
+# Chunk size used when streaming files.
+CHUNK_SIZE = 1024 * 1024
+
+# Seconds between checks of the node statuses of a running job.
+PROGRESS_INTERVAL = 1
+
+# Maximum number of seconds a progress request waits for a status change.
+MAX_PROGRESS_WAIT = 60
+
+# Number of node archives written concurrently once a job completes.
+ARCHIVE_JOBS = 4
+
+# File store used by all jobs when authentication is disabled.
+ANONYMOUS_FILE_STORE = 'anonymous'
+
 
 class Server:
     """
@@ -78,8 +112,12 @@ class Server:
 
         self.schema = ServerSchema(logger=self.logger)
 
-        # Set up a dictionary to track running jobs.
+        # Set up a dictionary to track queued and running jobs.
         self.sc_jobs = {}
+        # Jobs waiting for a free slot, in submission order.
+        self.job_queue = []
+        # Notified when the status of a job changes, created in the event loop.
+        self.__progress_condition = None
 
     def run(self):
         if not os.path.exists(self.nfs_mount):
@@ -116,14 +154,27 @@ class Server:
                                     "file in the server's working directory. "
                                     "(User : Key) mappings were not imported.")
 
+        # Start the async server.
+        web.run_app(self._create_app(), port=self.get('option', 'port'))
+
+    def _create_app(self):
+        '''
+        Returns the web application serving the API.
+        '''
+
         # Create a minimal web server to process the 'remote_run' API call.
         self.app = web.Application()
         self.app.add_routes([
             web.post('/remote_run/', self.handle_remote_run),
+            web.post('/check_files/', self.handle_check_files),
+            web.post('/upload_file/{file_hash:[0-9a-f]{64}}', self.handle_upload_file),
             web.post('/check_progress/', self.handle_check_progress),
             web.post('/check_server/', self.handle_check_server),
             web.post('/delete_job/', self.handle_delete_job),
             web.post('/get_results/{job_hash}.tar.gz', self.handle_get_results),
+            web.post('/get_results/{job_hash}/{node}/files.json', self.handle_get_result_files),
+            web.post('/get_results/{job_hash}/{node}/files/{file_hash}',
+                     self.handle_get_result_file),
         ])
         # TODO: Put zip files in a different directory.
         # For security reasons, this is not a good public-facing solution.
@@ -131,8 +182,7 @@ class Server:
         # But this is an example server which only implements a minimal API.
         self.app.router.add_static('/get_results/', self.nfs_mount)
 
-        # Start the async server.
-        web.run_app(self.app, port=self.get('option', 'port'))
+        return self.app
 
     def create_cmdline(self, progname, description=None, switchlist=None, additional_args=None):
         def print_banner():
@@ -159,6 +209,8 @@ class Server:
 
         # Temporary file path to store streamed data.
         tmp_file = os.path.join(self.nfs_mount, uuid.uuid4().hex)
+        # Manifest of input files which were uploaded to the file store.
+        files = None
 
         # Set up a multipart reader to read in the large file, and param data.
         reader = await request.multipart()
@@ -178,6 +230,10 @@ class Server:
                             break
                         f.write(chunk)
 
+            # Retrieve the manifest of the job's input files.
+            elif part.name == 'files':
+                files = await part.json()
+
             # Retrieve JSON request parameters.
             elif part.name == 'params':
                 # Get the job parameters.
@@ -210,14 +266,20 @@ class Server:
         job_dir = os.path.join(job_root, design, job_name)
         os.makedirs(job_dir, exist_ok=True)
 
-        # Move the uploaded archive and un-zip it.
-        # (Contents will be encrypted for authenticated jobs)
-        with tarfile.open(tmp_file, "r:gz") as tar:
-            tar.extractall(path=job_dir)
-
-        # Delete the temporary file if it still exists.
-        if os.path.exists(tmp_file):
-            os.remove(tmp_file)
+        if files is not None:
+            # Link the uploaded input files into the job directory.
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, _link_uploaded_files, self._get_file_store(job_params['username']),
+                    files, job_dir)
+            except (KeyError, TypeError, ValueError, FileNotFoundError) as e:
+                shutil.rmtree(job_root, ignore_errors=True)
+                return self.__response(f"Error: Invalid input files: {e}.", status=400)
+        elif os.path.exists(tmp_file):
+            # Move the uploaded archive and un-zip it.
+            # (Contents will be encrypted for authenticated jobs)
+            await asyncio.get_running_loop().run_in_executor(
+                None, _extract_upload, tmp_file, job_dir)
 
         # Create the working directory for the given 'job hash' if necessary.
         chip.set('option', 'builddir', job_root)
@@ -228,14 +290,91 @@ class Server:
         # Write JSON config to shared compute storage.
         os.makedirs(os.path.join(job_root, 'configs'), exist_ok=True)
 
-        # Run the job with the configured clustering option. (Non-blocking)
-        asyncio.ensure_future(self.remote_sc(chip, job_params['username']))
+        # Queue the job to run with the configured clustering option. (Non-blocking)
+        self.__queue_job(chip, job_params['username'])
 
         # Return a response to the client.
         return web.json_response({'message': f"Starting job: {job_hash}",
                                   'interval': 30,
                                   'job_hash': job_hash})
 
+    ####################
+    async def handle_check_files(self, request):
+        '''
+        API handler for 'check_files' requests. Returns the hashes of the input
+        files which are not in the file store yet, so clients only need to
+        upload those before starting a job.
+        '''
+
+        job_params, response = self._check_request(await request.json(),
+                                                   validate_check_files)
+        if response is not None:
+            return response
+
+        file_store = self._get_file_store(job_params['username'])
+
+        def missing():
+            return [file_hash for file_hash in dict.fromkeys(job_params.get('hashes', []))
+                    if not os.path.isfile(_get_stored_file(file_store, file_hash))]
+
+        return web.json_response({
+            'missing': await asyncio.get_running_loop().run_in_executor(None, missing)
+        })
+
+    ####################
+    async def handle_upload_file(self, request):
+        '''
+        API handler for 'upload_file' requests. Adds a single input file to
+        the file store of the user, which is shared by all their jobs.
+        '''
+
+        file_hash = request.match_info.get('file_hash', '')
+        tmp_file = os.path.join(self.file_store, uuid.uuid4().hex + transfer.PARTIAL_SUFFIX)
+        os.makedirs(self.file_store, exist_ok=True)
+
+        loop = asyncio.get_running_loop()
+        hashobj = hashlib.sha256()
+        job_params = None
+
+        reader = await request.multipart()
+        try:
+            while True:
+                part = await reader.next()
+                if part is None:
+                    break
+
+                if part.name == 'params':
+                    job_params, response = self._check_request(await part.json(),
+                                                               validate_upload_file)
+                    if response is not None:
+                        return response
+
+                # Only accept file data after the request was authenticated.
+                elif part.name == 'file' and job_params is not None:
+                    with open(tmp_file, 'wb') as f:
+                        while True:
+                            chunk = await part.read_chunk(CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            hashobj.update(chunk)
+                            await loop.run_in_executor(None, f.write, chunk)
+
+            if not os.path.isfile(tmp_file):
+                return self.__response("Error: file not provided.", status=400)
+
+            if hashobj.hexdigest() != file_hash:
+                return self.__response("Error: file does not match its hash.", status=400)
+
+            path = _get_stored_file(self._get_file_store(job_params['username']), file_hash)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Concurrent uploads of the same file store identical contents
+            os.replace(tmp_file, path)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+        return self.__response(f"Stored file: {file_hash}")
+
     ####################
     async def handle_get_results(self, request):
         '''
@@ -263,22 +402,102 @@ class Server:
         )
         await resp.prepare(request)
 
+        loop = asyncio.get_running_loop()
+
         zipfn = os.path.join(self.nfs_mount, job_hash, f'{job_hash}_{node}.tar.gz')
         if not node:
-            with tarfile.open(zipfn, 'w:gz') as tar:
-                text = "Done"
-                metadata_file = io.BytesIO(text.encode('ascii'))
-                tarinfo = tarfile.TarInfo(f'{job_hash}/done')
-                tarinfo.size = metadata_file.getbuffer().nbytes
-                tar.addfile(tarinfo=tarinfo, fileobj=metadata_file)
+            await loop.run_in_executor(None, _write_done_archive, zipfn, job_hash)
 
+        # Stream the archive without blocking the event loop on reads.
         with open(zipfn, 'rb') as zipf:
-            await resp.write(zipf.read())
+            while True:
+                chunk = await loop.run_in_executor(None, zipf.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                await resp.write(chunk)
 
         await resp.write_eof()
 
         return resp
 
+    ####################
+    async def handle_get_result_files(self, request):
+        '''
+        API handler for 'get_results' file manifest requests. Returns the path,
+        hash and size of each result file of a node, so clients only need to
+        fetch the files they do not already have.
+        '''
+
+        job_params, response = self._check_request(await request.json(),
+                                                   validate_get_results)
+        if response is not None:
+            return response
+
+        manifest = await self.__get_result_manifest(request.match_info.get('job_hash', ''),
+                                                    request.match_info.get('node', ''))
+        if manifest is None:
+            return self.__response("Error: results not found.", status=404)
+
+        return web.json_response(manifest)
+
+    ####################
+    async def handle_get_result_file(self, request):
+        '''
+        API handler for 'get_results' file requests. Files are addressed by
+        their hash, and HTTP range requests are supported to resume transfers.
+        '''
+
+        job_params, response = self._check_request(await request.json(),
+                                                   validate_get_results)
+        if response is not None:
+            return response
+
+        job_hash = request.match_info.get('job_hash', '')
+        manifest = await self.__get_result_manifest(job_hash,
+                                                    request.match_info.get('node', ''))
+        if manifest is None:
+            return self.__response("Error: results not found.", status=404)
+
+        file_hash = request.match_info.get('file_hash', '')
+        for entry in manifest:
+            if entry['hash'] == file_hash:
+                path = transfer.get_local_path(os.path.join(self.nfs_mount, job_hash), entry)
+                # Streams the file and handles the Range header
+                return web.FileResponse(path, chunk_size=CHUNK_SIZE)
+
+        return self.__response("Error: file not found.", status=404)
+
+    async def __get_result_manifest(self, job_hash, node):
+        '''
+        Returns the file manifest of a node, or None if it is not available.
+        '''
+
+        if not job_hash or not node:
+            return None
+
+        nfs_mount = os.path.realpath(self.nfs_mount)
+        manifest_path = os.path.realpath(_get_result_manifest_path(nfs_mount, job_hash, node))
+        if os.path.commonpath([nfs_mount, manifest_path]) != nfs_mount:
+            return None
+
+        job = self.sc_jobs.get(job_hash, None)
+        if job:
+            # Results of nodes which completed while the job is running,
+            # written once by the progress watcher
+            manifest_path = job['result_manifests'].get(node, None)
+            if not manifest_path:
+                return None
+
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, os.path.isfile, manifest_path):
+            return None
+
+        def load():
+            with open(manifest_path) as f:
+                return json.load(f)
+
+        return await loop.run_in_executor(None, load)
+
     ####################
     async def handle_delete_job(self, request):
         '''
@@ -294,10 +513,9 @@ class Server:
 
         job_hash = job_params['job_hash']
 
-        # Determine if the job is running.
-        for job in self.sc_jobs:
-            if job_hash in job:
-                return self.__response("Error: job is still running.", status=400)
+        # Determine if the job is queued or running.
+        if job_hash in self.sc_jobs:
+            return self.__response("Error: job is still running.", status=400)
 
         # Delete job hash directory, only if it exists.
         # TODO: This assumes no malicious input.
@@ -318,10 +536,14 @@ class Server:
     ####################
     async def handle_check_progress(self, request):
         '''
-        API handler for the 'check progress' endpoint. Currently,
-        It only returns a response containing a 'still running', 'done', or
-        'not found' message. In the future, it can respond with up-to-date
-        information about the job's progress and intermediary outputs.
+        API handler for the 'check progress' endpoint. It returns a response
+        containing a 'queued', 'running', or 'completed' status, and the
+        status of each node of running jobs.
+
+        If 'status_version' is provided and matches the current version of the
+        job status, the response is delayed until the status changes or 'wait'
+        seconds have passed, so clients are notified of node status changes as
+        they happen without polling.
         '''
 
         # Process input parameters
@@ -333,12 +555,37 @@ class Server:
         job_hash = job_params['job_hash']
         username = job_params['username']
 
+        job = self.sc_jobs.get(job_hash, None)
+        if job and job['username'] == username and \
+                job_params.get('status_version', -1) >= job['version']:
+            wait = min(job_params.get('wait', 0), MAX_PROGRESS_WAIT)
+
+            def changed():
+                return self.sc_jobs.get(job_hash, None) is not job or \
+                    job['version'] > job_params['status_version']
+
+            condition = self.__get_progress_condition()
+            async with condition:
+                try:
+                    await asyncio.wait_for(condition.wait_for(changed), wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            job = self.sc_jobs.get(job_hash, None)
+
         # Determine if the job is running.
-        # TODO: Return information about individual flowgraph nodes.
-        if "%s%s" % (username, job_hash) in self.sc_jobs:
+        if job and job['username'] == username and job['status'] == 'queued':
+            resp = {
+                'status': 'queued',
+                'message': 'Job is queued on the server.',
+                'status_version': job['version']
+            }
+        elif job and job['username'] == username:
             resp = {
                 'status': 'running',
                 'message': 'Job is currently running on the server.',
+                'status_version': job['version'],
+                **job['nodes']
             }
         else:
             resp = {
@@ -379,53 +626,121 @@ class Server:
 
         return web.json_response(resp)
 
+    ####################
+    def __queue_job(self, chip, username):
+        '''
+        Adds a job to the queue, and starts it if a slot is available.
+        '''
+
+        job_hash = chip.get('record', 'remoteid')
+        self.sc_jobs[job_hash] = {
+            'username': username,
+            'status': 'queued',
+            'nodes': {},
+            'result_manifests': {},
+            'version': 0,
+            'chip': chip
+        }
+        self.job_queue.append((chip, username))
+        self.__dispatch_jobs()
+
+    def __dispatch_jobs(self):
+        '''
+        Starts queued jobs while the server and user concurrency limits allow.
+        '''
+
+        running = [job for job in self.sc_jobs.values() if job['status'] == 'running']
+        for chip, username in list(self.job_queue):
+            if len(running) >= self.get('option', 'maxjobs'):
+                break
+
+            if username:
+                user_running = [job for job in running if job['username'] == username]
+                if len(user_running) >= self.get('option', 'maxuserjobs'):
+                    # Leave the job queued, but allow jobs of other users to start
+                    continue
+
+            self.job_queue.remove((chip, username))
+            job = self.sc_jobs[chip.get('record', 'remoteid')]
+            job['status'] = 'running'
+            job['version'] += 1
+            running.append(job)
+            asyncio.ensure_future(self.remote_sc(chip, username))
+
     ####################
     async def remote_sc(self, chip, username):
         '''
         Async method to delegate an '.run()' command to a host,
         and send an email notification when the job completes.
+        The job runs in a separate process, so the server keeps handling
+        requests while it runs.
         '''
 
         # Assemble core job parameters.
         job_hash = chip.get('record', 'remoteid')
-        job_nameid = chip.get('option', 'jobname')
-
-        # Mark the job run as busy.
-        if username:
-            sc_job_name = f'{username}_{job_hash}_{job_nameid}'
-        else:
-            sc_job_name = f'{job_hash}_{job_nameid}'
-        self.sc_jobs[sc_job_name] = 'busy'
 
         build_dir = os.path.join(self.nfs_mount, job_hash)
         chip.set('option', 'builddir', build_dir)
         chip.set('option', 'remote', False)
 
-        job_cfg_dir = get_configuration_directory(chip)
-        os.makedirs(job_cfg_dir, exist_ok=True)
-        chip.write_manifest(f"{job_cfg_dir}/chip{chip.get('option', 'jobname')}.json")
-
         if self.get('option', 'cluster') == 'slurm':
             # Run the job with slurm clustering.
             chip.set('option', 'scheduler', 'name', 'slurm')
 
-        # Run the job.
-        chip.run()
-
-        # Archive each task.
-        for (step, index) in chip.nodes_to_execute():
-            chip.cwd = os.path.join(chip.get('option', 'builddir'), '..')
-            tf = tarfile.open(os.path.join(self.nfs_mount,
-                                           job_hash,
-                                           f'{job_hash}_{step}{index}.tar.gz'),
-                              mode='w:gz')
-            chip._archive_node(tf, step=step, index=index)
-            tf.close()
-
-        # (Email notifications can be sent here using your preferred API)
+        job_proc = multiprocessor.Process(target=_run_job,
+                                          args=(chip, self.nfs_mount))
+        job_proc.start()
+        watcher = asyncio.ensure_future(self.__watch_progress(chip, self.sc_jobs[job_hash]))
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, job_proc.join)
+            if job_proc.exitcode != 0:
+                self.logger.error(f'Job {job_hash} failed with exit code {job_proc.exitcode}')
+        finally:
+            watcher.cancel()
+
+            # (Email notifications can be sent here using your preferred API)
+
+            # Mark the job hash as being done, and start the next queued jobs.
+            self.sc_jobs.pop(job_hash)
+            await self.__notify_progress()
+            self.__dispatch_jobs()
+
+    async def __watch_progress(self, chip, job):
+        '''
+        Tracks the node statuses of a running job, and notifies waiting
+        progress requests when they change.
+        '''
 
-        # Mark the job hash as being done.
-        self.sc_jobs.pop(sc_job_name)
+        loop = asyncio.get_running_loop()
+        job_hash = chip.get('record', 'remoteid')
+        nodes = chip.nodes_to_execute()
+        node_names = {f'{step}{index}': (step, index) for step, index in nodes}
+        cache = {}
+        while True:
+            statuses = await loop.run_in_executor(None, _get_node_statuses, chip, nodes, cache)
+            for node, status in statuses.items():
+                if status['status'] != 'completed' or node in job['result_manifests']:
+                    continue
+                # Record the result files before the completion is reported,
+                # so clients can fetch them while the job runs
+                step, index = node_names[node]
+                job['result_manifests'][node] = await loop.run_in_executor(
+                    None, _write_result_manifest, chip, self.nfs_mount, job_hash, step, index)
+            if statuses != job['nodes']:
+                job['nodes'] = statuses
+                job['version'] += 1
+                await self.__notify_progress()
+            await asyncio.sleep(PROGRESS_INTERVAL)
+
+    def __get_progress_condition(self):
+        if not self.__progress_condition:
+            self.__progress_condition = asyncio.Condition()
+        return self.__progress_condition
+
+    async def __notify_progress(self):
+        condition = self.__get_progress_condition()
+        async with condition:
+            condition.notify_all()
 
     ####################
     def __auth_password(self, username, password):
@@ -480,6 +795,27 @@ class Server:
         # Ensure that NFS mounting path is absolute.
         return os.path.abspath(self.get('option', 'nfsmount'))
 
+    @property
+    def file_store(self):
+        # Content-addressed input files, shared by all jobs of a user.
+        return os.path.join(self.nfs_mount, 'files')
+
+    def _get_file_store(self, username):
+        '''
+        Returns the file store of a user. Jobs can only use files uploaded
+        by their user, so file hashes cannot be used to read the files of
+        other users.
+        '''
+
+        if not self.get('option', 'auth') or not username:
+            # Users cannot be told apart without authentication
+            return os.path.join(self.file_store, ANONYMOUS_FILE_STORE)
+
+        if username not in self.user_keys or os.path.basename(username) != username or \
+                username in (os.curdir, os.pardir):
+            raise ValueError(f'{username} is not a valid user')
+        return os.path.join(self.file_store, 'users', username)
+
     def get(self, *keypath, field='value'):
         return self.schema.get(*keypath, field=field)
 
@@ -495,3 +831,161 @@ class Server:
     def write_configuration(self, filepath):
         with open(filepath, 'w') as f:
             self.schema.write_json(f)
+
+
+###################
+def _extract_upload(tmp_file, job_dir):
+    '''
+    Extracts an uploaded job archive and removes it.
+    '''
+
+    with tarfile.open(tmp_file, "r:gz") as tar:
+        tar.extractall(path=job_dir)
+
+    # Delete the temporary file if it still exists.
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+
+def _get_stored_file(file_store, file_hash):
+    '''
+    Returns the path of a file in the file store.
+    '''
+
+    return os.path.join(file_store, file_hash[:2], file_hash)
+
+
+def _link_uploaded_files(file_store, files, job_dir):
+    '''
+    Links the files of an upload manifest from the file store into job_dir.
+    '''
+
+    for entry in files:
+        if not re.fullmatch('[0-9a-f]{64}', entry['hash']):
+            raise ValueError(f'{entry["hash"]} is not a valid file hash')
+        src = _get_stored_file(file_store, entry['hash'])
+        if not os.path.isfile(src):
+            raise FileNotFoundError(f'{entry["path"]} was not uploaded')
+
+        dst = transfer.get_local_path(job_dir, entry)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if os.path.lexists(dst):
+            os.remove(dst)
+        link_symlink_copy(src, dst)
+
+
+def _write_done_archive(zipfn, job_hash):
+    '''
+    Writes the archive returned once all the results of a job are fetched.
+    '''
+
+    with tarfile.open(zipfn, 'w:gz') as tar:
+        text = "Done"
+        metadata_file = io.BytesIO(text.encode('ascii'))
+        tarinfo = tarfile.TarInfo(f'{job_hash}/done')
+        tarinfo.size = metadata_file.getbuffer().nbytes
+        tar.addfile(tarinfo=tarinfo, fileobj=metadata_file)
+
+
+def _get_node_statuses(chip, nodes, cache):
+    '''
+    Returns the status of each node of a running job, as reported by
+    the 'check_progress' endpoint.
+
+    Args:
+        chip (Chip): Chip of the job.
+        nodes (list of (step, index)): Nodes of the job.
+        cache (dict): Statuses read from node manifests, keyed on the manifest
+            path and modification time. Updated in place.
+    '''
+
+    flow = chip.get('option', 'flow')
+    statuses = {}
+    for step, index in nodes:
+        workdir = chip._getworkdir(step=step, index=index)
+        manifest = os.path.join(workdir, 'outputs', f'{chip.design}.pkg.json')
+
+        status = 'pending'
+        if os.path.isfile(manifest):
+            key = (manifest, os.path.getmtime(manifest))
+            if key not in cache:
+                try:
+                    cache[key] = Schema(manifest=manifest).get('flowgraph', flow, step, index,
+                                                               'status')
+                except Exception:
+                    # Manifest is still being written
+                    pass
+            # Tasks may link their input manifest into outputs while running
+            status = {NodeStatus.SUCCESS: 'completed',
+                      NodeStatus.ERROR: 'failed'}.get(cache.get(key, None), 'running')
+        elif os.path.isdir(workdir):
+            status = 'running'
+
+        statuses[f'{step}{index}'] = {'status': status}
+    return statuses
+
+
+def _run_job(chip, nfs_mount):
+    '''
+    Runs a job and archives each of its tasks. This is the target of the
+    process started for each job.
+    '''
+
+    job_hash = chip.get('record', 'remoteid')
+
+    job_cfg_dir = get_configuration_directory(chip)
+    os.makedirs(job_cfg_dir, exist_ok=True)
+    chip.write_manifest(f"{job_cfg_dir}/chip{chip.get('option', 'jobname')}.json")
+
+    # Run the job.
+    chip.run()
+
+    # Archive each task.
+    chip.cwd = os.path.join(chip.get('option', 'builddir'), '..')
+
+    def archive_node(step, index):
+        with sc_archive.open_archive(os.path.join(nfs_mount,
+                                                  job_hash,
+                                                  f'{job_hash}_{step}{index}.tar.gz'),
+                                     executor=compress_pool) as tf:
+            chip._archive_node(tf, step=step, index=index)
+
+        # Record the result files, so clients can fetch them individually,
+        # unless the progress watcher already did so when the node completed
+        if not os.path.isfile(_get_result_manifest_path(nfs_mount, job_hash, f'{step}{index}')):
+            _write_result_manifest(chip, nfs_mount, job_hash, step, index)
+
+    # Nodes are archived concurrently, and share the threads used for compression.
+    with ThreadPoolExecutor() as compress_pool, \
+            ThreadPoolExecutor(max_workers=ARCHIVE_JOBS) as archive_pool:
+        archives = [archive_pool.submit(archive_node, step, index)
+                    for step, index in chip.nodes_to_execute()]
+        for archive in archives:
+            archive.result()
+
+
+def _get_result_manifest_path(nfs_mount, job_hash, node):
+    '''
+    Returns the path of the result file manifest of a node.
+    '''
+
+    return os.path.join(nfs_mount, job_hash, f'{job_hash}_{node}.files.json')
+
+
+def _write_result_manifest(chip, nfs_mount, job_hash, step, index):
+    '''
+    Writes the manifest of the result files of a node, which are the files
+    included in its archive.
+    '''
+
+    workdir = chip._getworkdir(step=step, index=index)
+    paths = [os.path.join(workdir, 'reports'),
+             os.path.join(workdir, 'outputs'),
+             os.path.join(workdir, f'{step}.log')]
+    if chip.get('option', 'deltamanifest'):
+        # Delta output manifests are reconstructed from the inputs manifest
+        paths.append(os.path.join(workdir, 'inputs', f'{chip.get("design")}.pkg.json'))
+
+    manifest = _get_result_manifest_path(nfs_mount, job_hash, f'{step}{index}')
+    transfer.write_file_manifest(manifest, chip.get('option', 'builddir'), paths)
+    return manifest
@@ -0,0 +1,105 @@
+# Copyright 2024 Silicon Compiler Authors. All Rights Reserved.
+
+import hashlib
+import json
+import os
+import uuid
+
+# Block size used when hashing and copying files.
+BLOCK_SIZE = 1024 * 1024
+
+# Suffix of partially transferred files.
+PARTIAL_SUFFIX = '.sc_partial'
+
+
+def hash_file(path):
+    '''
+    Returns the sha256 hash of a file.
+
+    Args:
+        path (str): Path to the file.
+    '''
+    hashobj = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+            hashobj.update(block)
+    return hashobj.hexdigest()
+
+
+def get_file_manifest(root, paths):
+    '''
+    Returns the files found under paths, with their hash and size.
+
+    Args:
+        root (str): Directory the returned paths are relative to.
+        paths (list of str): Files and directories to include. Directories
+            are included recursively, and missing paths are ignored.
+
+    Returns:
+        List of dictionaries with the 'path', 'hash' and 'size' of each file.
+    '''
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+        elif os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                files.extend([os.path.join(dirpath, filename) for filename in filenames])
+
+    manifest = []
+    for path in sorted(files):
+        manifest.append({
+            'path': os.path.relpath(path, root).replace(os.sep, '/'),
+            'hash': hash_file(path),
+            'size': os.path.getsize(path)
+        })
+    return manifest
+
+
+def write_file_manifest(filename, root, paths):
+    '''
+    Writes the file manifest of paths to filename.
+
+    Args:
+        filename (str): Path to the manifest to write.
+        root (str): Directory the manifest paths are relative to.
+        paths (list of str): Files and directories to include.
+    '''
+    manifest = get_file_manifest(root, paths)
+
+    # Unique name, since the manifest may be written by several processes
+    tmp_filename = f'{filename}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}'
+    with open(tmp_filename, 'w') as f:
+        json.dump(manifest, f)
+    # Readers should never see a partially written manifest
+    os.replace(tmp_filename, filename)
+
+
+def is_file_current(path, entry):
+    '''
+    Returns True if the file at path matches the manifest entry.
+
+    Args:
+        path (str): Path to the local file.
+        entry (dict): Manifest entry of the file.
+    '''
+    if not os.path.isfile(path):
+        return False
+    if os.path.getsize(path) != entry['size']:
+        return False
+    return hash_file(path) == entry['hash']
+
+
+def get_local_path(root, entry):
+    '''
+    Returns the local path of a manifest entry, ensuring it is within root.
+
+    Args:
+        root (str): Directory the manifest paths are relative to.
+        entry (dict): Manifest entry of the file.
+    '''
+    root = os.path.abspath(root)
+    path = os.path.abspath(os.path.join(root, *entry['path'].split('/')))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f'{entry["path"]} is outside of {root}')
+    return path
@@ -82,7 +82,8 @@ if 'job' not in streamlit.session_state:
     for file_path in config['graph_chips']:
         graph_chip = Chip(design='')
         graph_chip.read_manifest(file_path)
-        chip.schema.cfg['history'][os.path.basename(file_path)] = graph_chip.schema.cfg
+        graph_job = os.path.basename(file_path)
+        chip.schema._import_history(graph_job, graph_chip.schema.getdict())
     streamlit.set_page_config(page_title=f'{chip.design} dashboard',
                               page_icon=Image.open(SC_LOGO_PATH), layout="wide",
                               menu_items=SC_MENU)
@@ -366,7 +367,7 @@ def manifest_module(chip, manifest, ui_width, max_num_of_keys_to_show=20,
         streamlit.markdown('')
         if streamlit.checkbox('Raw manifest',
                               help='Click here to see the JSON before it was made more readable'):
-            manifest_to_show = chip.schema.cfg
+            manifest_to_show = chip.schema.getdict()
         else:
             manifest_to_show = manifest
     with key_search_col:
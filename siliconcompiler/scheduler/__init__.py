@@ -3,7 +3,9 @@ import distro
 import getpass
 import netifaces
 import multiprocessing
+import multiprocessing.connection
 import os
+import pickle
 import platform
 import psutil
 import re
@@ -22,7 +24,13 @@ from siliconcompiler import utils
 from siliconcompiler import _metadata
 from siliconcompiler.remote import client
 from siliconcompiler.schema import Schema
-from siliconcompiler.scheduler import slurm
+from siliconcompiler.scheduler import backend
+from siliconcompiler.scheduler import nodecache
+from siliconcompiler.scheduler import slurm  # noqa F401, registers the slurm backend
+from siliconcompiler.scheduler import limits
+from siliconcompiler.scheduler import pool
+from siliconcompiler.scheduler import resources
+from siliconcompiler.scheduler import toolprocess
 from siliconcompiler import NodeStatus, SiliconCompilerError
 from siliconcompiler.flowgraph import _get_flowgraph_nodes, _get_flowgraph_execution_order, \
     _get_pruned_node_inputs, _get_flowgraph_node_inputs, _get_flowgraph_entry_nodes, \
@@ -30,6 +38,10 @@ from siliconcompiler.flowgraph import _get_flowgraph_nodes, _get_flowgraph_execu
     get_nodes_from
 from siliconcompiler.tools._common import input_file_node_name
 
+# Tasktimes recorded in the manifests of previous jobs, by manifest path,
+# see _get_manifest_tasktimes()
+_manifest_tasktimes = {}
+
 
 ###############################################################################
 class SiliconCompilerTimeout(Exception):
@@ -256,6 +268,8 @@ def _local_process(chip, flow, status):
     try:
         _launch_nodes(chip, nodes_to_run, processes, local_processes, status)
     except KeyboardInterrupt:
+        # Jobs submitted to job schedulers would outlive this process
+        backend.cancel_tasks(processes.values())
         # exit immediately
         sys.exit(0)
 
@@ -393,6 +407,13 @@ def _runtask(chip, flow, step, index, status, exec_func, replay=False):
 
     chip._init_logger(step, index, in_run=True)
 
+    if chip.get('option', 'deltamanifest'):
+        # Every node starts from the same configuration, which is already
+        # known to readers of the node manifest, so only the changes are
+        # written. Copies share the configuration, so only the parts this
+        # node modifies are compared.
+        chip._manifest_start = chip.schema.copy()
+
     # Make record of sc version and machine
     __record_version(chip, step, index)
     # Record user information if enabled
@@ -417,15 +438,46 @@ def _runtask(chip, flow, step, index, status, exec_func, replay=False):
     os.chdir(cwd)
 
 
+def _runtask_from_state(chip_state, flow, step, index, status, exec_func, replay=False):
+    '''
+    Restores a chip serialized by _prepare_nodes() and runs the node.
+    '''
+    chip = pickle.loads(chip_state)
+    _runtask(chip, flow, step, index, status, exec_func, replay=replay)
+
+
 ###########################################################################
 def _haltstep(chip, flow, step, index, log=True):
     if log:
         chip.logger.error(f"Halting step '{step}' index '{index}' due to errors.")
     chip.set('flowgraph', flow, step, index, 'status', NodeStatus.ERROR)
-    chip.write_manifest(os.path.join("outputs", f"{chip.get('design')}.pkg.json"))
+    _write_output_manifest(chip)
     sys.exit(1)
 
 
+def _write_output_manifest(chip):
+    '''
+    Writes the node manifest into outputs, which only records the changes
+    since the node was started if ['option', 'deltamanifest'] is set.
+    '''
+    design = chip.get('design')
+    manifest = os.path.join("outputs", f"{design}.pkg.json")
+
+    if not chip._manifest_base:
+        chip.write_manifest(manifest)
+        return
+
+    # Tasks may link their inputs into outputs, so make sure the base
+    # manifest is not overwritten through a link
+    if os.path.lexists(manifest):
+        os.remove(manifest)
+
+    with open(manifest, 'w') as f:
+        chip.schema.write_delta_json(f, chip._manifest_base,
+                                     os.path.join('..', 'inputs', f'{design}.pkg.json'),
+                                     start=chip._manifest_start)
+
+
 def _setupnode(chip, flow, step, index, status, replay):
     _merge_input_dependencies_manifests(chip, step, index, status, replay)
 
@@ -435,6 +487,9 @@ def _setupnode(chip, flow, step, index, status, replay):
     chip.set('arg', 'step', step, clobber=True)
     chip.set('arg', 'index', index, clobber=True)
     chip.write_manifest(f'inputs/{chip.get("design")}.pkg.json')
+    if chip._manifest_start:
+        # Output manifests are reconstructed from the inputs manifest
+        chip._manifest_base = chip.schema.copy()
 
     _select_inputs(chip, step, index)
     _copy_previous_steps_output_data(chip, step, index, replay)
@@ -563,19 +618,6 @@ def _copy_previous_steps_output_data(chip, step, index, replay):
                     os.rename(f'inputs/{outfile.name}', f'inputs/{new_name}')
 
 
-def __read_std_streams(chip, quiet, is_stdout_log, stdout_reader, is_stderr_log, stderr_reader):
-    '''
-    Handle directing tool outputs to logger
-    '''
-    if not quiet:
-        if is_stdout_log:
-            for line in stdout_reader.readlines():
-                chip.logger.info(line.rstrip())
-        if is_stderr_log:
-            for line in stderr_reader.readlines():
-                chip.logger.error(line.rstrip())
-
-
 #######################################
 def _makecmd(chip, tool, task, step, index, script_name='replay.sh', include_path=True):
     '''
@@ -714,8 +756,8 @@ def _run_executable_or_builtin(chip, step, index, version, toolpath, workdir, ru
         chip.get('option', 'breakpoint', step=step, index=index)
     )
 
-    # TODO: Currently no memory usage tracking in breakpoints, builtins, or unexpected errors.
-    max_mem_bytes = 0
+    # TODO: Currently no resource usage tracking in breakpoints, builtins, or unexpected errors.
+    monitor = None
 
     retcode = 0
     cmdlist = []
@@ -790,93 +832,76 @@ def _run_executable_or_builtin(chip, step, index, version, toolpath, workdir, ru
                                   'Use [log|output|none].')
                 _haltstep(chip, flow, step, index)
 
-            with open(stdout_file, 'w') as stdout_writer, \
-                    open(stdout_file, 'r', errors='replace_with_warning') as stdout_reader, \
-                    open(stderr_file, 'w') as stderr_writer, \
-                    open(stderr_file, 'r', errors='replace_with_warning') as stderr_reader:
-                # Use separate reader/writer file objects as hack to display
-                # live output in non-blocking way, so we can monitor the
-                # timeout. Based on https://stackoverflow.com/a/18422264.
-                is_stdout_log = chip.get('tool', tool, 'task', task, 'stdout', 'destination',
-                                         step=step, index=index) == 'log'
-                is_stderr_log = stderr_destination == 'log' and stderr_file != stdout_file
-                # if STDOUT and STDERR are to be redirected to the same file,
-                # use a single writer
-                if stderr_file == stdout_file:
-                    stderr_writer.close()
-                    stderr_reader.close()
-                    stderr_writer = subprocess.STDOUT
-
-                preexec_fn = None
-                nice = None
-                if __is_posix():
-                    nice = chip.get('option', 'nice', step=step, index=index)
-
-                    def set_nice():
-                        os.nice(nice)
+            # Output sent to the log is also displayed, unless quiet
+            is_stdout_log = stdout_destination == 'log' and not quiet
+            is_stderr_log = stderr_destination == 'log' and not quiet
 
+            preexec_fn = None
+            nice = None
+            limiter = None
+            node_limits = limits.get_limits(chip, step, index)
+            if __is_posix():
+                nice = chip.get('option', 'nice', step=step, index=index)
+                if node_limits:
+                    limiter = limits.ResourceLimiter(node_limits, f'{step}{index}', chip.logger)
+
+                def set_nice_and_limits():
                     if nice:
-                        preexec_fn = set_nice
-
-                cmd_start_time = time.time()
-                proc = subprocess.Popen(cmdlist,
-                                        stdout=stdout_writer,
-                                        stderr=stderr_writer,
-                                        preexec_fn=preexec_fn)
-                # How long to wait for proc to quit on ctrl-c before force
-                # terminating.
-                POLL_INTERVAL = 0.1
-                MEMORY_WARN_LIMIT = 90
-                try:
-                    while proc.poll() is None:
-                        # Gather subprocess memory usage.
-                        try:
-                            pproc = psutil.Process(proc.pid)
-                            proc_mem_bytes = pproc.memory_full_info().uss
-                            for child in pproc.children(recursive=True):
-                                proc_mem_bytes += child.memory_full_info().uss
-                            max_mem_bytes = max(max_mem_bytes, proc_mem_bytes)
-
-                            memory_usage = psutil.virtual_memory()
-                            if memory_usage.percent > MEMORY_WARN_LIMIT:
-                                chip.logger.warn(
-                                    f'Current system memory usage is {memory_usage.percent}%')
-
-                                # increase limit warning
-                                MEMORY_WARN_LIMIT = int(memory_usage.percent + 1)
-                        except psutil.Error:
-                            # Process may have already terminated or been killed.
-                            # Retain existing memory usage statistics in this case.
-                            pass
-                        except PermissionError:
-                            # OS is preventing access to this information so it cannot
-                            # be collected
-                            pass
-
-                        # Loop until process terminates
-                        __read_std_streams(chip,
-                                           quiet,
-                                           is_stdout_log, stdout_reader,
-                                           is_stderr_log, stderr_reader)
-
-                        if timeout is not None and time.time() - cmd_start_time > timeout:
-                            chip.logger.error(f'Step timed out after {timeout} seconds')
-                            utils.terminate_process(proc.pid)
-                            raise SiliconCompilerTimeout(f'{step}{index} timeout')
-                        time.sleep(POLL_INTERVAL)
-                except KeyboardInterrupt:
-                    kill_process(chip, proc, tool, 5 * POLL_INTERVAL, msg="Received ctrl-c. ")
-                    _haltstep(chip, flow, step, index, log=False)
-                except SiliconCompilerTimeout:
-                    kill_process(chip, proc, tool, 5 * POLL_INTERVAL)
-                    chip._error = True
-
-                # Read the remaining
-                __read_std_streams(chip,
-                                   quiet,
-                                   is_stdout_log, stdout_reader,
-                                   is_stderr_log, stderr_reader)
-                retcode = proc.returncode
+                        os.nice(nice)
+                    if limiter:
+                        limiter.apply()
+
+                if nice or limiter:
+                    preexec_fn = set_nice_and_limits
+            elif node_limits:
+                chip.logger.warning('Resource limits are not supported on this platform '
+                                    'and will not be applied')
+
+            try:
+                with toolprocess.ToolProcess(cmdlist, stdout_file, stderr_file, chip.logger,
+                                             log_stdout=is_stdout_log,
+                                             log_stderr=is_stderr_log,
+                                             preexec_fn=preexec_fn) as tool_proc:
+                    proc = tool_proc.proc
+                    cgroup = None
+                    if limiter and limiter.cgroup and resources.read_cgroup(limiter.cgroup):
+                        # The group also accounts for processes which exited
+                        cgroup = limiter.cgroup
+                    monitor = resources.ResourceMonitor(proc.pid,
+                                                        path=f'{step}.resources.csv',
+                                                        cgroup=cgroup,
+                                                        logger=chip.logger)
+                    monitor.start()
+                    # How long to wait for proc to quit on ctrl-c before force
+                    # terminating.
+                    POLL_INTERVAL = 0.1
+                    try:
+                        tool_proc.wait(timeout=timeout)
+                    except KeyboardInterrupt:
+                        kill_process(chip, proc, tool, 5 * POLL_INTERVAL,
+                                     msg="Received ctrl-c. ")
+                        _haltstep(chip, flow, step, index, log=False)
+                    except subprocess.TimeoutExpired:
+                        chip.logger.error(f'Step timed out after {timeout} seconds')
+                        chip.set('record', 'resourcelimit', 'timeout', step=step, index=index)
+                        utils.terminate_process(proc.pid)
+                        kill_process(chip, proc, tool, 5 * POLL_INTERVAL)
+                        chip._error = True
+                    finally:
+                        monitor.stop()
+
+                    retcode = proc.returncode
+
+                if limiter and limiter.exceeded() == 'memory':
+                    chip.logger.error(f'{tool} exceeded its memory limit of '
+                                      f'{node_limits["memory"]} MB')
+                    chip.set('record', 'resourcelimit', 'memory', step=step, index=index)
+                elif retcode != 0 and limiter and not limiter.cgroup and 'memory' in node_limits:
+                    chip.logger.warning(f'{tool} may have exceeded its memory limit of '
+                                        f'{node_limits["memory"]} MB')
+            finally:
+                if limiter:
+                    limiter.close()
 
     if retcode != 0:
         msg = f'Command failed with code {retcode}.'
@@ -892,8 +917,18 @@ def _run_executable_or_builtin(chip, step, index, version, toolpath, workdir, ru
         chip.logger.warning(msg)
         chip._error = True
 
-    # Capture memory usage
-    chip._record_metric(step, index, 'memory', max_mem_bytes, source=None, source_unit='B')
+    # Capture resource usage
+    if monitor:
+        chip._record_metric(step, index, 'memory', monitor.peak_memory,
+                            source=None, source_unit='B')
+        chip._record_metric(step, index, 'peakrss', monitor.peak_rss,
+                            source=None, source_unit='B')
+        chip._record_metric(step, index, 'cpuutilization', round(monitor.cpu_utilization, 1),
+                            source=None, source_unit='%')
+        chip._record_metric(step, index, 'iobytes', monitor.read_bytes + monitor.write_bytes,
+                            source=None, source_unit='B')
+    else:
+        chip._record_metric(step, index, 'memory', 0, source=None, source_unit='B')
 
 
 def _post_process(chip, step, index):
@@ -944,6 +979,15 @@ def _executenode(chip, step, index):
     run_func = getattr(chip._get_task_module(step, index, flow=flow), 'run', None)
     (toolpath, version) = _check_tool_version(chip, step, index, run_func)
 
+    cache_key = None
+    if nodecache.get_cache_dir(chip, step, index):
+        cache_key = nodecache.get_node_key(chip, step, index, version)
+        if nodecache.restore_node(chip, step, index, cache_key):
+            chip.set('record', 'nodecache', 'hit', step=step, index=index)
+            _finalizenode(chip, step, index, cached=True)
+            return
+        chip.set('record', 'nodecache', 'miss', step=step, index=index)
+
     # Write manifest (tool interface) (Don't move this!)
     _write_task_manifest(chip, tool)
 
@@ -962,6 +1006,9 @@ def _executenode(chip, step, index):
 
     _finalizenode(chip, step, index)
 
+    if cache_key:
+        nodecache.store_node(chip, step, index, cache_key)
+
 
 def _pre_process(chip, step, index):
     flow = chip.get('option', 'flow')
@@ -1077,7 +1124,7 @@ def _hash_files(chip, step, index, setup=False):
                     chip.hash_files(*args, step=step, index=index, check=False, allow_cache=True)
 
 
-def _finalizenode(chip, step, index):
+def _finalizenode(chip, step, index, cached=False):
     flow = chip.get('option', 'flow')
     tool, task = chip._get_tool_task(step, index, flow)
     quiet = (
@@ -1086,7 +1133,9 @@ def _finalizenode(chip, step, index):
     )
     run_func = getattr(chip._get_task_module(step, index, flow=flow), 'run', None)
 
-    _check_logfile(chip, step, index, quiet, run_func)
+    if not cached:
+        # Results restored from the node cache already include the log metrics
+        _check_logfile(chip, step, index, quiet, run_func)
     _hash_files(chip, step, index)
 
     # Capture wall runtime and cpu cores
@@ -1099,7 +1148,7 @@ def _finalizenode(chip, step, index):
 
     # Save a successful manifest
     chip.set('flowgraph', flow, step, index, 'status', NodeStatus.SUCCESS)
-    chip.write_manifest(os.path.join("outputs", f"{chip.get('design')}.pkg.json"))
+    _write_output_manifest(chip)
 
     # Stop if there are errors
     errors = chip.get('metric', 'errors', step=step, index=index)
@@ -1219,6 +1268,13 @@ def _prepare_nodes(chip, nodes_to_run, processes, local_processes, flow, status)
     # Ensure we use spawn for multiprocessing so loggers initialized correctly
     jobname = chip.get('option', 'jobname')
     multiprocessor = multiprocessing.get_context('spawn')
+
+    # Serialize the chip once and hand the same state to every node process,
+    # instead of pickling the full schema again for each process started.
+    chip_state = None
+    pool_job = None
+    # Monitors of the backends nodes are run on, by scheduler name
+    monitors = {}
     for (step, index) in chip.nodes_to_execute(flow):
         node = (step, index)
 
@@ -1234,17 +1290,40 @@ def _prepare_nodes(chip, nodes_to_run, processes, local_processes, flow, status)
 
         exec_func = _executenode
 
-        if chip.get('option', 'scheduler', 'name', step=step, index=index) and \
+        scheduler = chip.get('option', 'scheduler', 'name', step=step, index=index)
+        if scheduler and \
            _get_flowgraph_node_inputs(chip, chip.get('option', 'flow'), (step, index)):
             # Defer job to compute node
             # If the job is configured to run on a cluster, collect the schema
             # and send it to a compute node for deferred execution.
-            exec_func = slurm._defernode
+            exec_func = backend.prepare_node
         else:
             local_processes.append((step, index))
 
-        processes[node] = multiprocessor.Process(target=_runtask,
-                                                 args=(chip, flow, step, index, status, exec_func))
+        if chip_state is None:
+            chip_state = pickle.dumps(chip, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if chip.get('option', 'scheduler', 'workerpool') and exec_func is _executenode:
+            if pool_job is None:
+                worker_pool = pool.get_pool()
+                worker_pool.resize(_get_max_parallel_run(chip))
+                pool_job = worker_pool.job(chip_state)
+            processes[node] = pool_job.task(flow, step, index, status, exec_func)
+        else:
+            processes[node] = multiprocessor.Process(target=_runtask_from_state,
+                                                     args=(chip_state, flow, step, index, status,
+                                                           exec_func))
+
+        if exec_func is backend.prepare_node:
+            # The node is prepared locally, then submitted and tracked along
+            # with all the other jobs of the run on the same backend.
+            if scheduler not in monitors:
+                try:
+                    monitors[scheduler] = backend.BackendMonitor(
+                        backend.get_backend(scheduler)(chip))
+                except ValueError as e:
+                    chip.error(str(e), fatal=True)
+            processes[node] = monitors[scheduler].task(step, index, processes[node])
 
 
 def _check_node_dependencies(chip, node, deps, status, deps_was_successful):
@@ -1271,23 +1350,151 @@ def _check_node_dependencies(chip, node, deps, status, deps_was_successful):
         status[node] = NodeStatus.ERROR
 
 
-def _launch_nodes(chip, nodes_to_run, processes, local_processes, status):
-    running_nodes = {}
+def _get_max_parallel_run(chip):
+    '''
+    Returns the maximum number of nodes to run concurrently on this machine.
+    '''
     max_parallel_run = chip.get('option', 'scheduler', 'maxnodes')
     max_threads = os.cpu_count()
     if not max_parallel_run:
         max_parallel_run = max_threads
 
     # clip max parallel jobs to 1 <= jobs <= max_threads
-    max_parallel_run = max(1, min(max_parallel_run, max_threads))
+    return max(1, min(max_parallel_run, max_threads))
+
+
+def _get_node_memory(chip, step, index):
+    '''
+    Returns the expected peak memory of a node in bytes, or None if unknown.
+
+    The memory requested in ['option', 'scheduler', 'memory'] is used if set,
+    otherwise the largest memory metric recorded for the node by this job or
+    the jobs in its history.
+    '''
+    requested = chip.get('option', 'scheduler', 'memory', step=step, index=index)
+    if requested:
+        # Memory is in binary megabytes, as with the slurm '--mem' switch
+        return requested * 1024 * 1024
+
+    recorded = [chip.get('metric', 'memory', step=step, index=index)]
+    for job in chip.getkeys('history'):
+        # History only contains the metrics recorded by the job
+        if chip.valid('history', job, 'metric', 'memory'):
+            recorded.append(chip.get('history', job, 'metric', 'memory', step=step, index=index))
+    recorded = [memory for memory in recorded if memory]
+    if not recorded:
+        return None
+    return max(recorded)
+
+
+def _get_node_tasktimes(chip, nodes):
+    '''
+    Returns the average tasktime recorded for each node by previous jobs.
+
+    Tasktimes are taken from the jobs in the history of the chip. Without
+    any, they are taken from the manifest of the most recent job in the build
+    directory instead. Nodes without any recorded tasktime are not included.
+    '''
+    recorded = {node: [] for node in nodes}
+    for job in chip.getkeys('history'):
+        # History only contains the metrics recorded by the job
+        if not chip.valid('history', job, 'metric', 'tasktime'):
+            continue
+        for step, index in nodes:
+            tasktime = chip.get('history', job, 'metric', 'tasktime', step=step, index=index)
+            if tasktime is not None:
+                recorded[(step, index)].append(tasktime)
+
+    if not any(recorded.values()):
+        designdir = os.path.dirname(chip._getworkdir())
+        manifests = []
+        if os.path.isdir(designdir):
+            for job in os.listdir(designdir):
+                manifest = os.path.join(designdir, job, f'{chip.design}.pkg.json')
+                if os.path.isfile(manifest):
+                    manifests.append(manifest)
+        if manifests:
+            manifest = max(manifests, key=os.path.getmtime)
+            for node, tasktime in _get_manifest_tasktimes(chip, manifest).items():
+                if node in recorded:
+                    recorded[node].append(tasktime)
+
+    tasktimes = {}
+    for node, node_tasktimes in recorded.items():
+        if node_tasktimes:
+            tasktimes[node] = sum(node_tasktimes) / len(node_tasktimes)
+    return tasktimes
+
+
+def _get_manifest_tasktimes(chip, manifest):
+    '''
+    Returns the tasktimes recorded in a job manifest by node. Manifests are
+    only read again once they are modified.
+    '''
+    mtime = os.path.getmtime(manifest)
+    cached = _manifest_tasktimes.get(manifest)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    tasktimes = {}
+    try:
+        schema = Schema(manifest=manifest, logger=chip.logger)
+        for tasktime, step, index in schema._getvals('metric', 'tasktime',
+                                                     return_defvalue=False):
+            if tasktime is not None:
+                tasktimes[(step, index)] = tasktime
+    except Exception as e:
+        chip.logger.debug(f'Unable to read tasktimes from {manifest}: {e}')
+
+    _manifest_tasktimes[manifest] = (mtime, tasktimes)
+    return tasktimes
+
+
+def _get_node_priorities(nodes_to_run, tasktimes=None):
+    '''
+    Returns the expected time of the longest chain of nodes starting at each
+    node, so nodes on the critical path can be started first.
+
+    nodes_to_run must list each node after its inputs, as it is built from
+    :meth:`Chip.nodes_to_execute` by _prepare_nodes.
+
+    Nodes missing from tasktimes take the average of the known tasktimes, so
+    without any tasktimes chains are measured in nodes.
+    '''
+    if tasktimes is None:
+        tasktimes = {}
+
+    default_tasktime = 1.0
+    if tasktimes:
+        default_tasktime = sum(tasktimes.values()) / len(tasktimes)
+
+    dependents = {}
+    for node, deps in nodes_to_run.items():
+        for in_node in deps:
+            dependents.setdefault(in_node, []).append(node)
+
+    priorities = {}
+    for node in reversed(list(nodes_to_run)):
+        priorities[node] = tasktimes.get(node, default_tasktime) + \
+            max([priorities.get(next_node, 0)
+                 for next_node in dependents.get(node, [])], default=0)
+    return priorities
+
+
+def _launch_nodes(chip, nodes_to_run, processes, local_processes, status):
+    # Maps running nodes to the (threads, memory) reserved for them
+    running_nodes = {}
+    max_parallel_run = _get_max_parallel_run(chip)
+    max_threads = os.cpu_count()
+    max_memory = psutil.virtual_memory().available
 
     def allow_start(node):
         if node not in local_processes:
             # using a different scheduler, so allow
-            return True, 0
+            return True, (0, 0)
 
         if len(running_nodes) >= max_parallel_run:
-            return False, 0
+            return False, (0, 0)
 
         # Record thread count requested
         step, index = node
@@ -1300,36 +1507,73 @@ def _launch_nodes(chip, nodes_to_run, processes, local_processes, status):
         # clamp to max_parallel to avoid getting locked up
         requested_threads = max(1, min(requested_threads, max_threads))
 
-        if requested_threads + sum(running_nodes.values()) > max_threads:
+        if requested_threads + sum([threads for threads, _ in running_nodes.values()]) > \
+                max_threads:
             # delay until there are enough core available
-            return False, 0
+            return False, (0, 0)
 
-        # allow and record how many threads to associate
-        return True, requested_threads
+        # Unknown memory requirements are not reserved
+        requested_memory = _get_node_memory(chip, step, index) or 0
+        # clamp to max_memory to avoid getting locked up
+        requested_memory = min(requested_memory, max_memory)
 
-    deps_was_successful = {}
+        if requested_memory + sum([memory for _, memory in running_nodes.values()]) > \
+                max_memory:
+            # delay until there is enough memory available
+            return False, (0, 0)
 
-    while len(nodes_to_run) > 0 or len(running_nodes) > 0:
-        # Check for new nodes that can be launched.
-        for node, deps in list(nodes_to_run.items()):
-            # TODO: breakpoint logic:
-            # if node is breakpoint, then don't launch while len(running_nodes) > 0
+        # allow and record how many threads and memory to associate
+        return True, (requested_threads, requested_memory)
 
-            _check_node_dependencies(chip, node, deps, status, deps_was_successful)
+    priorities = _get_node_priorities(nodes_to_run, _get_node_tasktimes(chip, nodes_to_run))
 
-            if status[node] == NodeStatus.ERROR:
-                del nodes_to_run[node]
-                continue
+    deps_was_successful = {}
+
+    # Map each node to the nodes waiting on it, so dependencies are only
+    # re-checked when one of their inputs finishes.
+    dependents = {}
+    for node, deps in nodes_to_run.items():
+        for in_node in deps:
+            dependents.setdefault(in_node, []).append(node)
+
+    def node_finished(node):
+        for next_node in dependents.get(node, []):
+            if next_node in nodes_to_run:
+                to_check[next_node] = None
 
-            # If there are no dependencies left, launch this node and
-            # remove from nodes_to_run.
-            if len(deps) == 0:
-                dostart, requested_threads = allow_start(node)
+    # Nodes are kept in the order of nodes_to_run, so nodes with the same
+    # priority launch in the order the nodes were prepared in.
+    to_check = dict.fromkeys(nodes_to_run)
+    ready = {}
 
-                if dostart:
-                    processes[node].start()
+    while len(nodes_to_run) > 0 or len(running_nodes) > 0:
+        # Check nodes with updated dependencies.
+        while to_check:
+            check_nodes = list(to_check)
+            to_check.clear()
+            for node in check_nodes:
+                # TODO: breakpoint logic:
+                # if node is breakpoint, then don't launch while len(running_nodes) > 0
+
+                deps = nodes_to_run[node]
+                _check_node_dependencies(chip, node, deps, status, deps_was_successful)
+
+                if status[node] == NodeStatus.ERROR:
                     del nodes_to_run[node]
-                    running_nodes[node] = requested_threads
+                    node_finished(node)
+                elif len(deps) == 0:
+                    ready[node] = None
+
+        # Launch ready nodes on the longest remaining chains first and
+        # remove them from nodes_to_run.
+        for node in sorted(ready, key=lambda node: priorities[node], reverse=True):
+            dostart, requested = allow_start(node)
+
+            if dostart:
+                processes[node].start()
+                del ready[node]
+                del nodes_to_run[node]
+                running_nodes[node] = requested
 
         # Check for situation where we have stuff left to run but don't
         # have any nodes running. This shouldn't happen, but we will get
@@ -1339,19 +1583,20 @@ def _launch_nodes(chip, nodes_to_run, processes, local_processes, status):
             chip.error('Nodes left to run, but no '
                        'running nodes. From/to may be invalid.', fatal=True)
 
-        # Check for completed nodes.
-        # TODO: consider staying in this section of loop until a node
-        # actually completes.
-        for node in list(running_nodes.keys()):
-            if not processes[node].is_alive():
-                del running_nodes[node]
-                if processes[node].exitcode > 0:
-                    status[node] = NodeStatus.ERROR
-                else:
-                    status[node] = NodeStatus.SUCCESS
+        if len(running_nodes) == 0:
+            continue
 
-        # TODO: exponential back-off with max?
-        time.sleep(0.1)
+        # Block until at least one running node completes.
+        sentinels = {processes[node].sentinel: node for node in running_nodes}
+        for sentinel in multiprocessing.connection.wait(sentinels.keys()):
+            node = sentinels[sentinel]
+            processes[node].join()
+            del running_nodes[node]
+            if processes[node].exitcode > 0:
+                status[node] = NodeStatus.ERROR
+            else:
+                status[node] = NodeStatus.SUCCESS
+            node_finished(node)
 
 
 def _check_nodes_status(chip, flow, status):
@@ -1583,6 +1828,7 @@ def check_node_inputs(chip, step, index):
 
                 if check_hash != prev_hash:
                     print_warning(key)
+                    chip._report_hash_changes(key, prev_hash, check_hash)
                     return False
             else:
                 # check values
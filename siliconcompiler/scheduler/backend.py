@@ -0,0 +1,492 @@
+import multiprocessing.connection
+import os
+import shlex
+import stat
+import subprocess
+import threading
+
+from siliconcompiler import utils
+
+# States of the jobs run by a backend.
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+# Number of lines of the log of a failed job which are reported.
+LOG_LINES = 10
+
+# Registered backends, by scheduler name
+_backends = {}
+
+
+###########################################################################
+def register_backend(name, backend):
+    '''
+    Registers a backend, which is used to run the nodes with
+    ['option', 'scheduler', 'name'] set to name.
+
+    Args:
+        name (str): Name of the scheduler.
+        backend (class): Subclass of :class:`SchedulerBackend`.
+    '''
+    _backends[name] = backend
+
+
+def get_backend(name):
+    '''
+    Returns the backend class registered for a scheduler.
+
+    Args:
+        name (str): Name of the scheduler.
+    '''
+    if name not in _backends:
+        raise ValueError(f'{name} is not a supported scheduler')
+    return _backends[name]
+
+
+###########################################################################
+class SchedulerBackend:
+    '''
+    Base class of the job schedulers which nodes can be run on.
+
+    Nodes are first prepared locally, which writes the manifest and the
+    script used to run the node (see :func:`get_node_files`). A
+    :class:`BackendMonitor` then submits the prepared nodes, and polls the
+    states of all the outstanding jobs together.
+
+    Args:
+        chip (Chip): Chip of the run.
+    '''
+
+    # Seconds between polls of the job states
+    poll_interval = 3.0
+
+    def __init__(self, chip):
+        self.chip = chip
+
+    def notify(self):
+        '''
+        Called by backends which are notified of job state changes, so the
+        jobs are polled without waiting for the poll interval. Set by the
+        monitor of the backend.
+        '''
+        pass
+
+    def submit(self, nodes):
+        '''
+        Submits prepared nodes.
+
+        Args:
+            nodes (list of (step, index)): Nodes to submit.
+
+        Returns:
+            List with the job ID of each node, or None for the nodes which
+            could not be submitted.
+        '''
+        raise NotImplementedError
+
+    def poll(self, job_ids):
+        '''
+        Returns the states of jobs.
+
+        Args:
+            job_ids (list of str): Jobs to poll.
+
+        Returns:
+            Dictionary mapping the job IDs to one of JOB_PENDING, JOB_RUNNING,
+            JOB_COMPLETED or JOB_FAILED.
+        '''
+        raise NotImplementedError
+
+    def cancel(self, job_ids):
+        '''
+        Cancels jobs.
+
+        Args:
+            job_ids (list of str): Jobs to cancel.
+        '''
+        raise NotImplementedError
+
+    def fetch_logs(self, step, index):
+        '''
+        Returns the path of the output log of a node's job, or None if it is
+        not available.
+
+        Args:
+            step (str): Step of the node.
+            index (str): Index of the node.
+        '''
+        log_file = get_node_files(self.chip, step, index)['log']
+        if os.path.isfile(log_file):
+            return log_file
+        return None
+
+
+###########################################################################
+def get_configuration_directory(chip):
+    '''
+    Helper function to get the configuration directory for the scheduler
+    '''
+
+    return f'{chip._getworkdir()}/configs'
+
+
+def get_node_files(chip, step, index):
+    '''
+    Returns the paths of the 'manifest', 'script' and 'log' files of a node
+    run by a backend.
+    '''
+
+    cfg_dir = get_configuration_directory(chip)
+    return {
+        'manifest': f'{cfg_dir}/{step}{index}.json',
+        'script': f'{cfg_dir}/{step}{index}.sh',
+        'log': f'{cfg_dir}/{step}{index}.log'
+    }
+
+
+def prepare_node(chip, step, index):
+    '''
+    Helper method to prepare an individual step to run on a job scheduler.
+
+    Writes the manifest and script used by the compute node. The job is
+    submitted and tracked by the :class:`BackendMonitor` the node belongs to.
+    '''
+
+    # Write out the current schema for the compute node to pick up.
+    files = get_node_files(chip, step, index)
+    os.makedirs(get_configuration_directory(chip), exist_ok=True)
+
+    chip.set('option', 'scheduler', 'name', None, step=step, index=index)
+    chip.write_manifest(files['manifest'])
+
+    # Allow user-defined compute node execution script if it already exists on the filesystem.
+    # Otherwise, create a minimal script to run the task using the SiliconCompiler CLI.
+    if not os.path.isfile(files['script']):
+        with open(files['script'], 'w') as sf:
+            sf.write(utils.get_file_template('slurm/run.sh').render(
+                cfg_file=shlex.quote(files['manifest']),
+                build_dir=shlex.quote(chip.get("option", "builddir")),
+                step=shlex.quote(step),
+                index=shlex.quote(index)
+            ))
+
+    make_executable(files['script'])
+
+
+def make_executable(path):
+    # This is Python for: `chmod +x [script_path]`
+    os.chmod(path,
+             os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+###########################################################################
+class BackendMonitor:
+    '''
+    Submits nodes to a backend and tracks their jobs.
+
+    A single thread tracks all the outstanding jobs of a run, polling their
+    states together, instead of waiting on each job from its own process.
+    Nodes are returned by :meth:`task` with the same interface as the
+    multiprocessing.Process used to run local nodes, so they are waited on
+    with the other running nodes.
+
+    If ['option', 'scheduler', 'jobarray'] is set, the indices of a step
+    which are ready at the same time are submitted together, so the backend
+    can run them as a single job array.
+
+    Args:
+        backend (SchedulerBackend): Backend to run the nodes on.
+    '''
+
+    def __init__(self, backend):
+        self.__backend = backend
+        self.__chip = backend.chip
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__wakeup_read, self.__wakeup_write = os.pipe()
+        backend.notify = self.__wakeup
+
+        # Tasks which were started, but are not prepared yet
+        self.__new = []
+        # Tasks waiting on their local preparation
+        self.__preparing = []
+        # Tasks ready to be submitted
+        self.__prepared = []
+        # Maps job IDs to the tasks they run
+        self.__jobs = {}
+
+    def task(self, step, index, setup):
+        '''
+        Returns the task used to run a node.
+
+        Args:
+            step (str): Step of the node.
+            index (str): Index of the node.
+            setup (multiprocessing.Process): Process which prepares the node
+                locally, before it is submitted.
+        '''
+        return _BackendTask(self, step, index, setup)
+
+    def _add(self, task):
+        with self.__lock:
+            self.__new.append(task)
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, daemon=True)
+                self.__thread.start()
+        self.__wakeup()
+
+    def _cancel(self, task):
+        with self.__lock:
+            if task in self.__new:
+                self.__new.remove(task)
+                task._finish(1)
+                return
+        # The job is canceled once it is submitted
+        task.canceled = True
+        self.__wakeup()
+
+    def __wakeup(self):
+        os.write(self.__wakeup_write, b'\0')
+
+    def __run(self):
+        try:
+            self.__track()
+        except Exception as e:
+            # Nodes must not be left waiting on a monitor which stopped
+            self.__chip.logger.error(f'{self.__chip.get("option", "scheduler", "name")} '
+                                     f'job tracking failed: {e}')
+            with self.__lock:
+                tasks = self.__new + self.__preparing + self.__prepared + \
+                    list(self.__jobs.values())
+                self.__new.clear()
+                self.__preparing.clear()
+                self.__prepared.clear()
+                self.__jobs.clear()
+                self.__thread = None
+            for task in tasks:
+                task._finish(1)
+
+    def __track(self):
+        while True:
+            self.__wait()
+
+            with self.__lock:
+                new_tasks = list(self.__new)
+                self.__new.clear()
+                if not new_tasks and not self.__preparing and not self.__prepared and \
+                        not self.__jobs:
+                    # Restarted by the next task added
+                    self.__thread = None
+                    return
+
+            # Preparations are started here, as starting a process blocks
+            # until it is running. Siblings are started together, so they are
+            # all added by the time the preparation of any of them completes.
+            for task in new_tasks:
+                task.setup.start()
+                self.__preparing.append(task)
+
+            for task in list(self.__preparing):
+                if task.setup.exitcode is None:
+                    continue
+                task.setup.join()
+                self.__preparing.remove(task)
+                if task.setup.exitcode != 0 or task.canceled:
+                    task._finish(1)
+                else:
+                    self.__prepared.append(task)
+
+            if self.__chip.get('option', 'scheduler', 'jobarray'):
+                # Wait for the siblings which are still being prepared, so
+                # they are submitted together
+                preparing_steps = set([task.step for task in self.__preparing])
+                submit = [task for task in self.__prepared if task.step not in preparing_steps]
+            else:
+                submit = list(self.__prepared)
+
+            if submit:
+                self.__prepared = [task for task in self.__prepared if task not in submit]
+                self.__submit(submit)
+
+            canceled = [job_id for job_id, task in self.__jobs.items() if task.canceled]
+            if canceled:
+                self.__backend.cancel(canceled)
+                for job_id in canceled:
+                    self.__jobs.pop(job_id)._finish(1)
+
+            if self.__jobs:
+                self.__update_states()
+
+    def __wait(self):
+        '''
+        Waits for a node to be added or prepared, or for the next poll of
+        the jobs states.
+        '''
+        waitables = [self.__wakeup_read] + [task.setup.sentinel for task in self.__preparing]
+        timeout = self.__backend.poll_interval if self.__jobs else None
+        if self.__wakeup_read in multiprocessing.connection.wait(waitables, timeout=timeout):
+            os.read(self.__wakeup_read, 1024)
+
+    def __submit(self, tasks):
+        job_ids = self.__backend.submit([(task.step, task.index) for task in tasks])
+        for task, job_id in zip(tasks, job_ids):
+            if job_id is None:
+                task._finish(1)
+                continue
+            task.job_id = job_id
+            self.__jobs[job_id] = task
+
+    def __update_states(self):
+        '''
+        Polls the states of all the outstanding jobs and finishes the tasks
+        of the jobs which terminated.
+        '''
+        states = self.__backend.poll(list(self.__jobs.keys()))
+
+        for job_id, task in list(self.__jobs.items()):
+            state = states.get(job_id, task.state)
+            if state != task.state:
+                self.__chip.logger.info(f'Job {job_id} for {task.step}{task.index}: {state}')
+                task.state = state
+
+            if state not in (JOB_COMPLETED, JOB_FAILED):
+                continue
+
+            del self.__jobs[job_id]
+            if state == JOB_COMPLETED:
+                task._finish(0)
+            else:
+                self.__report_failure(task)
+                task._finish(1)
+
+    def __report_failure(self, task):
+        self.__chip.logger.error(f'Job for {task.step}{task.index} failed.')
+        log_file = self.__backend.fetch_logs(task.step, task.index)
+        if not log_file:
+            return
+        with open(log_file, errors='replace') as f:
+            lines = f.read().splitlines()[-LOG_LINES:]
+        self.__chip.logger.error(f'Last lines of {log_file}:')
+        for line in lines:
+            self.__chip.logger.error(f'  {line}')
+
+
+def cancel_tasks(tasks, timeout=10):
+    '''
+    Cancels the jobs of the nodes run by backends, and waits for them to be
+    canceled.
+
+    Args:
+        tasks (list): Processes of the nodes of a run. Nodes which are not
+            run by a backend are ignored.
+        timeout (float): Maximum number of seconds to wait for each job.
+    '''
+    tasks = [task for task in tasks
+             if isinstance(task, _BackendTask) and task.started and task.exitcode is None]
+    for task in tasks:
+        task.terminate()
+    for task in tasks:
+        task.join(timeout=timeout)
+
+
+###########################################################################
+class _BackendTask:
+    '''
+    Node run by a backend, with the interface of multiprocessing.Process.
+    '''
+
+    def __init__(self, monitor, step, index, setup):
+        self.step = step
+        self.index = index
+        self.setup = setup
+        self.job_id = None
+        self.state = None
+        self.exitcode = None
+        self.started = False
+        self.canceled = False
+
+        self.__monitor = monitor
+        self.__done = threading.Event()
+        self.__read_fd, self.__write_fd = os.pipe()
+
+    def start(self):
+        # The monitor starts the preparation of the node
+        self.started = True
+        self.__monitor._add(self)
+
+    def terminate(self):
+        if self.started and self.exitcode is None:
+            self.__monitor._cancel(self)
+
+    @property
+    def sentinel(self):
+        # Becomes readable once the job terminates
+        return self.__read_fd
+
+    def join(self, timeout=None):
+        if not self.__done.wait(timeout):
+            return
+        if self.__read_fd is not None:
+            os.close(self.__read_fd)
+            os.close(self.__write_fd)
+            self.__read_fd = None
+
+    def _finish(self, exitcode):
+        self.exitcode = exitcode
+        os.write(self.__write_fd, b'\0')
+        self.__done.set()
+
+
+###########################################################################
+class LocalBackend(SchedulerBackend):
+    '''
+    Reference backend, which runs the job of each node as a process on the
+    local machine. Nodes run the same way as on a cluster, which shares the
+    build directory with the local machine.
+    '''
+
+    # Jobs are polled as soon as their process exits
+    poll_interval = 10.0
+
+    def __init__(self, chip):
+        super().__init__(chip)
+        self.__procs = {}
+
+    def submit(self, nodes):
+        job_ids = []
+        for step, index in nodes:
+            files = get_node_files(self.chip, step, index)
+            with open(files['log'], 'w') as log:
+                proc = subprocess.Popen([files['script']],
+                                        cwd=self.chip.cwd,
+                                        stdout=log,
+                                        stderr=subprocess.STDOUT)
+            job_id = str(proc.pid)
+            self.__procs[job_id] = proc
+            threading.Thread(target=self.__watch, args=(proc,), daemon=True).start()
+            job_ids.append(job_id)
+        return job_ids
+
+    def __watch(self, proc):
+        proc.wait()
+        self.notify()
+
+    def poll(self, job_ids):
+        states = {}
+        for job_id in job_ids:
+            returncode = self.__procs[job_id].poll()
+            if returncode is None:
+                states[job_id] = JOB_RUNNING
+            else:
+                states[job_id] = JOB_COMPLETED if returncode == 0 else JOB_FAILED
+                del self.__procs[job_id]
+        return states
+
+    def cancel(self, job_ids):
+        for job_id in job_ids:
+            self.__procs.pop(job_id).terminate()
+
+
+register_backend('local', LocalBackend)
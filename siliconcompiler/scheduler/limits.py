@@ -0,0 +1,224 @@
+import os
+import time
+import uuid
+
+try:
+    import resource
+except ImportError:
+    # Not available on windows
+    resource = None
+
+# Mount point of the cgroup v2 hierarchy.
+CGROUP_ROOT = '/sys/fs/cgroup'
+
+# Controllers enabled for the groups tools run in, so their usage can be
+# read by the resource monitor.
+CGROUP_CONTROLLERS = ('cpu', 'memory', 'io', 'pids')
+
+# Period of the CPU quota of a group, in microseconds.
+CPU_PERIOD = 100000
+
+# Limits in ['tool', <tool>, 'task', <task>, 'limit'].
+LIMITS = ('memory', 'cpu', 'files')
+
+
+def get_limits(chip, step, index):
+    '''
+    Returns the resource limits set for a node.
+
+    Args:
+        chip (Chip): Chip of the node.
+        step (str): Step of the node.
+        index (str): Index of the node.
+
+    Returns:
+        Dictionary mapping the names in :data:`LIMITS` to their values, for
+        the limits which are set.
+    '''
+    tool, task = chip._get_tool_task(step, index)
+    limits = {}
+    for limit in LIMITS:
+        value = chip.get('tool', tool, 'task', task, 'limit', limit, step=step, index=index)
+        if value:
+            limits[limit] = value
+    return limits
+
+
+def _get_own_cgroup():
+    '''
+    Returns the path of the cgroup v2 group of this process, or None if the
+    cgroup v2 hierarchy is not used.
+    '''
+    try:
+        with open('/proc/self/cgroup') as f:
+            for line in f:
+                if line.startswith('0::'):
+                    path = os.path.join(CGROUP_ROOT, line[3:].strip().lstrip('/'))
+                    if os.path.isfile(os.path.join(path, 'cgroup.controllers')):
+                        return path
+    except OSError:
+        pass
+    return None
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def _write(path, value):
+    with open(path, 'w') as f:
+        f.write(value)
+
+
+###########################################################################
+class ResourceLimiter:
+    '''
+    Applies the resource limits of a node to its tool.
+
+    Memory and CPU limits are applied by running the tool in a new cgroup v2
+    group below the group of this process, when the hierarchy is delegated
+    to the user running the flow. Otherwise, memory is limited with the
+    address space rlimit of the tool, and CPU limits are not applied, since
+    no rlimit limits the share of the CPUs a process uses. Open files are
+    always limited with an rlimit.
+
+    Args:
+        limits (dict): Limits returned by :func:`get_limits`.
+        name (str): Name of the node, used to name its group.
+        logger (logging.Logger): Logger used to report limits which cannot be
+            applied.
+
+    Examples:
+        >>> limiter = ResourceLimiter({'memory': 8000}, 'place0', chip.logger)
+        >>> proc = subprocess.Popen(cmd, preexec_fn=limiter.apply)
+        >>> proc.wait()
+        >>> limiter.exceeded()
+        Returns 'memory' if the tool was killed for exceeding 8000 MB.
+        >>> limiter.close()
+    '''
+
+    def __init__(self, limits, name, logger):
+        self.limits = limits
+        self.logger = logger
+        #: Path of the group the tool runs in, or None if it runs in the
+        #: group of this process.
+        self.cgroup = None
+        self.__rlimits = []
+
+        if 'memory' in limits or 'cpu' in limits:
+            self.cgroup = self.__create_cgroup(name)
+
+        if not self.cgroup:
+            if 'memory' in limits:
+                self.__add_rlimit('RLIMIT_AS', limits['memory'] * 1024 * 1024, 'memory')
+            if 'cpu' in limits:
+                self.logger.warning('CPU limit requires a delegated cgroup v2 hierarchy '
+                                    'and will not be applied')
+        if 'files' in limits:
+            self.__add_rlimit('RLIMIT_NOFILE', limits['files'], 'open files')
+
+    def __add_rlimit(self, name, value, description):
+        if resource is None or not hasattr(resource, name):
+            self.logger.warning(f'Limit on {description} is not supported on this platform '
+                                'and will not be applied')
+            return
+        limit = getattr(resource, name)
+        _, hard = resource.getrlimit(limit)
+        if hard != resource.RLIM_INFINITY:
+            # Only privileged processes can raise their hard limits
+            value = min(value, hard)
+        self.__rlimits.append((limit, value))
+
+    def __create_cgroup(self, name):
+        '''
+        Creates the group the tool runs in, returns its path or None if it
+        cannot be created.
+        '''
+        parent = _get_own_cgroup()
+        if not parent:
+            return None
+
+        try:
+            available = _read(os.path.join(parent, 'cgroup.controllers')).split()
+            required = [limit for limit in ('memory', 'cpu') if limit in self.limits]
+            if any(controller not in available for controller in required):
+                return None
+
+            controllers = [c for c in CGROUP_CONTROLLERS if c in available]
+            enabled = _read(os.path.join(parent, 'cgroup.subtree_control')).split()
+            missing = [c for c in controllers if c not in enabled]
+            if missing:
+                # Fails unless the group of this process has no processes,
+                # as in hierarchies delegated to the user
+                _write(os.path.join(parent, 'cgroup.subtree_control'),
+                       ' '.join(f'+{c}' for c in missing))
+
+            path = os.path.join(parent, f'sc-{name}-{uuid.uuid4().hex[:8]}')
+            os.mkdir(path)
+        except OSError:
+            return None
+
+        try:
+            if 'memory' in self.limits:
+                _write(os.path.join(path, 'memory.max'),
+                       str(self.limits['memory'] * 1024 * 1024))
+                if os.path.isfile(os.path.join(path, 'memory.swap.max')):
+                    # Swapping would let the tool exceed the limit
+                    _write(os.path.join(path, 'memory.swap.max'), '0')
+            if 'cpu' in self.limits:
+                quota = max(1000, int(self.limits['cpu'] * CPU_PERIOD))
+                _write(os.path.join(path, 'cpu.max'), f'{quota} {CPU_PERIOD}')
+        except OSError:
+            self.__remove_cgroup(path)
+            return None
+
+        return path
+
+    def apply(self):
+        '''
+        Applies the limits to the calling process. Called in the tool
+        process before the tool starts, through the preexec_fn of Popen.
+        '''
+        if self.cgroup:
+            _write(os.path.join(self.cgroup, 'cgroup.procs'), str(os.getpid()))
+        for limit, value in self.__rlimits:
+            resource.setrlimit(limit, (value, value))
+
+    def exceeded(self):
+        '''
+        Returns the name of the limit the tool was stopped for exceeding, or
+        None if it is not known to have exceeded a limit.
+        '''
+        if self.cgroup and 'memory' in self.limits:
+            try:
+                for line in _read(os.path.join(self.cgroup, 'memory.events')).splitlines():
+                    key, value = line.split()
+                    if key == 'oom_kill' and int(value) > 0:
+                        return 'memory'
+            except (OSError, ValueError):
+                pass
+        return None
+
+    @staticmethod
+    def __remove_cgroup(path):
+        for _ in range(10):
+            try:
+                os.rmdir(path)
+                return
+            except FileNotFoundError:
+                return
+            except OSError:
+                # Processes started by the tool may still be running
+                try:
+                    _write(os.path.join(path, 'cgroup.kill'), '1')
+                except OSError:
+                    pass
+                time.sleep(0.1)
+
+    def close(self):
+        '''
+        Removes the group the tool ran in.
+        '''
+        if self.cgroup:
+            self.__remove_cgroup(self.cgroup)
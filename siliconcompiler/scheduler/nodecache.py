@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from siliconcompiler import _metadata
+from siliconcompiler import filehash
+
+# Metrics which describe the run of a node, rather than its results.
+RUNTIME_METRICS = ('exetime', 'tasktime', 'totaltime', 'cpuutilization', 'iobytes',
+                   'memory', 'peakrss')
+
+# Records restored from the node which stored a result.
+TOOL_RECORDS = ('toolversion', 'toolpath', 'toolargs')
+
+
+def get_cache_dir(chip, step, index):
+    '''
+    Returns the absolute path of the node result cache used by a node, or
+    None if the cache is disabled.
+    '''
+
+    cache_dir = chip.get('option', 'nodecache', step=step, index=index)
+    if not cache_dir:
+        return None
+    return os.path.join(chip.cwd, os.path.expanduser(cache_dir))
+
+
+def _get_entry(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def _get_keypaths(chip, tool, task, step, index):
+    '''
+    Returns the keypaths whose values determine the results of a node.
+    '''
+
+    keypaths = set(chip.get('tool', tool, 'task', task, 'require', step=step, index=index))
+    for key in ('option', 'threads', 'prescript', 'postscript', 'refdir', 'script'):
+        keypaths.add(','.join(['tool', tool, 'task', task, key]))
+    for env_key in chip.getkeys('tool', tool, 'task', task, 'env'):
+        keypaths.add(','.join(['tool', tool, 'task', task, 'env', env_key]))
+    return sorted(keypaths)
+
+
+def get_node_key(chip, step, index, version):
+    '''
+    Returns the key of the result of a node in the node result cache.
+
+    The key is the hash of the tool, task and tool version, of the values of
+    the keypaths the task requires, and of the contents of the input files of
+    the node. File and directory parameters contribute the hashes of their
+    contents rather than their paths, so identical inputs give the same key
+    across jobs and users.
+
+    Must be called from the working directory of the node, once its inputs
+    are in place.
+
+    Args:
+        chip (Chip): Chip of the node.
+        step (str): Step of the node.
+        index (str): Index of the node.
+        version (str): Version of the tool, as reported by the tool.
+    '''
+
+    tool, task = chip._get_tool_task(step, index)
+
+    values = {}
+    for keypath in _get_keypaths(chip, tool, task, step, index):
+        key = keypath.split(',')
+        if not chip.valid(*key):
+            values[keypath] = None
+            continue
+
+        key_step, key_index = step, index
+        if chip.get(*key, field='pernode') == 'never':
+            key_step, key_index = None, None
+
+        sc_type = chip.get(*key, field='type')
+        if 'file' in sc_type or 'dir' in sc_type:
+            values[keypath] = chip.hash_files(*key, update=False, check=False, verbose=False,
+                                              allow_cache=True, step=key_step, index=key_index)
+        else:
+            values[keypath] = chip.get(*key, step=key_step, index=key_index)
+
+    # The manifest written into inputs describes the job rather than the data
+    manifest = f'{chip.design}.pkg.json'
+    input_files = []
+    for root, _, files in os.walk('inputs', followlinks=True):
+        for name in files:
+            path = os.path.join(root, name)
+            if path != os.path.join('inputs', manifest):
+                input_files.append(path)
+    input_hashes = filehash.hash_paths(input_files, cache=chip._get_file_hash_cache())
+    inputs = {}
+    for path, file_hash in zip(input_files, input_hashes):
+        inputs[os.path.relpath(path, 'inputs').replace(os.sep, '/')] = file_hash
+
+    data = {
+        'scversion': _metadata.version,
+        'tool': tool,
+        'task': task,
+        'version': version,
+        # Outputs do not exist yet, so only their names are known
+        'outputs': chip.get('tool', tool, 'task', task, 'output', step=step, index=index),
+        'values': values,
+        'inputs': inputs
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def restore_node(chip, step, index, key):
+    '''
+    Restores the outputs, reports, log, metrics and tool records of a node
+    from the node result cache.
+
+    Must be called from the working directory of the node.
+
+    Args:
+        chip (Chip): Chip of the node.
+        step (str): Step of the node.
+        index (str): Index of the node.
+        key (str): Key returned by :func:`get_node_key`.
+
+    Returns:
+        True if the result was found in the cache and restored.
+    '''
+
+    entry = _get_entry(get_cache_dir(chip, step, index), key)
+    node_file = os.path.join(entry, 'node.json')
+    if not os.path.isfile(node_file):
+        return False
+
+    try:
+        with open(node_file) as f:
+            node = json.load(f)
+        for directory in ('outputs', 'reports'):
+            shutil.copytree(os.path.join(entry, directory), directory, dirs_exist_ok=True)
+        if os.path.isfile(os.path.join(entry, 'tool.log')):
+            shutil.copyfile(os.path.join(entry, 'tool.log'), f'{step}.log')
+    except (OSError, ValueError) as e:
+        chip.logger.warning(f'Unable to restore {step}{index} from the node cache: {e}')
+        return False
+
+    for metric, value in node['metric'].items():
+        chip.set('metric', metric, value, step=step, index=index)
+    for record, value in node['record'].items():
+        chip.set('record', record, value, step=step, index=index)
+
+    chip.logger.info(f'Restored {step}{index} from the node cache, '
+                     f'stored by {node["step"]}{node["index"]} of job {node["jobname"]}')
+    return True
+
+
+def store_node(chip, step, index, key):
+    '''
+    Stores the outputs, reports, log, metrics and tool records of a
+    successful node in the node result cache.
+
+    Must be called from the working directory of the node.
+
+    Args:
+        chip (Chip): Chip of the node.
+        step (str): Step of the node.
+        index (str): Index of the node.
+        key (str): Key returned by :func:`get_node_key`.
+    '''
+
+    entry = _get_entry(get_cache_dir(chip, step, index), key)
+    if os.path.isdir(entry):
+        return
+
+    node = {
+        'jobname': chip.get('option', 'jobname'),
+        'step': step,
+        'index': index,
+        'metric': {},
+        'record': {}
+    }
+    for metric in chip.getkeys('metric'):
+        if metric in RUNTIME_METRICS:
+            continue
+        value = chip.get('metric', metric, step=step, index=index)
+        if value is not None:
+            node['metric'][metric] = value
+    for record in TOOL_RECORDS:
+        value = chip.get('record', record, step=step, index=index)
+        if value is not None:
+            node['record'][record] = value
+
+    manifest = f'{chip.design}.pkg.json'
+    try:
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        # Entries are written aside and renamed into place, so readers, which
+        # may be other jobs sharing the cache, never see partial results.
+        tmp_entry = tempfile.mkdtemp(prefix=f'.{key}.', dir=os.path.dirname(entry))
+        try:
+            shutil.copytree('outputs', os.path.join(tmp_entry, 'outputs'),
+                            ignore=lambda path, names: [name for name in names
+                                                        if name == manifest])
+            shutil.copytree('reports', os.path.join(tmp_entry, 'reports'))
+            if os.path.isfile(f'{step}.log'):
+                shutil.copyfile(f'{step}.log', os.path.join(tmp_entry, 'tool.log'))
+            with open(os.path.join(tmp_entry, 'node.json'), 'w') as f:
+                json.dump(node, f, indent=2)
+            os.rename(tmp_entry, entry)
+        except OSError:
+            # Another job may have stored the same result first
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            if not os.path.isdir(entry):
+                raise
+    except OSError as e:
+        chip.logger.warning(f'Unable to store {step}{index} in the node cache: {e}')
@@ -0,0 +1,242 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+import traceback
+import uuid
+
+
+###########################################################################
+class WorkerPool:
+    '''
+    Pool of persistent worker processes used to run nodes when
+    ['option', 'scheduler', 'workerpool'] is set.
+
+    Workers are spawned once and kept alive across nodes and jobs, so
+    siliconcompiler and the tool drivers are only imported once per worker.
+    The state shared by all nodes of a job is only sent once to each worker,
+    after which running a node only requires sending the node arguments.
+    '''
+
+    def __init__(self):
+        self.__context = multiprocessing.get_context('spawn')
+        self.__workers = []
+        self.__idle = []
+
+    def resize(self, size):
+        '''
+        Ensures the pool has at least size workers. Workers are never removed.
+
+        Args:
+            size (int): Number of workers.
+        '''
+        self.__workers = [worker for worker in self.__workers if worker.is_alive()]
+        self.__idle = [worker for worker in self.__idle if worker in self.__workers]
+        while len(self.__workers) < size:
+            worker = _Worker(self.__context)
+            self.__workers.append(worker)
+            self.__idle.append(worker)
+
+    def job(self, chip_state):
+        '''
+        Creates a job which nodes can be submitted to.
+
+        Args:
+            chip_state (bytes): Pickled chip shared by all nodes of the job.
+        '''
+        # Workers may outlive this job, so they also receive the environment
+        # and working directory of the job
+        state = pickle.dumps((chip_state, dict(os.environ), os.getcwd()),
+                             protocol=pickle.HIGHEST_PROTOCOL)
+        return _Job(self, uuid.uuid4().hex, state)
+
+    def _acquire(self):
+        while self.__idle:
+            worker = self.__idle.pop()
+            if worker.is_alive():
+                return worker
+            self.__workers.remove(worker)
+
+        worker = _Worker(self.__context)
+        self.__workers.append(worker)
+        return worker
+
+    def _release(self, worker):
+        if worker.is_alive():
+            self.__idle.append(worker)
+        else:
+            self.__workers.remove(worker)
+
+    def shutdown(self):
+        '''
+        Stops all workers.
+        '''
+        for worker in self.__workers:
+            worker.stop()
+        self.__workers = []
+        self.__idle = []
+
+
+###########################################################################
+class _Job:
+    def __init__(self, pool, job_id, state):
+        self.pool = pool
+        self.job_id = job_id
+        self.state = state
+
+    def task(self, *args):
+        '''
+        Returns a task, which has the same interface as the
+        multiprocessing.Process used when the pool is not used.
+
+        Args:
+            args: Arguments of _runtask_from_state(), after the chip state.
+        '''
+        return _Task(self, args)
+
+
+###########################################################################
+class _Task:
+    def __init__(self, job, args):
+        self.__job = job
+        self.__args = args
+        self.__worker = None
+        self.exitcode = None
+
+    def start(self):
+        self.__worker = self.__job.pool._acquire()
+        self.__worker.submit(self.__job, self.__args)
+
+    @property
+    def sentinel(self):
+        # Becomes ready when the worker sends the result or exits
+        return self.__worker.connection
+
+    def join(self):
+        if self.exitcode is not None:
+            return
+        self.exitcode = self.__worker.result()
+        self.__job.pool._release(self.__worker)
+
+
+###########################################################################
+class _Worker:
+    # Seconds to wait for a worker to exit before terminating it
+    STOP_TIMEOUT = 5
+
+    def __init__(self, context):
+        self.connection, child_connection = context.Pipe()
+        self.__process = context.Process(target=_worker_main, args=(child_connection,))
+        self.__process.start()
+        child_connection.close()
+        self.__job_id = None
+
+    def is_alive(self):
+        return self.__process.is_alive()
+
+    def submit(self, job, args):
+        state = None
+        if self.__job_id != job.job_id:
+            state = job.state
+            self.__job_id = job.job_id
+        self.connection.send((job.job_id, state, args))
+
+    def result(self):
+        try:
+            return self.connection.recv()
+        except (EOFError, OSError):
+            # Worker died while running the task
+            self.__process.join()
+            return max(1, self.__process.exitcode)
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.__process.join(timeout=_Worker.STOP_TIMEOUT)
+        if self.__process.is_alive():
+            self.__process.terminate()
+            self.__process.join()
+
+
+###########################################################################
+def _worker_main(connection):
+    # Import once, so nodes do not pay for it
+    from siliconcompiler.scheduler import _runtask_from_state
+
+    job_id = None
+    chip_state, environment, cwd = None, None, None
+
+    while True:
+        try:
+            msg = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if msg is None:
+            return
+
+        task_job_id, state, args = msg
+        if state is not None:
+            job_id = task_job_id
+            chip_state, environment, cwd = pickle.loads(state)
+        assert job_id == task_job_id
+
+        os.environ.clear()
+        os.environ.update(environment)
+        os.chdir(cwd)
+
+        loggers = set(logging.Logger.manager.loggerDict.keys())
+
+        exitcode = 0
+        try:
+            _runtask_from_state(chip_state, *args)
+        except SystemExit as e:
+            if e.code is None:
+                exitcode = 0
+            elif isinstance(e.code, int):
+                exitcode = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                exitcode = 1
+        except Exception:
+            traceback.print_exc()
+            exitcode = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            _remove_loggers(loggers)
+
+        connection.send(exitcode)
+
+
+def _remove_loggers(keep):
+    '''
+    Closes loggers created while running a node, since loggers of later
+    chips may reuse their names.
+    '''
+    for name in list(logging.Logger.manager.loggerDict.keys()):
+        if name in keep:
+            continue
+        logger = logging.Logger.manager.loggerDict.pop(name)
+        if isinstance(logger, logging.Logger):
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+
+
+###########################################################################
+_pool = None
+
+
+def get_pool():
+    '''
+    Returns the worker pool shared by all jobs in this process.
+    '''
+    global _pool
+    if _pool is None:
+        _pool = WorkerPool()
+        atexit.register(_pool.shutdown)
+    return _pool
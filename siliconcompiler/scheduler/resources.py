@@ -0,0 +1,294 @@
+import csv
+import os
+import threading
+import time
+
+import psutil
+
+# Shortest and longest time between samples. Sampling starts at the shortest
+# interval, so short tools are measured, and slows down while usage is
+# steady, so long tools are not slowed down by the monitor.
+MIN_INTERVAL = 0.1
+MAX_INTERVAL = 5.0
+INTERVAL_GROWTH = 1.5
+
+# Relative change in memory usage between samples above which sampling
+# speeds up again.
+CHANGE_THRESHOLD = 0.1
+
+# System memory usage, in percent, above which a warning is issued.
+MEMORY_WARN_LIMIT = 90
+
+# Columns of the time series written by the monitor.
+COLUMNS = ('time', 'cpu', 'rss', 'pss', 'read', 'write', 'threads')
+
+
+def _read_smaps_rollup(pid):
+    '''
+    Returns the RSS and PSS of a process, in bytes, from the totals the linux
+    kernel keeps per process, or None if they are not available.
+    '''
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            values = {}
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss'):
+                    values[key] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        return None
+    if len(values) != 2:
+        return None
+    return values['Rss'], values['Pss']
+
+
+def _read_keyed_file(path):
+    with open(path) as f:
+        return {key: int(value) for key, value in (line.split()[:2] for line in f)}
+
+
+def read_cgroup(path):
+    '''
+    Returns the resource usage of the processes of a cgroup v2 group, which
+    includes processes which already exited.
+
+    Args:
+        path (str): Path of the cgroup directory.
+
+    Returns:
+        Dictionary with the cpu time in seconds, the memory and I/O in bytes,
+        and the number of threads, or None if the group cannot be read.
+    '''
+    try:
+        cpu = _read_keyed_file(os.path.join(path, 'cpu.stat'))
+        memory = _read_keyed_file(os.path.join(path, 'memory.stat'))
+        read = write = 0
+        with open(os.path.join(path, 'io.stat')) as f:
+            for line in f:
+                for field in line.split()[1:]:
+                    key, _, value = field.partition('=')
+                    if key == 'rbytes':
+                        read += int(value)
+                    elif key == 'wbytes':
+                        write += int(value)
+        with open(os.path.join(path, 'pids.current')) as f:
+            threads = int(f.read())
+    except (OSError, ValueError):
+        return None
+
+    # Page cache is charged to the group as well, only count mapped memory
+    rss = memory.get('anon', 0) + memory.get('file_mapped', 0)
+    return {
+        'cpu': cpu['usage_usec'] / 1e6,
+        'rss': rss,
+        'pss': rss,
+        'read': read,
+        'write': write,
+        'threads': threads
+    }
+
+
+###########################################################################
+class ResourceMonitor(threading.Thread):
+    '''
+    Thread sampling the resource usage of a tool and the processes it
+    starts, while the tool runs.
+
+    Memory is read from the totals the kernel keeps per process
+    (smaps_rollup) where available, rather than by walking the memory maps
+    of the processes. If the tool runs in its own cgroup, the usage of the
+    group is read instead of the usage of each process.
+
+    Args:
+        pid (int): Process id of the tool.
+        path (str): File the time series of the samples is written to, as
+            CSV with the columns in :data:`COLUMNS`.
+        cgroup (str): Path of the cgroup v2 directory the tool runs in.
+        logger (logging.Logger): Logger used to warn about high system memory
+            usage.
+
+    Examples:
+        >>> monitor = ResourceMonitor(proc.pid, 'syn.resources.csv')
+        >>> monitor.start()
+        >>> proc.wait()
+        >>> monitor.stop()
+        >>> monitor.peak_rss
+        Peak RSS of the tool and its children, in bytes.
+    '''
+
+    def __init__(self, pid, path=None, cgroup=None, logger=None):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.path = path
+        self.cgroup = cgroup
+        self.logger = logger
+
+        #: Peak total RSS of the processes, in bytes.
+        self.peak_rss = 0
+        #: Peak total PSS of the processes, in bytes, or RSS where PSS is not
+        #: available.
+        self.peak_memory = 0
+        #: CPU time used by the processes, in seconds.
+        self.cpu_time = 0.0
+        #: Bytes read from and written to storage by the processes.
+        self.read_bytes = 0
+        self.write_bytes = 0
+        #: Time between the first and last samples, in seconds.
+        self.elapsed = 0.0
+
+        self.__stop = threading.Event()
+        self.__start_time = None
+        # Last counters seen per process, so processes which exited are
+        # still accounted for
+        self.__cpu = {}
+        self.__io = {}
+        self.__memory_warn_limit = MEMORY_WARN_LIMIT
+
+    @property
+    def cpu_utilization(self):
+        '''
+        Average CPU utilization of the processes, in percent of one CPU.
+        '''
+        if not self.elapsed:
+            return 0.0
+        return 100 * self.cpu_time / self.elapsed
+
+    def __sample_processes(self):
+        try:
+            parent = psutil.Process(self.pid)
+            procs = [parent, *parent.children(recursive=True)]
+        except psutil.Error:
+            return None
+
+        rss = pss = threads = 0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    # Process ids may be reused
+                    key = (proc.pid, proc.create_time())
+                    cpu_times = proc.cpu_times()
+                    threads += proc.num_threads()
+                    memory = _read_smaps_rollup(proc.pid)
+                    if memory is None:
+                        proc_rss = proc.memory_info().rss
+                        memory = (proc_rss, proc_rss)
+                    try:
+                        io = proc.io_counters()
+                        self.__io[key] = (io.read_bytes, io.write_bytes)
+                    except (psutil.AccessDenied, AttributeError):
+                        # Not available on all platforms
+                        pass
+            except psutil.Error:
+                # Process exited while it was sampled
+                continue
+            except PermissionError:
+                # OS is preventing access to this information
+                continue
+            self.__cpu[key] = cpu_times.user + cpu_times.system
+            rss += memory[0]
+            pss += memory[1]
+
+        return {
+            'cpu': sum(self.__cpu.values()),
+            'rss': rss,
+            'pss': pss,
+            'read': sum(io[0] for io in self.__io.values()),
+            'write': sum(io[1] for io in self.__io.values()),
+            'threads': threads
+        }
+
+    def sample(self):
+        '''
+        Samples the resource usage and updates the peak and total usage.
+
+        Returns:
+            Dictionary with the values of the :data:`COLUMNS`, or None if
+            the usage could not be read.
+        '''
+        now = time.monotonic()
+        if self.__start_time is None:
+            self.__start_time = now
+
+        if self.cgroup:
+            usage = read_cgroup(self.cgroup)
+        else:
+            usage = self.__sample_processes()
+        if usage is None:
+            return None
+
+        elapsed = now - self.__start_time
+        cpu_percent = 0.0
+        if elapsed > self.elapsed:
+            cpu_percent = 100 * (usage['cpu'] - self.cpu_time) / (elapsed - self.elapsed)
+
+        self.elapsed = elapsed
+        self.cpu_time = max(self.cpu_time, usage['cpu'])
+        self.peak_rss = max(self.peak_rss, usage['rss'])
+        self.peak_memory = max(self.peak_memory, usage['pss'])
+        self.read_bytes = max(self.read_bytes, usage['read'])
+        self.write_bytes = max(self.write_bytes, usage['write'])
+
+        self.__check_system_memory()
+
+        return {
+            'time': round(elapsed, 3),
+            'cpu': round(max(0.0, cpu_percent), 1),
+            'rss': usage['rss'],
+            'pss': usage['pss'],
+            'read': usage['read'],
+            'write': usage['write'],
+            'threads': usage['threads']
+        }
+
+    def __check_system_memory(self):
+        if not self.logger:
+            return
+        memory_usage = psutil.virtual_memory()
+        if memory_usage.percent > self.__memory_warn_limit:
+            self.logger.warning(f'Current system memory usage is {memory_usage.percent}%')
+
+            # increase limit warning
+            self.__memory_warn_limit = int(memory_usage.percent + 1)
+
+    def run(self):
+        writer = None
+        f = None
+        if self.path:
+            f = open(self.path, 'w', newline='')
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+
+        try:
+            interval = MIN_INTERVAL
+            last_memory = None
+            while not self.__stop.is_set():
+                row = self.sample()
+                if row is None:
+                    # The tool exited
+                    break
+                if writer:
+                    writer.writerow(row)
+                    f.flush()
+
+                if last_memory and \
+                        abs(row['rss'] - last_memory) > CHANGE_THRESHOLD * last_memory:
+                    interval = max(MIN_INTERVAL, interval / INTERVAL_GROWTH)
+                else:
+                    interval = min(MAX_INTERVAL, interval * INTERVAL_GROWTH)
+                last_memory = row['rss']
+
+                self.__stop.wait(interval)
+        finally:
+            if f:
+                f.close()
+
+    def stop(self):
+        '''
+        Stops sampling and waits for the thread to exit.
+        '''
+        self.__stop.set()
+        if self.is_alive():
+            self.join()
+        if self.cgroup:
+            # The group keeps the usage of the processes after they exit
+            self.sample()
@@ -1,11 +1,13 @@
-import os
 import shlex
 import subprocess
-import stat
-import time
 import uuid
 import json
 from siliconcompiler import utils
+from siliconcompiler.scheduler import backend
+from siliconcompiler.scheduler.backend import get_configuration_directory
+
+# Seconds between queries of the states of the outstanding slurm jobs.
+POLL_INTERVAL = 3.0
 
 # Full list of Slurm states, split into 'active' and 'inactive' categories.
 # Many of these do not apply to a minimal configuration, but we'll track them all.
@@ -38,133 +40,223 @@ SLURM_INACTIVE_STATES = [
     'SUSPENDED',
     'TIMEOUT',
 ]
+# State reported for jobs which slurm no longer knows about, and which are
+# not recorded by accounting.
+SLURM_PURGED_STATE = 'PURGED'
 
 
 ###########################################################################
-def get_configuration_directory(chip):
+class SlurmBackend(backend.SchedulerBackend):
     '''
-    Helper function to get the configuration directory for the scheduler
+    Runs nodes on a slurm cluster.
+
+    The states of all the outstanding jobs are queried with one squeue call
+    per interval. If ['option', 'scheduler', 'jobarray'] is set, the indices
+    of a step which are submitted together are run as a single job array.
     '''
 
-    return f'{chip._getworkdir()}/configs'
+    def __init__(self, chip):
+        super().__init__(chip)
+        self.poll_interval = POLL_INTERVAL
+        self.__arrays = 0
 
+    def submit(self, nodes):
+        chip = self.chip
+        job_hash = chip.get('record', 'remoteid')
+        if not job_hash:
+            # Generate a new uuid since it was not set
+            job_hash = uuid.uuid4().hex
+        cfg_dir = get_configuration_directory(chip)
 
-###########################################################################
-def _defernode(chip, step, index):
-    '''
-    Helper method to run an individual step on a slurm cluster.
+        groups = {}
+        for step, index in nodes:
+            options = _get_schedule_options(chip, step, index)
+            if chip.get('option', 'scheduler', 'jobarray'):
+                key = (step, tuple(options))
+            else:
+                key = (step, index)
+            groups.setdefault(key, (options, []))[1].append((step, index))
 
-    Blocks until the compute node
-    finishes processing this step, and it sets the active/error bits.
-    '''
+        node_job_ids = {}
+        for options, group in groups.values():
+            if len(group) == 1:
+                step, index = group[0]
+                files = backend.get_node_files(chip, step, index)
+                job_id = self.__sbatch(
+                    group,
+                    options + ['--job-name', f'{job_hash}_{step}{index}',
+                               '--output', files['log'],
+                               files['script']])
+                job_ids = [job_id]
+            else:
+                step = group[0][0]
+                self.__arrays += 1
+                script_file = f'{cfg_dir}/{step}_array{self.__arrays}.sh'
+                node_files = [backend.get_node_files(chip, *node) for node in group]
+                with open(script_file, 'w') as sf:
+                    sf.write(utils.get_file_template('slurm/array.sh').render(
+                        scripts=[shlex.quote(files['script']) for files in node_files],
+                        logs=[shlex.quote(files['log']) for files in node_files]
+                    ))
+                backend.make_executable(script_file)
 
-    # Determine which HPC job scheduler being used.
-    scheduler_type = chip.get('option', 'scheduler', 'name', step=step, index=index)
+                job_id = self.__sbatch(
+                    group,
+                    options + ['--array', f'0-{len(group) - 1}',
+                               '--job-name', f'{job_hash}_{step}',
+                               '--output', f'{cfg_dir}/{step}_array{self.__arrays}.log',
+                               script_file])
+                job_ids = [f'{job_id}_{n}' for n in range(len(group))]
+
+            for node, node_job_id in zip(group, job_ids):
+                node_job_ids[node] = node_job_id if job_id else None
+
+        return [node_job_ids[node] for node in nodes]
+
+    def __sbatch(self, nodes, args):
+        '''
+        Submits a job and returns its ID, or None if the submission failed.
+        '''
+        submit = subprocess.run(['sbatch', '--parsable'] + args,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        result_msg = submit.stdout.decode().strip()
+        # The cluster name may follow the job ID
+        job_id = result_msg.split(';')[0]
 
-    if scheduler_type != 'slurm':
-        raise ValueError(f'{scheduler_type} is not a supported scheduler')
+        # Fail the nodes if the batch ID is not an integer.
+        if submit.returncode != 0 or not job_id.isdigit():
+            for step, index in nodes:
+                self.chip.logger.error(f'sbatch command for {step}{index} failed.')
+                self.chip.logger.error(f'sbatch output for {step}{index}: {result_msg}')
+            return None
+
+        return job_id
+
+    def poll(self, job_ids):
+        states = {}
+        for job_id, state in _query_job_states(job_ids, logger=self.chip.logger).items():
+            # Jobs have a number of potential states that they can be in if they
+            # are still active in the Slurm scheduler.
+            if state == 'PENDING':
+                states[job_id] = backend.JOB_PENDING
+            elif state in SLURM_ACTIVE_STATES:
+                states[job_id] = backend.JOB_RUNNING
+            # 'COMPLETED' is a special case indicating successful job termination.
+            elif state == 'COMPLETED':
+                states[job_id] = backend.JOB_COMPLETED
+            elif state == SLURM_PURGED_STATE:
+                # May have already completed and been purged from active list.
+                states[job_id] = backend.JOB_COMPLETED
+            else:
+                # FAILED, TIMEOUT, etc.
+                self.chip.logger.error(f'Slurm job {job_id} ended with state {state}.')
+                states[job_id] = backend.JOB_FAILED
+
+        # Jobs whose state could not be determined keep their previous state
+        return states
+
+    def cancel(self, job_ids):
+        subprocess.run(['scancel'] + list(job_ids),
+                       stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+
+
+def _get_schedule_options(chip, step, index):
+    '''
+    Returns the sbatch options of a node, which are shared by the nodes that
+    can be submitted together as a job array.
+    '''
 
     # Determine which cluster parititon to use. (Default value can be overridden on per-step basis)
     partition = chip.get('option', 'scheduler', 'queue', step=step, index=index)
     if not partition:
         partition = _get_slurm_partition()
 
-    # Get the temporary UID associated with this job run.
-    job_hash = chip.get('record', 'remoteid')
-    if not job_hash:
-        # Generate a new uuid since it was not set
-        job_hash = uuid.uuid4().hex
-
-    job_name = f'{job_hash}_{step}{index}'
-
-    # Write out the current schema for the compute node to pick up.
-    cfg_dir = get_configuration_directory(chip)
-    cfg_file = f'{cfg_dir}/{step}{index}.json'
-    log_file = f'{cfg_dir}/{step}{index}.log'
-    script_file = f'{cfg_dir}/{step}{index}.sh'
-    os.makedirs(cfg_dir, exist_ok=True)
-
-    chip.set('option', 'scheduler', 'name', None, step=step, index=index)
-    chip.write_manifest(cfg_file)
-
-    # Allow user-defined compute node execution script if it already exists on the filesystem.
-    # Otherwise, create a minimal script to run the task using the SiliconCompiler CLI.
-    if not os.path.isfile(script_file):
-        with open(script_file, 'w') as sf:
-            sf.write(utils.get_file_template('slurm/run.sh').render(
-                cfg_file=shlex.quote(cfg_file),
-                build_dir=shlex.quote(chip.get("option", "builddir")),
-                step=shlex.quote(step),
-                index=shlex.quote(index)
-            ))
-
-    # This is Python for: `chmod +x [script_path]`
-    os.chmod(script_file,
-             os.stat(script_file).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
-
-    schedule_cmd = ['sbatch',
-                    '--exclusive',
-                    '--partition', partition,
-                    '--chdir', chip.cwd,
-                    '--job-name', job_name,
-                    '--output', log_file]
+    options = ['--exclusive',
+               '--partition', partition,
+               '--chdir', chip.cwd]
 
     # Only delay the starting time if the 'defer' Schema option is specified.
     defer_time = chip.get('option', 'scheduler', 'defer', step=step, index=index)
     if defer_time:
-        schedule_cmd.extend(['--begin', defer_time])
-
-    schedule_cmd.append(script_file)
-
-    # Run the 'srun' command, and track its output.
-    # TODO: output should be fed to log, and stdout if quiet = False
-    step_result = subprocess.Popen(schedule_cmd,
-                                   stdout=subprocess.PIPE,
-                                   stderr=subprocess.STDOUT)
-
-    # Wait for the subprocess call to complete. It should already be done,
-    # as it has closed its output stream. But if we don't call '.wait()',
-    # the '.returncode' value will not be set correctly.
-    step_result.wait()
-    result_msg = step_result.stdout.read().decode()
-    sbatch_id = result_msg.split(' ')[-1].strip()
-    retcode = 0
-
-    while True:
-        # Return early with an error if the batch ID is not an integer.
-        if not sbatch_id.isdigit():
-            retcode = 1
-            break
-
-        # Rate-limit the status checks to once every few seconds.
-        time.sleep(3.0)
-
-        # Check whether the job is still running.
-        jobcheck = subprocess.run(['scontrol', 'show', 'job', sbatch_id],
+        options.extend(['--begin', defer_time])
+
+    return options
+
+
+def _query_job_states(job_ids, logger=None):
+    '''
+    Returns the states of slurm jobs, using one squeue call for the jobs
+    slurm still knows about and one sacct call for the jobs which already
+    terminated.
+
+    Jobs which are neither reported by squeue nor by accounting are only
+    reported as :data:`SLURM_PURGED_STATE` if squeue explicitly rejects
+    their ID. Jobs whose state cannot be determined, for example because
+    slurmctld is not reachable, are left out.
+
+    Args:
+        job_ids (list of str): Jobs to query. Job array elements are
+            identified as <array job ID>_<array index>.
+        logger (logging.Logger): Logger used to report failed queries.
+    '''
+
+    job_ids = list(job_ids)
+    states = {}
+
+    # Only array job IDs are accepted for array elements.
+    query_ids = sorted(set([job_id.split('_')[0] for job_id in job_ids]))
+    jobcheck = _squeue(query_ids)
+    if jobcheck.returncode != 0 and not _is_invalid_job_id(jobcheck):
+        if logger:
+            logger.warning(f'Unable to query slurm job states: {jobcheck.stderr.strip()}')
+        return states
+    states.update(_parse_job_states(jobcheck.stdout))
+
+    finished = [job_id for job_id in job_ids if job_id not in states]
+    if finished:
+        # Terminated jobs are only reported by accounting, if it is enabled.
+        jobcheck = subprocess.run(['sacct', '--noheader', '--parsable2', '--allocations',
+                                   '--format', 'JobID,State',
+                                   '--jobs', ','.join(sorted(finished))],
                                   stdout=subprocess.PIPE,
-                                  stderr=subprocess.STDOUT)
-        jobout = jobcheck.stdout.decode()
-
-        # Jobs have a number of potential states that they can be in if they
-        # are still active in the Slurm scheduler.
-        if [state for state in SLURM_ACTIVE_STATES if state in jobout]:
-            pass
-        # 'COMPLETED' is a special case indicating successful job termination.
-        elif 'COMPLETED' in jobout:
-            break
-        elif 'Invalid job id specified' in jobout:
-            # May have already completed and been purged from active list.
-            break
-        # Jobs have a number of potential states that they can be in if they
-        # did not terminate successfully.
-        elif [state for state in SLURM_INACTIVE_STATES if state in jobout]:
-            # FAILED, TIMEOUT, etc.
-            retcode = 1
-            break
-
-    if retcode > 0:
-        chip.logger.error(f'srun command for {step} failed.')
-        chip.logger.error(f'srun output for {step}: {jobout}')
+                                  stderr=subprocess.PIPE,
+                                  universal_newlines=True)
+        if jobcheck.returncode == 0:
+            states.update(_parse_job_states(jobcheck.stdout.replace('|', ' ')))
+
+    finished = [job_id for job_id in job_ids if job_id not in states]
+    for query_id in sorted(set([job_id.split('_')[0] for job_id in finished])):
+        if _is_invalid_job_id(_squeue([query_id])):
+            for job_id in finished:
+                if job_id.split('_')[0] == query_id:
+                    states[job_id] = SLURM_PURGED_STATE
+
+    return states
+
+
+def _squeue(query_ids):
+    return subprocess.run(['squeue', '--noheader', '--array', '--states', 'all',
+                           '--format', '%i %T',
+                           '--jobs', ','.join(query_ids)],
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE,
+                          universal_newlines=True)
+
+
+def _is_invalid_job_id(jobcheck):
+    return jobcheck.returncode != 0 and 'Invalid job id specified' in jobcheck.stderr
+
+
+def _parse_job_states(output):
+    states = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) >= 2:
+            # Some states are followed by details, such as 'CANCELLED by 1000'
+            states[fields[0]] = fields[1].rstrip('+')
+    return states
 
 
 def _get_slurm_partition():
@@ -179,3 +271,6 @@ def _get_slurm_partition():
 
     # Return the first listed partition
     return sinfo['nodes'][0]['partitions'][0]
+
+
+backend.register_backend('slurm', SlurmBackend)
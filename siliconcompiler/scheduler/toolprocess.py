@@ -0,0 +1,382 @@
+import codecs
+import locale
+import os
+import selectors
+import subprocess
+import sys
+import threading
+import time
+try:
+    import fcntl
+except ImportError:
+    # Not available on windows
+    fcntl = None
+
+# Amount of tool output read from a pipe at a time, and size requested for
+# the pipes of the tool where it can be changed.
+READ_SIZE = 1024 * 1024
+
+# Pause after reading output, so tools printing many short lines are read in
+# a few large reads rather than one read per line.
+READ_BATCH_INTERVAL = 0.02
+
+# Size of the buffer of the files tool output is teed to.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Longest time tool output stays in the write buffer before reaching the file.
+FLUSH_INTERVAL = 1.0
+
+# Lines of tool output forwarded to the logger at once, and per second after
+# that. Lines beyond the limit are only written to the file.
+LOG_BURST = 1000
+LOG_RATE = 200
+
+# Longest wait between checks for the exit of the tool, when it cannot be
+# watched directly.
+EXIT_CHECK_INTERVAL = 0.5
+
+
+###########################################################################
+class LogRateLimiter:
+    '''
+    Token bucket limiting the number of lines of tool output forwarded to the
+    logger, so tools printing thousands of lines per second do not spend the
+    run formatting them. The number of lines skipped is reported once lines
+    are forwarded again.
+
+    Args:
+        logger (logging.Logger): Logger reporting skipped lines.
+        burst (int): Number of lines forwarded at once.
+        rate (float): Number of lines forwarded per second after a burst.
+    '''
+
+    def __init__(self, logger, burst=LOG_BURST, rate=LOG_RATE):
+        self.logger = logger
+        self.__burst = burst
+        self.__rate = rate
+        self.__tokens = burst
+        self.__time = time.monotonic()
+        self.__skipped = 0
+        self.__lock = threading.Lock()
+
+    def forward(self, log_func, lines):
+        '''
+        Forwards lines to a logging function, as far as the limit allows.
+
+        Args:
+            log_func (function): Logging function, such as logger.info.
+            lines (list of str): Lines to forward.
+        '''
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.__burst,
+                                self.__tokens + (now - self.__time) * self.__rate)
+            self.__time = now
+
+            count = min(len(lines), int(self.__tokens))
+            self.__tokens -= count
+            if count:
+                self.__report()
+            for line in lines[:count]:
+                log_func(line)
+            self.__skipped += len(lines) - count
+
+    def close(self):
+        '''
+        Reports the lines skipped since lines were last forwarded.
+        '''
+        with self.__lock:
+            self.__report()
+
+    def __report(self):
+        if self.__skipped:
+            self.logger.warning(f'Skipped displaying {self.__skipped} lines of tool output, '
+                                'see the log file for the complete output')
+            self.__skipped = 0
+
+
+###########################################################################
+class _OutputStream:
+    '''
+    Tees the output read from a pipe into a file and, line by line, into a
+    logging function.
+    '''
+
+    def __init__(self, name, writer, log_func, limiter):
+        self.name = name
+        self.pipe = None
+        self.__writer = writer
+        self.__log_func = log_func
+        self.__limiter = limiter
+        self.__decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(
+            errors='replace_with_warning')
+        self.__partial = ''
+
+    def read(self):
+        '''
+        Reads the output available in the pipe, returns False once the pipe
+        is closed.
+        '''
+        data = os.read(self.pipe.fileno(), READ_SIZE)
+        if not data:
+            return False
+
+        self.__writer.write(data)
+        self.__forward(self.__decoder.decode(data))
+        return True
+
+    def read_all(self):
+        '''
+        Reads the pipe until it is closed.
+        '''
+        try:
+            while self.read():
+                pass
+        except (OSError, ValueError):
+            # The pipe or the file was closed while reading
+            pass
+
+    def __forward(self, text):
+        lines = (self.__partial + text).split('\n')
+        self.__partial = lines.pop()
+        if lines:
+            self.__limiter.forward(self.__log_func, [line.rstrip() for line in lines])
+
+    def flush(self):
+        self.__writer.flush()
+
+    def close(self):
+        # Forward the last line, which may not end in a newline
+        self.__partial += self.__decoder.decode(b'', final=True)
+        if self.__partial:
+            self.__limiter.forward(self.__log_func, [self.__partial.rstrip()])
+            self.__partial = ''
+        if self.pipe:
+            self.pipe.close()
+        self.__writer.close()
+
+
+###########################################################################
+class ToolProcess:
+    '''
+    Runs a tool, teeing its stdout and stderr to files and to the logger.
+
+    The pipes of the tool are read as soon as output is available, using
+    selectors on posix systems and a thread per pipe elsewhere. Streams
+    which are not forwarded to the logger are given to the tool as files, so
+    their output is never copied. Waiting for the tool ends as soon as it
+    exits, even when processes it started keep its pipes open.
+
+    Args:
+        cmdlist (list of str): Command to run.
+        stdout_file (str): File stdout is written to.
+        stderr_file (str): File stderr is written to. If it is stdout_file,
+            stderr is merged into stdout.
+        logger (logging.Logger): Logger output is forwarded to.
+        log_stdout (bool): If True, stdout lines are forwarded to logger.info.
+        log_stderr (bool): If True, stderr lines are forwarded to logger.error.
+        preexec_fn (function): Function called in the tool process before the
+            tool starts.
+
+    Examples:
+        >>> with ToolProcess(['yosys', '-c', 'sc_syn.tcl'], 'syn.log', 'syn.log',
+        ...                  chip.logger) as tool:
+        ...     retcode = tool.wait(timeout=3600)
+        Runs yosys, displaying its output while writing it to syn.log.
+    '''
+
+    def __init__(self, cmdlist, stdout_file, stderr_file, logger,
+                 log_stdout=True, log_stderr=True, preexec_fn=None):
+        self.cmdlist = cmdlist
+        self.proc = None
+        self.__limiter = LogRateLimiter(logger, burst=LOG_BURST, rate=LOG_RATE)
+        self.__streams = []
+        self.__tool_files = []
+        self.__threads = []
+        self.__selector = None
+        self.__pidfd = None
+
+        try:
+            stdout = self.__get_destination('stdout', stdout_file,
+                                            logger.info if log_stdout else None)
+            if stderr_file == stdout_file:
+                stderr = subprocess.STDOUT
+            else:
+                stderr = self.__get_destination('stderr', stderr_file,
+                                                logger.error if log_stderr else None)
+
+            self.proc = subprocess.Popen(cmdlist,
+                                         stdout=stdout,
+                                         stderr=stderr,
+                                         preexec_fn=preexec_fn)
+        except BaseException:
+            self.__close_files()
+            raise
+        finally:
+            # Files given to the tool are no longer needed here
+            for f in self.__tool_files:
+                f.close()
+
+        for stream in self.__streams:
+            stream.pipe = getattr(self.proc, stream.name)
+        self.__start_readers()
+
+    def __get_destination(self, name, path, log_func):
+        '''
+        Returns the Popen argument for a stream of the tool.
+        '''
+        if path == os.devnull:
+            return subprocess.DEVNULL
+        if not log_func:
+            f = open(path, 'wb')
+            self.__tool_files.append(f)
+            return f
+        writer = open(path, 'wb', buffering=WRITE_BUFFER_SIZE)
+        self.__streams.append(_OutputStream(name, writer, log_func, self.__limiter))
+        return subprocess.PIPE
+
+    def __start_readers(self):
+        if not self.__streams:
+            return
+
+        if sys.platform == 'win32':
+            # Pipes cannot be selected on windows
+            for stream in self.__streams:
+                thread = threading.Thread(target=stream.read_all, daemon=True)
+                thread.start()
+                self.__threads.append(thread)
+            return
+
+        self.__selector = selectors.DefaultSelector()
+        for stream in self.__streams:
+            if hasattr(fcntl, 'F_SETPIPE_SZ'):
+                # Larger pipes let the tool write while output is batched
+                try:
+                    fcntl.fcntl(stream.pipe, fcntl.F_SETPIPE_SZ, READ_SIZE)
+                except OSError:
+                    pass
+            self.__selector.register(stream.pipe, selectors.EVENT_READ, stream)
+        if hasattr(os, 'pidfd_open'):
+            # Becomes readable when the tool exits
+            try:
+                self.__pidfd = os.pidfd_open(self.proc.pid)
+                self.__selector.register(self.__pidfd, selectors.EVENT_READ, None)
+            except OSError:
+                self.__pidfd = None
+
+    def __open_pipes(self):
+        if not self.__selector:
+            return 0
+        return len(self.__selector.get_map()) - (self.__pidfd is not None)
+
+    def __read(self, wait_time):
+        '''
+        Reads the output available within wait_time, returns True if any
+        output was read.
+        '''
+        read = False
+        for key, _ in self.__selector.select(wait_time):
+            if key.data is None:
+                # The tool exited
+                continue
+            if key.data.read():
+                read = True
+            else:
+                self.__selector.unregister(key.fileobj)
+        return read
+
+    def wait(self, timeout=None, interval=None, callback=None):
+        '''
+        Waits for the tool to exit, forwarding its output meanwhile.
+
+        Args:
+            timeout (float): Seconds after which to stop waiting.
+            interval (float): Seconds between calls to callback.
+            callback (function): Function called with the Popen object of the
+                tool, at the start of the wait and then every interval seconds
+                while the tool runs.
+
+        Returns:
+            Return code of the tool.
+
+        Raises:
+            subprocess.TimeoutExpired: If the tool is still running after
+                timeout seconds.
+        '''
+        start = time.monotonic()
+        next_callback = start
+        next_flush = start + FLUSH_INTERVAL
+        while True:
+            now = time.monotonic()
+            if callback and now >= next_callback:
+                callback(self.proc)
+                next_callback = now + interval
+            if now >= next_flush:
+                self.__flush()
+                next_flush = now + FLUSH_INTERVAL
+
+            if self.proc.poll() is not None:
+                break
+            if timeout is not None and now - start >= timeout:
+                raise subprocess.TimeoutExpired(self.cmdlist, timeout)
+
+            deadlines = [next_flush]
+            if callback:
+                deadlines.append(next_callback)
+            if timeout is not None:
+                deadlines.append(start + timeout)
+            wait_time = max(0, min(deadlines) - now)
+
+            if self.__open_pipes():
+                if self.__pidfd is None:
+                    wait_time = min(wait_time, EXIT_CHECK_INTERVAL)
+                if self.__read(wait_time):
+                    time.sleep(min(wait_time, READ_BATCH_INTERVAL))
+            else:
+                try:
+                    self.proc.wait(wait_time)
+                except subprocess.TimeoutExpired:
+                    pass
+
+        # Read the output left in the pipes, without waiting for processes
+        # started by the tool which may keep them open
+        if self.__selector:
+            while self.__open_pipes() and \
+                    any(key.data for key, _ in self.__selector.select(0)):
+                self.__read(0)
+        for thread in self.__threads:
+            thread.join(EXIT_CHECK_INTERVAL)
+
+        return self.proc.returncode
+
+    def __flush(self):
+        for stream in self.__streams:
+            try:
+                stream.flush()
+            except ValueError:
+                # Closed by a reader thread failing
+                pass
+
+    def __close_files(self):
+        for stream in self.__streams:
+            stream.close()
+        self.__streams = []
+
+    def close(self):
+        '''
+        Closes the pipes of the tool and the files its output is written to.
+        '''
+        if self.__selector:
+            self.__selector.close()
+            self.__selector = None
+        if self.__pidfd is not None:
+            os.close(self.__pidfd)
+            self.__pidfd = None
+        self.__close_files()
+        self.__limiter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -11,7 +11,7 @@ try:
 except ImportError:
     from siliconcompiler.schema.utils import trim
 
-SCHEMA_VERSION = '0.40.6'
+SCHEMA_VERSION = '0.40.13'
 
 #############################################################################
 # PARAM DEFINITION
@@ -1847,7 +1847,9 @@ def schema_task(cfg, tool='default', task='default', step='default', index='defa
             of command line arguments for grep including the regex pattern to
             match. Starting with the first list entry, each grep output is piped
             into the following grep command in the list. Supported grep options
-            include ``-v`` and ``-e``. Patterns starting with "-" should be
+            include ``-v``, ``-i``, ``-x``, ``-w``, ``-o`` and ``-e``. With ``-o``,
+            only the matched part of a line is passed on and reported. Patterns
+            starting with "-" should be
             directly preceded by the ``-e`` option. The following example
             illustrates the concept.
 
@@ -2136,6 +2138,47 @@ def schema_task(cfg, tool='default', task='default', step='default', index='defa
             the threads based on the maximum thread count supported by the
             hardware.""")
 
+    scparam(cfg, ['tool', tool, 'task', task, 'limit', 'memory'],
+            sctype='int',
+            unit='MB',
+            pernode='optional',
+            shorthelp="Task: memory limit",
+            switch="-tool_task_limit_memory 'tool task <int>'",
+            example=["cli: -tool_task_limit_memory 'openroad route 16000'",
+                     "api: chip.set('tool', 'openroad', 'task', 'route', 'limit', 'memory', "
+                     "16000)"],
+            schelp="""
+            Maximum amount of memory the tool and the processes it starts may use,
+            specified in MB on a per task and per step basis. When a cgroup v2
+            hierarchy is delegated to the user, the tool runs in its own group with
+            this memory limit, and is stopped if it exceeds it. Otherwise, the limit
+            is applied to the address space of each process of the tool.""")
+
+    scparam(cfg, ['tool', tool, 'task', task, 'limit', 'cpu'],
+            sctype='float',
+            pernode='optional',
+            shorthelp="Task: CPU limit",
+            switch="-tool_task_limit_cpu 'tool task <float>'",
+            example=["cli: -tool_task_limit_cpu 'openroad route 4'",
+                     "api: chip.set('tool', 'openroad', 'task', 'route', 'limit', 'cpu', 4)"],
+            schelp="""
+            Maximum number of CPUs the tool and the processes it starts may use
+            at once, specified on a per task and per step basis. Fractions of a
+            CPU are allowed. The limit is only applied when a cgroup v2 hierarchy
+            is delegated to the user, in which case the tool runs in its own
+            group with this CPU quota.""")
+
+    scparam(cfg, ['tool', tool, 'task', task, 'limit', 'files'],
+            sctype='int',
+            pernode='optional',
+            shorthelp="Task: open files limit",
+            switch="-tool_task_limit_files 'tool task <int>'",
+            example=["cli: -tool_task_limit_files 'openroad route 1024'",
+                     "api: chip.set('tool', 'openroad', 'task', 'route', 'limit', 'files', 1024)"],
+            schelp="""
+            Maximum number of files each process of the tool may have open at
+            once, specified on a per task and per step basis.""")
+
     return cfg
 
 
@@ -2449,7 +2492,58 @@ def schema_metric(cfg, step='default', index='default'):
             pernode='required',
             schelp="""
             Metric tracking total peak program memory footprint on a per
-            step and index basis.""")
+            step and index basis. The footprint of the tool and the processes
+            it starts is measured as their proportional set size (PSS) where
+            available, and as their resident set size (RSS) otherwise.""")
+
+    item = 'peakrss'
+    scparam(cfg, ['metric', item],
+            sctype='float',
+            unit='B',
+            scope='job',
+            shorthelp=f"Metric: {item}",
+            switch=f"-metric_{item} 'step index <float>'",
+            example=[
+                f"cli: -metric_{item} 'dfm 0 10e9'",
+                f"api: chip.set('metric', '{item}', 10e9, step='dfm', index=0)"],
+            pernode='required',
+            schelp="""
+            Metric tracking the peak total resident set size (RSS) of the
+            tool and the processes it starts on a per step and index basis.
+            Unlike :keypath:`metric, memory`, memory shared between the
+            processes is counted once per process.""")
+
+    item = 'cpuutilization'
+    scparam(cfg, ['metric', item],
+            sctype='float',
+            unit='%',
+            scope='job',
+            shorthelp=f"Metric: {item}",
+            switch=f"-metric_{item} 'step index <float>'",
+            example=[
+                f"cli: -metric_{item} 'dfm 0 350.0'",
+                f"api: chip.set('metric', '{item}', 350.0, step='dfm', index=0)"],
+            pernode='required',
+            schelp="""
+            Metric tracking the average CPU utilization of the tool and the
+            processes it starts on a per step and index basis, in percent of
+            one CPU. Tools using several threads can exceed 100%.""")
+
+    item = 'iobytes'
+    scparam(cfg, ['metric', item],
+            sctype='float',
+            unit='B',
+            scope='job',
+            shorthelp=f"Metric: {item}",
+            switch=f"-metric_{item} 'step index <float>'",
+            example=[
+                f"cli: -metric_{item} 'dfm 0 10e9'",
+                f"api: chip.set('metric', '{item}', 10e9, step='dfm', index=0)"],
+            pernode='required',
+            schelp="""
+            Metric tracking the total number of bytes read from and written
+            to storage by the tool and the processes it starts on a per step
+            and index basis.""")
 
     item = 'exetime'
     scparam(cfg, ['metric', item],
@@ -2567,6 +2661,18 @@ def schema_record(cfg, step='default', index='default'):
                              systems, extracting information from is platform dependent.
                              For Linux based operating systems, the 'osversion' is the
                              version of the distro."""],
+               'nodecache': ['node cache result',
+                             'hit',
+                             """Set to 'hit' if the results of the node were restored from
+                             the node cache, or to 'miss' if the node was run. Not set if
+                             the node cache is not used."""],
+               'resourcelimit': ['exceeded resource limit',
+                                 'memory',
+                                 """Set to 'memory' if the tool was stopped for exceeding
+                                 :keypath:`tool, <tool>, task, <task>, limit, memory`, or to
+                                 'timeout' if it was stopped for exceeding
+                                 :keypath:`flowgraph, <flow>, <step>, <index>, timeout`.
+                                 Not set if the tool did not exceed a limit."""],
                'kernelversion': ['O/S kernel version',
                                  '5.11.0-34-generic',
                                  """Used for platforms that support a distinction
@@ -2691,6 +2797,24 @@ def schema_option(cfg):
             cache parameter is empty, ".sc/cache" directory in the user's home
             directory will be used.""")
 
+    scparam(cfg, ['option', 'nodecache'],
+            sctype='str',
+            scope='job',
+            pernode='optional',
+            shorthelp="Node result cache directory",
+            switch="-nodecache <str>",
+            example=[
+                "cli: -nodecache /home/user/.sc/nodecache",
+                "api: chip.set('option', 'nodecache', '/home/user/.sc/nodecache')"],
+            schelp="""
+            Directory of the cache used to reuse the results of nodes across jobs.
+            Results are keyed on the tool, task and tool version, on the values of
+            the parameters required by the task, and on the contents of the input
+            files of the node. If a node with the same key was run before, its
+            outputs, reports, log and metrics are restored from the cache instead of
+            running the tool. The directory can be shared between users. If the
+            parameter is empty, the node cache is not used.""")
+
     scparam(cfg, ['option', 'nice'],
             sctype='int',
             scope='job',
@@ -3141,6 +3265,21 @@ def schema_option(cfg):
             flow that failed partway through.
             """)
 
+    scparam(cfg, ['option', 'deltamanifest'],
+            sctype='bool',
+            scope='job',
+            shorthelp="Write delta manifests",
+            switch="-deltamanifest <bool>",
+            example=["cli: -deltamanifest",
+                     "api: chip.set('option', 'deltamanifest', True)"],
+            schelp="""
+            Instead of the complete manifest, each task writes a manifest into
+            its outputs directory which only records the parameters modified
+            while running the task, including the results merged from its
+            inputs. The complete manifest is reconstructed from the manifest in
+            the task's inputs directory when it is read, so the inputs directory
+            must be kept along with the outputs directory.""")
+
     scparam(cfg, ['option', 'track'],
             sctype='bool',
             pernode='optional',
@@ -3388,7 +3527,7 @@ def schema_option(cfg):
     # job scheduler
     scparam(cfg, ['option', 'scheduler', 'name'],
             sctype='enum',
-            enum=["slurm", "lsf", "sge"],
+            enum=["slurm", "lsf", "sge", "local"],
             scope='job',
             pernode='optional',
             shorthelp="Option: Scheduler platform",
@@ -3403,7 +3542,8 @@ def schema_option(cfg):
             the host running the 'sc' command must be running a 'slurmctld' daemon
             managing a Slurm cluster. Additionally, the build directory ('-dir')
             must be located in shared storage which can be accessed by all hosts
-            in the cluster.""")
+            in the cluster. If 'local' is used, each step is run as a separate
+            process on the local machine, in the same way as on a cluster.""")
 
     scparam(cfg, ['option', 'scheduler', 'cores'],
             sctype='int',
@@ -3432,7 +3572,10 @@ def schema_option(cfg):
             Specifies the amount of memory required to run the job,
             specified in MB. For the slurm scheduler, this translates to
             the '--mem' switch. For more information, see the job
-            scheduler documentation""")
+            scheduler documentation. When running locally, nodes are only
+            started when the memory required by all running nodes fits in
+            the available memory. If the parameter is not set, the peak
+            memory recorded by previous runs of the node is used.""")
 
     scparam(cfg, ['option', 'scheduler', 'queue'],
             sctype='str',
@@ -3520,6 +3663,31 @@ def schema_option(cfg):
             Maximum number of concurrent nodes to run in a job. If not set this will default
             to the number of cpu cores available.""")
 
+    scparam(cfg, ['option', 'scheduler', 'workerpool'],
+            sctype='bool',
+            shorthelp="Option: Use persistent workers",
+            switch="-workerpool <bool>",
+            example=["cli: -workerpool",
+                     "api: chip.set('option', 'scheduler', 'workerpool', True)"],
+            schelp="""
+            Runs local nodes in a pool of worker processes which are kept alive
+            across nodes and jobs in the same Python session, instead of
+            starting a new process for each node. This avoids the startup cost
+            of each node, which dominates the runtime of flows with many short
+            tasks.""")
+
+    scparam(cfg, ['option', 'scheduler', 'jobarray'],
+            sctype='bool',
+            shorthelp="Option: Submit indices as job arrays",
+            switch="-jobarray <bool>",
+            example=["cli: -jobarray",
+                     "api: chip.set('option', 'scheduler', 'jobarray', True)"],
+            schelp="""
+            Submits the indices of a step which are ready at the same time as
+            a single job array, instead of one job per index. This only applies
+            to schedulers which support job arrays, such as slurm, and to
+            indices which use the same scheduler settings.""")
+
     return cfg
 
 
@@ -15,6 +15,7 @@ import pathlib
 import argparse
 import sys
 import shlex
+import weakref
 
 try:
     import yaml
@@ -22,6 +23,12 @@ try:
 except ImportError:
     _has_yaml = False
 
+try:
+    import msgpack
+    _has_msgpack = True
+except ImportError:
+    _has_msgpack = False
+
 from .schema_cfg import schema_cfg
 from .utils import escape_val_tcl, PACKAGE_ROOT
 
@@ -50,38 +57,275 @@ class Schema:
     GLOBAL_KEY = 'global'
     PERNODE_FIELDS = ('value', 'filehash', 'date', 'author', 'signature', 'package')
 
+    # Default configuration per schema class, shared by all objects of that
+    # class and never modified in place.
+    __cfg_templates = {}
+
+    # Top level key of delta manifests, see ['option', 'deltamanifest']
+    _DELTA_KEY = 'deltamanifest'
+
     def __init__(self, cfg=None, manifest=None, logger=None):
         if cfg is not None and manifest is not None:
             raise ValueError('You may not specify both cfg and manifest')
 
         self._init_logger(logger)
 
+        # Keypath index, maps resolved keypaths to their location in cfg
+        self.__keypath_index = {}
+
+        # Flowgraph indexes, by flow, see siliconcompiler.flowgraph. Dropped
+        # whenever the nodes or edges of their flow may have changed.
+        self.__flowgraph_indexes = {}
+
+        # Copy-on-write ownership, maps id() to the dictionaries this object
+        # may modify in place. None when no part of cfg is shared.
+        self.__owned = None
+
+        # Live objects returned by history(), which modify their job in place
+        self.__history_views = weakref.WeakSet()
+        self.__history_job = None
+
         if manifest is not None:
             # Normalize value to string in case we receive a pathlib.Path
-            cfg = Schema.__read_manifest_file(str(manifest))
+            cfg = Schema.__load_manifest(str(manifest))
         else:
             cfg = copy.deepcopy(cfg)
 
         if cfg is not None:
-            try:
-                if Schema._dict_requires_normalization(cfg):
-                    cfg = Schema._dict_to_schema(cfg)
-                self.cfg = cfg
-            except (TypeError, ValueError) as e:
-                raise ValueError('Attempting to read manifest with '
-                                 f'incompatible schema version: {e}') \
-                    from e
+            self.__load_cfg(cfg)
         else:
-            self.cfg = self._init_schema_cfg()
+            self.__init_from_template()
+
+    ###########################################################################
+    def __load_cfg(self, cfg):
+        '''
+        Normalizes and sets a configuration dictionary read from a file.
+        '''
+        try:
+            if Schema._dict_requires_normalization(cfg):
+                # Manifests written with this schema version only hold
+                # normalized values, except for tuples which JSON and
+                # YAML store as lists
+                version = Schema._dict_schema_version(self.__template_cfg())
+                tuples_only = version is not None and \
+                    version == Schema._dict_schema_version(cfg)
+                cfg = Schema._dict_to_schema(cfg, tuples_only=tuples_only)
+            self.cfg = cfg
+        except (TypeError, ValueError) as e:
+            raise ValueError('Attempting to read manifest with '
+                             f'incompatible schema version: {e}') \
+                from e
+
+    ###########################################################################
+    @property
+    def cfg(self):
+        '''
+        Schema configuration dictionary.
+
+        Callers may modify the returned dictionary in place, so it is never
+        shared with copies of this schema and the keypath index is dropped
+        whenever it is handed out. Use :meth:`getdict` to read the
+        configuration without these costs.
+        '''
+        self.__materialize()
+        self._reset_keypath_index()
+        return self.__cfg
+
+    @cfg.setter
+    def cfg(self, cfg):
+        self.__cfg = cfg
+        self.__owned = None
+        self._reset_keypath_index()
+
+    ###########################################################################
+    def __init_from_template(self):
+        '''
+        Initializes cfg with the default configuration, which is only built
+        once per schema class and then shared (copy-on-write) between objects,
+        so objects only copy the parameters they modify.
+        '''
+        self.__cfg = self.__template_cfg()
+        self.__owned = {}
+        self._reset_keypath_index()
+
+    ###########################################################################
+    def __template_cfg(self):
+        '''
+        Returns the shared default configuration of this schema class, which
+        must not be modified.
+        '''
+        schema_class = type(self)
+        template = Schema.__cfg_templates.get(schema_class)
+        if template is None:
+            template = self._init_schema_cfg()
+            Schema.__cfg_templates[schema_class] = template
+        return template
+
+    ###########################################################################
+    def __materialize(self):
+        '''
+        Replaces any configuration shared with copies of this object by a
+        private deep copy.
+        '''
+        if self.__owned is None:
+            return
+
+        # Jobs referenced by history() views are already private and must
+        # stay in place
+        viewed = self.__viewed_history()
+        self.cfg = Schema._copy_cfg(self.__cfg)
+        for job, cfg in viewed.items():
+            self.__cfg['history'][job] = cfg
+
+    ###########################################################################
+    def __viewed_history(self):
+        '''
+        Returns the history jobs modified in place by live history() views.
+        '''
+        history = self.__cfg.get('history', {})
+        viewed = {}
+        for view in self.__history_views:
+            cfg = history.get(view.__history_job)
+            if cfg is not None and cfg is view.__cfg:
+                viewed[view.__history_job] = cfg
+        return viewed
+
+    ###########################################################################
+    def __claim(self, parent, key, keypath):
+        '''
+        Returns parent[key], copying it first if it is shared with another
+        object. Leaves are deep copied, while branches are copied shallowly
+        since their children are claimed one at a time as they are modified.
+        '''
+        cfg = parent[key]
+        if id(cfg) in self.__owned:
+            return cfg
+
+        if Schema._is_leaf(cfg):
+            cfg = Schema._copy_cfg(cfg)
+        else:
+            cfg = dict(cfg)
+        parent[key] = cfg
+        self.__owned[id(cfg)] = cfg
+
+        if 'default' in keypath:
+            # Other keypaths may resolve to this dictionary
+            self._reset_keypath_index()
+        else:
+            self._reset_keypath_index(*keypath)
+
+        return cfg
+
+    ###########################################################################
+    def __search_shared(self, *keypath, insert_defaults=False):
+        '''
+        Copy-on-write version of _search(), which claims every dictionary
+        along the keypath so the returned cfg can be modified in place.
+        '''
+        if id(self.__cfg) not in self.__owned:
+            self.__cfg = dict(self.__cfg)
+            self.__owned[id(self.__cfg)] = self.__cfg
+            self._reset_keypath_index()
+
+        cfg = self.__cfg
+        default_used = False
+        for n, key in enumerate(keypath):
+            if not isinstance(key, str):
+                raise TypeError(f'Invalid keypath {keypath}: key is not a string: {key}')
+
+            if Schema._is_leaf(cfg):
+                raise ValueError(f'Invalid keypath {keypath}: unexpected key: {key}')
+
+            if key in cfg:
+                cfg = self.__claim(cfg, key, keypath[:n + 1])
+            elif 'default' in cfg:
+                if insert_defaults:
+                    cfg[key] = Schema._copy_cfg(cfg['default'])
+                    cfg = cfg[key]
+                    self.__owned[id(cfg)] = cfg
+                else:
+                    default_used = True
+                    cfg = self.__claim(cfg, 'default', (*keypath[:n], 'default'))
+            else:
+                raise ValueError(f'Invalid keypath {keypath}: unexpected key: {key}')
+
+        if not default_used:
+            self.__keypath_index[keypath] = (cfg, ())
+
+        return cfg
 
     ###########################################################################
     def _init_schema_cfg(self):
         return schema_cfg()
 
+    ###########################################################################
+    def _reset_keypath_index(self, *keypath_prefix):
+        '''
+        Drops entries from the keypath index.
+
+        This must be called whenever a subtree of the configuration dictionary
+        is replaced or deleted outside of :meth:`set` or :meth:`add`, since the
+        index keeps references into the dictionary.
+
+        Args:
+            keypath_prefix (list str): Only drop keypaths starting with this prefix.
+                If not provided, the entire index is dropped. Historical jobs
+                are indexed under ['history', job, ...].
+        '''
+        if not keypath_prefix or keypath_prefix == ('flowgraph',):
+            self.__flowgraph_indexes = {}
+        elif keypath_prefix[0] == 'flowgraph':
+            self.__flowgraph_indexes.pop(keypath_prefix[1], None)
+
+        if not keypath_prefix:
+            self.__keypath_index = {}
+            return
+
+        prefix_len = len(keypath_prefix)
+        for keypath in list(self.__keypath_index.keys()):
+            if keypath[:prefix_len] == keypath_prefix:
+                del self.__keypath_index[keypath]
+
+    ###########################################################################
+    def _get_flowgraph_index(self, flow):
+        '''
+        Returns the index of a flowgraph stored by :meth:`_set_flowgraph_index`,
+        or None if the flowgraph changed since.
+        '''
+        return self.__flowgraph_indexes.get(flow)
+
+    def _set_flowgraph_index(self, flow, index):
+        '''
+        Stores the index of a flowgraph, which is kept until the nodes or
+        edges of the flowgraph change.
+
+        Args:
+            flow (str): Name of the flow.
+            index (object): Index, which must provide a has_node(step, index)
+                method.
+        '''
+        self.__flowgraph_indexes[flow] = index
+
+    def __flowgraph_changed(self, keypath):
+        '''
+        Drops the index of a flowgraph when writing keypath may add a node or
+        change the inputs of a node.
+        '''
+        if keypath[0] != 'flowgraph' or len(keypath) < 5:
+            return
+        flow, step, index, key = keypath[1:5]
+        flowgraph_index = self.__flowgraph_indexes.get(flow)
+        if flowgraph_index is None:
+            return
+        if key == 'input' or not flowgraph_index.has_node(step, index):
+            del self.__flowgraph_indexes[flow]
+
     ###########################################################################
     @staticmethod
-    def _dict_to_schema_set(cfg, *key):
+    def _dict_to_schema_set(cfg, *key, tuples_only=False):
         if Schema._is_leaf(cfg):
+            if tuples_only and '(' not in cfg['type']:
+                return
             for field, value in cfg.items():
                 if field == 'node':
                     for step, substep in value.items():
@@ -105,20 +349,46 @@ class Schema:
                     Schema._set(*key, value, cfg=cfg, field=field)
         else:
             for nextkey, subcfg in cfg.items():
-                Schema._dict_to_schema_set(subcfg, *key, nextkey)
+                Schema._dict_to_schema_set(subcfg, *key, nextkey, tuples_only=tuples_only)
 
     ###########################################################################
     @staticmethod
-    def _dict_to_schema(cfg):
+    def _dict_to_schema(cfg, tuples_only=False):
+        '''
+        Normalizes all values of a configuration dictionary read from a file.
+
+        Args:
+            cfg (dict): Configuration dictionary.
+            tuples_only (bool): If True, only parameters of tuple type are
+                normalized.
+        '''
         for category, subcfg in cfg.items():
             if category in ('history', 'library'):
                 # History and library are subschemas
                 for _, value in subcfg.items():
-                    Schema._dict_to_schema(value)
+                    Schema._dict_to_schema(value, tuples_only=tuples_only)
             else:
-                Schema._dict_to_schema_set(subcfg, category)
+                Schema._dict_to_schema_set(subcfg, category, tuples_only=tuples_only)
         return cfg
 
+    ###########################################################################
+    @staticmethod
+    def _dict_schema_version(cfg):
+        '''
+        Returns the schema version of a configuration dictionary, or None if
+        it is not recorded.
+        '''
+        try:
+            node = cfg['schemaversion']['node']
+        except (KeyError, TypeError):
+            return None
+
+        for step, index in ((Schema.GLOBAL_KEY, Schema.GLOBAL_KEY), ('default', 'default')):
+            value = node.get(step, {}).get(index, {}).get('value')
+            if value is not None:
+                return value
+        return None
+
     ###########################################################################
     @staticmethod
     def _dict_requires_normalization(cfg):
@@ -183,27 +453,84 @@ class Schema:
                                    self.get(*keylist, step=step, index=index, field=field),
                                    step=step, index=index, field=field)
 
-        if 'library' in self.cfg:
+        if 'library' in self.__cfg:
             # Handle libraries seperately
-            for library in self.cfg['library'].keys():
+            for library in self.__cfg['library'].keys():
                 lib_schema = Schema(cfg=self.getdict('library', library))
                 lib_schema._merge_with_init_schema()
                 new_schema.cfg['library'][library] = lib_schema.cfg
 
-        if 'history' in self.cfg:
+        if 'history' in self.__cfg:
             # Copy over history
-            new_schema.cfg['history'] = self.cfg['history']
+            new_schema.cfg['history'] = self.getdict('history')
 
         self.cfg = new_schema.cfg
 
+    ###########################################################################
+    @staticmethod
+    def __load_manifest(filepath, resolve_delta=True):
+        '''
+        Reads a manifest file into a configuration dictionary.
+
+        Args:
+            filepath (str): Path to the manifest.
+            resolve_delta (bool): If True, delta manifests are reconstructed
+                into the complete configuration.
+
+        Returns:
+            Configuration dictionary, which only holds the modified parameters
+            for unresolved delta manifests.
+        '''
+        cfg = Schema.__read_manifest_file(filepath)
+
+        delta = cfg.get(Schema._DELTA_KEY)
+        if delta is None or not resolve_delta:
+            return cfg if delta is None else delta['cfg']
+
+        manifest_dir = os.path.dirname(os.path.abspath(filepath))
+        base = Schema.__load_manifest(os.path.join(manifest_dir, delta['base']))
+        Schema.__apply_delta(base, delta['cfg'])
+        return base
+
+    ###########################################################################
+    @staticmethod
+    def __apply_delta(cfg, delta):
+        for key, subdelta in delta.items():
+            if key in cfg and not Schema._is_leaf(subdelta):
+                Schema.__apply_delta(cfg[key], subdelta)
+            else:
+                cfg[key] = subdelta
+
+    ###########################################################################
+    @staticmethod
+    def _read_delta_manifest(filepath, logger=None):
+        '''
+        Reads a manifest without reconstructing it if it is a delta manifest.
+
+        Args:
+            filepath (str): Path to the manifest.
+            logger (logging.Logger): Logger for the returned schema.
+
+        Returns:
+            Schema, which only holds the modified parameters for delta
+            manifests.
+        '''
+        schema = Schema(logger=logger)
+        schema.__load_cfg(Schema.__load_manifest(str(filepath), resolve_delta=False))
+        return schema
+
     ###########################################################################
     @staticmethod
     def __read_manifest_file(filepath):
         if not os.path.isfile(filepath):
             raise ValueError(f'Manifest file not found {filepath}')
 
+        is_msgpack = re.search(r'(\.msgpack)(\.gz)*$', filepath, flags=re.IGNORECASE)
+
         if os.path.splitext(filepath)[1].lower() == '.gz':
             fin = gzip.open(filepath, 'r')
+        elif is_msgpack:
+            fin = open(filepath, 'rb')
         else:
             fin = open(filepath, 'r')
 
@@ -214,6 +541,10 @@ class Schema:
                 if not _has_yaml:
                     raise ImportError('yaml package required to read YAML manifest')
                 localcfg = yaml.load(fin, Loader=yaml.SafeLoader)
+            elif is_msgpack:
+                if not _has_msgpack:
+                    raise ImportError('msgpack package required to read msgpack manifest')
+                localcfg = msgpack.unpackb(fin.read(), raw=False)
             else:
                 raise ValueError(f'File format not recognized {filepath}')
         finally:
@@ -276,6 +607,7 @@ class Schema:
 
         keypath = args[:-1]
         cfg = self._search(*keypath, insert_defaults=True)
+        self.__flowgraph_changed(keypath)
 
         return self._set(*args, logger=self.logger, cfg=cfg, field=field, clobber=clobber,
                          step=step, index=index)
@@ -344,6 +676,7 @@ class Schema:
         value = args[-1]
 
         cfg = self._search(*keypath, insert_defaults=True)
+        self.__flowgraph_changed(keypath)
 
         if not Schema._is_leaf(cfg):
             raise ValueError(f'Invalid keypath {keypath}: add() '
@@ -458,7 +791,7 @@ class Schema:
             self.logger.error(f'Cannot remove default keypath: {keypath}')
             return
 
-        cfg = self._search(*search_path)
+        cfg = self._search(*search_path, writable=True)
         if 'default' not in cfg:
             self.logger.error(f'Cannot remove a non-default keypath: {keypath}')
             return
@@ -474,6 +807,7 @@ class Schema:
                 return
 
         del cfg[removal_key]
+        self._reset_keypath_index(*keypath)
 
     ###########################################################################
     def unset(self, *keypath, step=None, index=None):
@@ -482,7 +816,8 @@ class Schema:
 
         See :meth:`~siliconcompiler.core.Chip.unset` for detailed documentation.
         '''
-        cfg = self._search(*keypath)
+        cfg = self._search(*keypath, writable=True)
+        self.__flowgraph_changed(keypath)
 
         if not Schema._is_leaf(cfg):
             raise ValueError(f'Invalid keypath {keypath}: unset() '
@@ -570,7 +905,7 @@ class Schema:
         documentation.
         """
         cfg = self._search(*keypath)
-        return copy.deepcopy(cfg)
+        return Schema._copy_cfg(cfg)
 
     ###########################################################################
     def valid(self, *args, default_valid=False):
@@ -586,7 +921,7 @@ class Schema:
         else:
             default = None
 
-        cfg = self.cfg
+        cfg = self.__cfg
         for key in keylist:
             if key in cfg:
                 cfg = cfg[key]
@@ -613,7 +948,9 @@ class Schema:
 
         # initialize new dict
         jobname = self.get('option', 'jobname')
-        self.cfg['history'][jobname] = {}
+        history = self._search('history', writable=True)
+        history[jobname] = {}
+        self._reset_keypath_index('history', jobname)
 
         # copy in all empty values of scope job
         allkeys = self.allkeys()
@@ -622,8 +959,8 @@ class Schema:
             if key[0] != 'history':
                 scope = self.get(*key, field='scope')
                 if not self._is_empty(*key) and (scope == 'job'):
-                    self._copyparam(self.cfg,
-                                    self.cfg['history'][jobname],
+                    self._copyparam(self.__cfg,
+                                    history[jobname],
                                     key)
 
     @staticmethod
@@ -887,12 +1224,46 @@ class Schema:
 
         return None
 
-    def _search(self, *keypath, insert_defaults=False, job=None):
+    def _search(self, *keypath, insert_defaults=False, job=None, writable=False):
         if job is not None:
-            cfg = self.cfg['history'][job]
+            index_key = ('history', job, *keypath)
         else:
-            cfg = self.cfg
+            index_key = keypath
 
+        if (writable or insert_defaults) and self.__owned is not None:
+            if job is not None:
+                self.__materialize()
+            else:
+                try:
+                    entry = self.__keypath_index.get(index_key)
+                except TypeError:
+                    entry = None
+                if entry is not None and not entry[1] and id(entry[0]) in self.__owned:
+                    return entry[0]
+                return self.__search_shared(*keypath, insert_defaults=insert_defaults)
+
+        try:
+            entry = self.__keypath_index.get(index_key)
+        except TypeError:
+            # Unhashable key, let the search below report the error
+            entry = None
+
+        if entry is not None:
+            cfg, default_keys = entry
+            if not default_keys:
+                return cfg
+            # Keypath was resolved through a 'default' branch, so it is only
+            # valid as long as the key has not been inserted since.
+            if not insert_defaults and \
+                    not any(key in parent for parent, key in default_keys):
+                return cfg
+
+        if job is not None:
+            cfg = self.__cfg['history'][job]
+        else:
+            cfg = self.__cfg
+
+        default_keys = []
         for key in keypath:
             if not isinstance(key, str):
                 raise TypeError(f'Invalid keypath {keypath}: key is not a string: {key}')
@@ -907,10 +1278,13 @@ class Schema:
                     cfg[key] = copy.deepcopy(cfg['default'])
                     cfg = cfg[key]
                 else:
+                    default_keys.append((cfg, key))
                     cfg = cfg['default']
             else:
                 raise ValueError(f'Invalid keypath {keypath}: unexpected key: {key}')
 
+        self.__keypath_index[index_key] = (cfg, tuple(default_keys))
+
         return cfg
 
     ###########################################################################
@@ -928,7 +1302,7 @@ class Schema:
     ###########################################################################
     def _allkeys(self, cfg=None, base_key=None):
         if cfg is None:
-            cfg = self.cfg
+            cfg = self.__cfg
 
         if Schema._is_leaf(cfg):
             return []
@@ -967,13 +1341,80 @@ class Schema:
 
     ###########################################################################
     def write_json(self, fout):
-        fout.write(json.dumps(self.cfg, indent=4))
+        fout.write(json.dumps(self.__cfg, indent=4))
 
     ###########################################################################
     def write_yaml(self, fout):
         if not _has_yaml:
             raise ImportError('yaml package required to write YAML manifest')
-        fout.write(yaml.dump(self.cfg, Dumper=YamlIndentDumper, default_flow_style=False))
+        fout.write(yaml.dump(self.__cfg, Dumper=YamlIndentDumper, default_flow_style=False))
+
+    ###########################################################################
+    def write_delta_json(self, fout, base, base_manifest, start=None):
+        '''
+        Writes the parameters which differ from another schema.
+
+        Only parameters which were modified are written, and the complete
+        configuration is reconstructed from the base manifest when the delta
+        manifest is read. Removed parameters are not recorded.
+
+        Args:
+            fout (file): File object to write to.
+            base (Schema): Schema the delta is computed against, usually a
+                :meth:`copy` of this schema.
+            base_manifest (str): Path to the manifest of base, relative to the
+                delta manifest, which the complete configuration is
+                reconstructed from.
+            start (Schema): Earlier state of this schema. Parameters modified
+                since then are also written, for readers which merge the delta
+                without reading the base manifest.
+        '''
+        bases = (base.__cfg,) if start is None else (base.__cfg, start.__cfg)
+        delta = Schema.__delta_cfg(self.__cfg, bases)
+        # Always record the version so values can be trusted when read
+        delta['schemaversion'] = self.__cfg['schemaversion']
+
+        fout.write(json.dumps({
+            Schema._DELTA_KEY: {
+                'base': base_manifest,
+                'cfg': delta
+            }
+        }, indent=4))
+
+    ###########################################################################
+    @staticmethod
+    def __delta_cfg(cfg, bases):
+        '''
+        Returns the parts of cfg which differ from any of bases. Dictionaries
+        shared between copies of a schema are identical, so they are not
+        compared.
+        '''
+        delta = {}
+        for key, subcfg in cfg.items():
+            base_subcfgs = tuple(base.get(key) for base in bases)
+            if all(subcfg is base_subcfg for base_subcfg in base_subcfgs):
+                continue
+
+            if None in base_subcfgs or Schema._is_leaf(subcfg):
+                if any(subcfg != base_subcfg for base_subcfg in base_subcfgs):
+                    delta[key] = subcfg
+            else:
+                subdelta = Schema.__delta_cfg(subcfg, base_subcfgs)
+                if subdelta:
+                    delta[key] = subdelta
+        return delta
+
+    ###########################################################################
+    def write_msgpack(self, fout):
+        '''
+        Writes the configuration in the compact binary msgpack format.
+
+        Args:
+            fout (file): File object opened in binary mode.
+        '''
+        if not _has_msgpack:
+            raise ImportError('msgpack package required to write msgpack manifest')
+        fout.write(msgpack.packb(self.__cfg, use_bin_type=True))
 
     ###########################################################################
     def write_tcl(self, fout, prefix="", step=None, index=None, template=None):
@@ -1047,8 +1488,28 @@ class Schema:
 
     ###########################################################################
     def copy(self):
-        '''Returns deep copy of Schema object.'''
-        return Schema(cfg=self.cfg)
+        '''Returns copy of Schema object.
+
+        The copy shares the configuration dictionary with this object and
+        each of them only copies the parts it modifies (copy-on-write), so
+        copying does not depend on the size of the schema.
+        '''
+        schema = Schema(cfg={})
+        if self.__history_job is not None:
+            # This object modifies a job of another schema in place, so it
+            # cannot be shared
+            schema.cfg = self.getdict()
+            return schema
+
+        schema.__cfg = self.__cfg
+        schema.__owned = {}
+        self.__owned = {}
+
+        # Jobs modified in place by history() views are not shared
+        for job, cfg in self.__viewed_history().items():
+            schema._import_history(job, Schema._copy_cfg(cfg))
+            self.__owned[id(cfg)] = cfg
+        return schema
 
     ###########################################################################
     def prune(self):
@@ -1063,9 +1524,15 @@ class Schema:
         # 10 should be enough for anyone...
         maxdepth = 10
 
+        # Pruning modifies the entire tree
+        self.__materialize()
+
         for _ in range(maxdepth):
             self._prune()
 
+        # Default branches have been removed
+        self._reset_keypath_index()
+
     ###########################################################################
     def _prune(self, *keypath):
         '''
@@ -1120,15 +1587,40 @@ class Schema:
         Args:
             job (str): Name of historical job to return.
         '''
-        if job not in self.cfg['history']:
-            self.cfg['history'][job] = self._init_schema_cfg()
+        history = self._search('history', writable=True)
+        if job not in history:
+            history[job] = self._init_schema_cfg()
+        elif self.__owned is not None and id(history[job]) not in self.__owned:
+            # The returned object modifies the job in place
+            history[job] = copy.deepcopy(history[job])
+            self._reset_keypath_index('history', job)
+        if self.__owned is not None:
+            self.__owned[id(history[job])] = history[job]
 
         # Can't initialize Schema() by passing in cfg since it performs a deep
         # copy.
         schema = Schema()
-        schema.cfg = self.cfg['history'][job]
+        schema.cfg = history[job]
+        schema.__history_job = job
+        self.__history_views.add(schema)
         return schema
 
+    ###########################################################################
+    def _import_history(self, job, cfg):
+        '''
+        Stores a configuration dictionary as ['history', job].
+
+        Args:
+            job (str): Name of historical job to store.
+            cfg (dict): Configuration dictionary of the job, which is owned by
+                this schema afterwards.
+        '''
+        history = self._search('history', writable=True)
+        history[job] = cfg
+        if self.__owned is not None:
+            self.__owned[id(cfg)] = cfg
+        self._reset_keypath_index('history', job)
+
     #######################################
     def _init_logger(self, parent=None):
         if parent:
@@ -1147,11 +1639,24 @@ class Schema:
         # We have to remove the chip's logger before serializing the object
         # since the logger object is not serializable.
         del attributes['logger']
+
+        # Keypath index is rebuilt on demand
+        del attributes['_Schema__keypath_index']
+        del attributes['_Schema__flowgraph_indexes']
+
+        # The restored object does not share cfg
+        del attributes['_Schema__owned']
+        del attributes['_Schema__history_views']
+        attributes['_Schema__history_job'] = None
         return attributes
 
     #######################################
     def __setstate__(self, state):
         self.__dict__ = state
+        self.__keypath_index = {}
+        self.__flowgraph_indexes = {}
+        self.__owned = None
+        self.__history_views = weakref.WeakSet()
 
         # Reinitialize logger on restore
         self._init_logger()
@@ -1180,7 +1685,7 @@ class Schema:
         '''
         keypath = args[:-1]
         value = args[-1]
-        cfg = self._search(*keypath)
+        cfg = self._search(*keypath, writable=True)
 
         if not Schema._is_leaf(cfg):
             raise ValueError(f'Invalid keypath {keypath}: set_default() '
@@ -1561,13 +2066,187 @@ class Schema:
 
         return switchstrs, metavar
 
+    ###########################################################################
+    def _iter_leaves(self, cfg=None, base_key=()):
+        '''
+        Yields (keypath, cfg) for every parameter, skipping 'default' keys.
+        '''
+        if cfg is None:
+            cfg = self.__cfg
+
+        for key, subcfg in cfg.items():
+            if key == 'default':
+                continue
+            keypath = (*base_key, key)
+            if Schema._is_leaf(subcfg):
+                yield keypath, subcfg
+            else:
+                yield from self._iter_leaves(cfg=subcfg, base_key=keypath)
+
+    ###########################################################################
+    @staticmethod
+    def _copy_cfg(cfg):
+        '''
+        Deep copies a configuration dictionary or value.
+
+        This is much faster than copy.deepcopy(), since the configuration only
+        holds dictionaries and lists of immutable values.
+        '''
+        if isinstance(cfg, dict):
+            return {key: Schema._copy_cfg(value) for key, value in cfg.items()}
+        if isinstance(cfg, list):
+            return [Schema._copy_cfg(value) for value in cfg]
+        return cfg
+
+    ###########################################################################
+    def _merge_schema(self, src, clear=True, clobber=True, check=False,
+                      keypath_filter=None, skip_fields=('node',)):
+        '''
+        Merges all parameters of another schema into this schema.
+
+        This is equivalent to calling set() (or add() if clear is False) for
+        every value and field of src, but src is walked once and values are
+        written directly into this schema. When both schemas have the same
+        version and a parameter has the same type in both, values are copied
+        without being normalized again, since they were normalized when they
+        were stored in src. Parameters under 'history' and 'library' are not
+        merged.
+
+        Args:
+            src (Schema): Schema to merge from.
+            clear (bool): If True, disables append operations for list type.
+            clobber (bool): If True, overwrites existing parameter value.
+            check (bool): If True, keypaths not valid in this schema are
+                skipped, otherwise they raise a ValueError.
+            keypath_filter (function): If provided, only keypaths for which
+                this function returns True are merged.
+            skip_fields (list str): Parameter fields not to merge. Per-node
+                fields are always merged.
+
+        Returns:
+            List of keypaths skipped because they are not valid in this schema.
+        '''
+        same_version = self.valid('schemaversion') and src.valid('schemaversion') and \
+            self.get('schemaversion') == src.get('schemaversion')
+
+        # Most parameters are about to be written, so copying the shared
+        # configuration once is cheaper than claiming it key by key
+        self.__materialize()
+
+        skipped = []
+        for keypath, src_cfg in src._iter_leaves():
+            if keypath[0] in ('history', 'library'):
+                continue
+            if keypath_filter and not keypath_filter(keypath):
+                continue
+            if check and not self.valid(*keypath, default_valid=True):
+                skipped.append(keypath)
+                continue
+
+            cfg = self._search(*keypath, insert_defaults=True)
+            if not Schema._is_leaf(cfg):
+                raise ValueError(f'Invalid keypath {keypath}: set() '
+                                 'must be called on a complete keypath')
+
+            should_append = src_cfg['type'].startswith('[') and not clear
+
+            if same_version and \
+                    cfg['type'] == src_cfg['type'] and \
+                    cfg['pernode'] == src_cfg['pernode'] and \
+                    cfg.get('enum') == src_cfg.get('enum'):
+                self.__merge_param(cfg, src_cfg, should_append, clobber, skip_fields)
+            else:
+                self.__merge_param_checked(keypath, src, should_append, clobber, skip_fields)
+
+            if keypath[0] == 'flowgraph':
+                # Values are not written through set()
+                self.__flowgraph_indexes.pop(keypath[1], None)
+
+        return skipped
+
+    ###########################################################################
+    def __merge_param(self, cfg, src_cfg, should_append, clobber, skip_fields):
+        '''
+        Merges src_cfg into cfg, both of the same type, without normalization.
+        '''
+        if not cfg['lock']:
+            node = cfg['node']
+            for step, src_step in src_cfg['node'].items():
+                if step == 'default':
+                    continue
+                for index, src_fields in src_step.items():
+                    if 'value' not in src_fields:
+                        continue
+
+                    value_set = should_append or clobber or not Schema._is_set(
+                        cfg,
+                        step=None if step == Schema.GLOBAL_KEY else step,
+                        index=None if index == Schema.GLOBAL_KEY else index)
+
+                    if step not in node:
+                        node[step] = {}
+                    if index not in node[step]:
+                        node[step][index] = Schema._copy_cfg(node['default']['default'])
+                    fields = node[step][index]
+
+                    for field, value in src_fields.items():
+                        if field == 'value' and not value_set:
+                            continue
+                        if should_append:
+                            fields[field].extend(Schema._copy_cfg(value))
+                        else:
+                            fields[field] = Schema._copy_cfg(value)
+
+        for field, value in src_cfg.items():
+            if field in skip_fields or field == 'node':
+                continue
+            if cfg['lock'] and field != 'lock':
+                continue
+            cfg[field] = Schema._copy_cfg(value)
+
+    ###########################################################################
+    def __merge_param_checked(self, keypath, src, should_append, clobber, skip_fields):
+        '''
+        Merges a parameter of src with set() and add().
+        '''
+        src_cfg = src._search(*keypath)
+
+        for val, step, index in src._getvals(*keypath, return_defvalue=False):
+            # update value, handling scalars vs. lists
+            if should_append:
+                self.add(*keypath, val, step=step, index=index)
+            else:
+                self.set(*keypath, val, step=step, index=index, clobber=clobber)
+
+            # update other pernode fields
+            # TODO: only update these if clobber is successful
+            step_key = Schema.GLOBAL_KEY if not step else step
+            idx_key = Schema.GLOBAL_KEY if not index else index
+            for field in src_cfg['node'][step_key][idx_key].keys():
+                if field == 'value':
+                    continue
+                v = src.get(*keypath, step=step, index=index, field=field)
+                if should_append:
+                    self.add(*keypath, v, step=step, index=index, field=field)
+                else:
+                    self.set(*keypath, v, step=step, index=index, field=field)
+
+        # update other fields that a user might modify
+        for field in src_cfg.keys():
+            if field in skip_fields or field == 'node':
+                continue
+
+            # TODO: should we be taking into consideration clobber for these fields?
+            v = src.get(*keypath, field=field)
+            self.set(*keypath, v, field=field)
+
     ###########################################################################
     def read_manifest(self, filename, clear=True, clobber=True, allow_missing_keys=False):
         """
         Reads a manifest from disk and merges it with the current manifest.
 
         The file format read is determined by the filename suffix. Currently
-        json (*.json) and yaml(*.yaml) formats are supported.
+        json (*.json), yaml(*.yaml) and msgpack (*.msgpack) formats are supported.
 
         Args:
             filename (filepath): Path to a manifest file to be loaded.
@@ -1585,57 +2264,21 @@ class Schema:
             self.logger.warning("Mismatch in schema versions: "
                                 f"{schema.get('schemaversion')} != {self.get('schemaversion')}")
 
-        for keylist in schema.allkeys():
-            if keylist[0] in ('history', 'library'):
-                continue
-            if 'default' in keylist:
-                continue
-            typestr = schema.get(*keylist, field='type')
-            should_append = re.match(r'\[', typestr) and not clear
-
-            if allow_missing_keys and not self.valid(*keylist, default_valid=True):
-                self.logger.warning(f'{keylist} not found in schema, skipping...')
-                continue
-
-            for val, step, index in schema._getvals(*keylist, return_defvalue=False):
-                # update value, handling scalars vs. lists
-                if should_append:
-                    self.add(*keylist, val, step=step, index=index)
-                else:
-                    self.set(*keylist, val, step=step, index=index, clobber=clobber)
-
-                # update other pernode fields
-                # TODO: only update these if clobber is successful
-                step_key = Schema.GLOBAL_KEY if not step else step
-                idx_key = Schema.GLOBAL_KEY if not index else index
-                for field in schema.getdict(*keylist)['node'][step_key][idx_key].keys():
-                    if field == 'value':
-                        continue
-                    v = schema.get(*keylist, step=step, index=index, field=field)
-                    if should_append:
-                        self.add(*keylist, v, step=step, index=index, field=field)
-                    else:
-                        self.set(*keylist, v, step=step, index=index, field=field)
-
-            # update other fields that a user might modify
-            for field in schema.getdict(*keylist).keys():
-                if field in ('node',):
-                    # skip these fields (node handled above)
-                    continue
-
-                # TODO: should we be taking into consideration clobber for these fields?
-                v = schema.get(*keylist, field=field)
-                self.set(*keylist, v, field=field)
+        for keylist in self._merge_schema(schema, clear=clear, clobber=clobber,
+                                          check=allow_missing_keys):
+            self.logger.warning(f'{keylist} not found in schema, skipping...')
 
         # Read history, if we're not already reading into a job
         if 'history' in schema.getkeys():
             for historic_job in schema.getkeys('history'):
-                self.cfg['history'][historic_job] = schema.getdict('history', historic_job)
+                self._import_history(historic_job, schema.getdict('history', historic_job))
 
         # TODO: better way to handle this?
         if 'library' in schema.getkeys():
+            library = self._search('library', writable=True)
             for libname in schema.getkeys('library'):
-                self.cfg['library'][libname] = schema.getdict('library', libname)
+                library[libname] = schema.getdict('library', libname)
+                self._reset_keypath_index('library', libname)
 
 
 if _has_yaml:
@@ -289,7 +289,7 @@ class DynamicGen(SphinxDirective):
         nested_parse_with_titles(self.state, rst, s)
 
     def package_information(self, chip, modname):
-        packages = build_package_table(chip.schema.cfg)
+        packages = build_package_table(chip.schema.getdict())
         if packages:
             sec = build_section('Data sources', self.get_data_source_ref_key(modname, chip.design))
             sec += packages
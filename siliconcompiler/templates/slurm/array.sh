@@ -0,0 +1,10 @@
+#!/bin/bash
+
+scripts=({% for script in scripts %}
+    {{ script }}{% endfor %}
+)
+logs=({% for log in logs %}
+    {{ log }}{% endfor %}
+)
+
+"${scripts[$SLURM_ARRAY_TASK_ID]}" > "${logs[$SLURM_ARRAY_TASK_ID]}" 2>&1
@@ -1,7 +1,9 @@
 # Copyright 2020 Silicon Compiler Authors. All Rights Reserved.
 import siliconcompiler
+from siliconcompiler import archive
 import os
 import tarfile
+import gzip
 import pytest
 
 
@@ -130,3 +132,39 @@ def test_archive_jobs(chip):
     for item in ('build/oh_parity/job0/oh_parity.pkg.json',
                  'build/oh_parity/job1/oh_parity.pkg.json'):
         assert item in contents
+
+
+def test_parallel_gzip_writer():
+    data = b''.join([f'line {n}\n'.encode() for n in range(100000)])
+
+    writer = archive.ParallelGzipWriter('data.gz', chunk_size=64 * 1024)
+    for n in range(0, len(data), 1000):
+        writer.write(data[n:n + 1000])
+    writer.close()
+
+    with gzip.open('data.gz', 'rb') as f:
+        assert f.read() == data
+
+
+def test_open_archive_skip_compressed():
+    os.makedirs('outputs')
+    with open('outputs/test.v', 'w') as f:
+        f.write('module test();\nendmodule\n' * 1000)
+    # Compressible data, which would only shrink if it is compressed again
+    with open('outputs/test.gds.gz', 'wb') as f:
+        f.write(b'\0' * 100000)
+
+    sizes = {}
+    for skip_compressed in (True, False):
+        name = f'skip{skip_compressed}.tgz'
+        with archive.open_archive(name, skip_compressed=skip_compressed) as tar:
+            tar.add('outputs')
+        sizes[skip_compressed] = os.path.getsize(name)
+
+        with tarfile.open(name, 'r:gz') as tar:
+            assert tar.extractfile('outputs/test.gds.gz').read() == b'\0' * 100000
+            assert tar.extractfile('outputs/test.v').read() == \
+                b'module test();\nendmodule\n' * 1000
+
+    assert sizes[True] > 100000
+    assert sizes[False] < 10000
@@ -1,3 +1,4 @@
+import glob
 import os
 import siliconcompiler
 import logging
@@ -36,6 +37,7 @@ def test_check_logfile(datadir, caplog):
     assert os.path.isfile(warnings_file)
     with open(warnings_file) as file:
         assert warning_with_line_number in file.read()
+    assert sorted(glob.glob('place.*')) == ['place.errors', 'place.warnings']
 
 
 #########################
@@ -0,0 +1,132 @@
+import json
+import os
+import tarfile
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler import scheduler
+from siliconcompiler.schema import Schema
+
+from siliconcompiler.tools.builtin import nop
+
+
+def test_write_delta_json():
+    chip = siliconcompiler.Chip('test')
+    chip.input('test.v')
+    chip.write_manifest('base.json')
+
+    base = chip.schema.copy()
+    chip.set('metric', 'errors', 2, step='syn', index='0')
+    chip.set('option', 'define', 'FOO')
+    chip.set('constraint', 'outline', [(0, 0), (10, 10)])
+
+    with open('delta.json', 'w') as f:
+        chip.schema.write_delta_json(f, base, 'base.json')
+
+    with open('delta.json') as f:
+        delta = json.load(f)['deltamanifest']
+    assert delta['base'] == 'base.json'
+    assert sorted(delta['cfg'].keys()) == ['constraint', 'metric', 'option', 'schemaversion']
+    assert list(delta['cfg']['metric'].keys()) == ['errors']
+
+    schema = Schema(manifest='delta.json')
+    assert schema.cfg == chip.schema.cfg
+
+    partial = Schema._read_delta_manifest('delta.json')
+    assert partial.getkeys('metric') == ['errors']
+    assert partial.get('metric', 'errors', step='syn', index='0') == 2
+
+
+def _run_flow(deltamanifest):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'deltamanifest', deltamanifest)
+    chip.node(flow, 'import', nop)
+    chip.node(flow, 'syn', nop, index=0)
+    chip.node(flow, 'syn', nop, index=1)
+    chip.node(flow, 'place', nop)
+    chip.edge(flow, 'import', 'syn', head_index=0)
+    chip.edge(flow, 'import', 'syn', head_index=1)
+    chip.edge(flow, 'syn', 'place', tail_index=0)
+    chip.edge(flow, 'syn', 'place', tail_index=1)
+    chip.run()
+    return chip
+
+
+def test_delta_manifest_run():
+    chip = _run_flow(True)
+
+    workdir = chip._getworkdir(step='place', index='0')
+    manifest = os.path.join(workdir, 'outputs', 'test.pkg.json')
+    input_manifest = os.path.join(workdir, 'inputs', 'test.pkg.json')
+
+    with open(manifest) as f:
+        delta = json.load(f)['deltamanifest']
+    assert delta['base'] == os.path.join('..', 'inputs', 'test.pkg.json')
+    assert os.path.getsize(manifest) < os.path.getsize(input_manifest) / 10
+
+    # Complete manifest is reconstructed on read
+    schema = Schema(manifest=manifest)
+    assert schema.get('flowgraph', 'test', 'place', '0', 'status') == NodeStatus.SUCCESS
+    assert schema.get('metric', 'tasktime', step='place', index='0') is not None
+    assert schema.get('metric', 'tasktime', step='syn', index='1') is not None
+
+    # Partial merges pick up the results of all nodes
+    full_chip = _run_flow(False)
+    for step, index in (('import', '0'), ('syn', '0'), ('syn', '1'), ('place', '0')):
+        assert chip.get('flowgraph', 'test', step, index, 'status') == NodeStatus.SUCCESS
+        for metric in ('tasktime', 'exetime'):
+            assert (chip.get('metric', metric, step=step, index=index) is None) == \
+                (full_chip.get('metric', metric, step=step, index=index) is None)
+        assert chip.get('record', 'starttime', step=step, index=index) is not None
+
+
+def test_delta_manifest_reconstruct(monkeypatch):
+    chip = _run_flow(True)
+
+    # Rerun the last node in this process, so the scheduler can be patched
+    write_output_manifest = scheduler._write_output_manifest
+    merge_inputs = scheduler._merge_input_dependencies_manifests
+    select_inputs = scheduler._select_inputs
+
+    def write_full_manifest(chip):
+        chip.write_manifest(os.path.join('outputs', 'full.json'))
+        write_output_manifest(chip)
+
+    # Parameter which is changed in the inputs manifest and restored later
+    def set_mode(chip, *args):
+        merge_inputs(chip, *args)
+        chip.set('option', 'mode', 'fpga')
+
+    def restore_mode(chip, *args):
+        chip.set('option', 'mode', 'asic')
+        select_inputs(chip, *args)
+
+    monkeypatch.setattr(scheduler, '_write_output_manifest', write_full_manifest)
+    monkeypatch.setattr(scheduler, '_merge_input_dependencies_manifests', set_mode)
+    monkeypatch.setattr(scheduler, '_select_inputs', restore_mode)
+
+    status = {node: NodeStatus.SUCCESS for node in chip.nodes_to_execute()}
+    scheduler._runtask(chip, 'test', 'place', '0', status, scheduler._executenode)
+
+    outputs = os.path.join(chip._getworkdir(step='place', index='0'), 'outputs')
+    schema = Schema(manifest=os.path.join(outputs, 'test.pkg.json'))
+    full_schema = Schema(manifest=os.path.join(outputs, 'full.json'))
+    assert schema.get('option', 'mode') == 'asic'
+    assert schema.getdict() == full_schema.getdict()
+
+
+def test_delta_manifest_archive():
+    chip = _run_flow(True)
+    chip.archive(step='place', index='0', archive_name='place.tgz')
+
+    os.makedirs('extract')
+    with tarfile.open('place.tgz') as tar:
+        tar.extractall('extract')
+
+    # The archive includes the base of the output manifest
+    workdir = os.path.relpath(chip._getworkdir(step='place', index='0'))
+    schema = Schema(manifest=os.path.join('extract', workdir, 'outputs', 'test.pkg.json'))
+    assert schema.get('flowgraph', 'test', 'place', '0', 'status') == NodeStatus.SUCCESS
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import time
+
+from siliconcompiler import filehash
+
+
+def _write(path, text, age=60):
+    with open(path, 'w', newline='\n') as f:
+        f.write(text)
+    # Files modified within the last moments are never cached
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+
+def test_hash_paths():
+    os.makedirs('dir')
+    _write('foo.txt', 'foobar\n')
+    _write('dir/foo.txt', 'foobar\n')
+    _write('dir/foo1.txt', 'foobar\n')
+
+    assert filehash.hash_paths(['foo.txt', 'dir', 'missing.txt', 'foo.txt']) == [
+        'aec070645fe53ee3b3763059376134f058cc337247c978add178b6ccdfb0019f',
+        '47434738f0895da4f483d812718fc40548fa341e9285e5169f314e82a46776d3',
+        None,
+        'aec070645fe53ee3b3763059376134f058cc337247c978add178b6ccdfb0019f']
+
+    # Files larger than a block
+    data = os.urandom(3 * filehash.BLOCK_SIZE + 5)
+    with open('large.bin', 'wb') as f:
+        f.write(data)
+    assert filehash.hash_paths(['large.bin'], algo='md5') == [hashlib.md5(data).hexdigest()]
+
+
+def test_hash_paths_single_pool(monkeypatch):
+    for n in range(4):
+        os.makedirs(f'dir{n}/sub')
+        _write(f'dir{n}/foo.txt', f'foo{n}\n')
+        _write(f'dir{n}/sub/bar.txt', f'bar{n}\n')
+    expected = [filehash.hash_directory(f'dir{n}') for n in range(4)]
+
+    pools = []
+    executor = filehash.ThreadPoolExecutor
+
+    def record_pool(*args, **kwargs):
+        pools.append(kwargs)
+        return executor(*args, **kwargs)
+
+    monkeypatch.setattr(filehash, 'ThreadPoolExecutor', record_pool)
+
+    # The files of all the directories are hashed by one pool of threads
+    assert filehash.hash_paths([f'dir{n}' for n in range(4)], jobs=2) == expected
+    assert pools == [{'max_workers': 2}]
+
+
+def test_file_hash_cache(monkeypatch):
+    cache = filehash.FileHashCache(os.path.abspath('hashes.sqlite'))
+    _write('foo.txt', 'foobar\n')
+    _write('new.txt', 'foobar\n', age=0)
+
+    expected = 'aec070645fe53ee3b3763059376134f058cc337247c978add178b6ccdfb0019f'
+    assert filehash.hash_paths(['foo.txt', 'new.txt'], cache=cache) == [expected, expected]
+
+    hashed = []
+    hash_file = filehash.hash_file
+
+    def record_hash_file(path, *args, **kwargs):
+        hashed.append(path)
+        return hash_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(filehash, 'hash_file', record_hash_file)
+
+    # Recently modified files are hashed again
+    assert filehash.hash_paths(['foo.txt', 'new.txt'], cache=cache) == [expected, expected]
+    assert hashed == ['new.txt']
+
+    # Modified files are hashed again
+    del hashed[:]
+    _write('foo.txt', 'FOObar\n')
+    assert filehash.hash_paths(['foo.txt'], cache=cache) == \
+        [hashlib.sha256(b'FOObar\n').hexdigest()]
+    assert hashed == ['foo.txt']
+
+    # Hashes are kept per algorithm
+    del hashed[:]
+    assert filehash.hash_paths(['foo.txt'], algo='md5', cache=cache) == \
+        [hashlib.md5(b'FOObar\n').hexdigest()]
+    assert hashed == ['foo.txt']
+
+
+def test_file_hash_cache_unusable():
+    os.makedirs('readonly')
+    cache = filehash.FileHashCache(os.path.join('readonly', 'missing', 'hashes.sqlite'))
+    _write('foo.txt', 'foobar\n')
+
+    assert filehash.hash_paths(['foo.txt'], cache=cache) == \
+        ['aec070645fe53ee3b3763059376134f058cc337247c978add178b6ccdfb0019f']
+
+
+def test_directory_changes():
+    cache = filehash.FileHashCache(os.path.abspath('hashes.sqlite'))
+    os.makedirs('lib/cells/old')
+    os.makedirs('lib/lef')
+    _write('lib/cells/and.lib', 'and\n')
+    _write('lib/cells/or.lib', 'or\n')
+    _write('lib/cells/old/buf.lib', 'buf\n')
+    _write('lib/lef/tech.lef', 'tech\n')
+
+    old_hash = filehash.hash_directory('lib', cache=cache)
+    # The hash covers the hashes of the entries of the directory
+    cells_hash = filehash.hash_directory('lib/cells')
+    lef_hash = filehash.hash_directory('lib/lef')
+    assert old_hash == hashlib.sha256(
+        f'dir cells {cells_hash}\ndir lef {lef_hash}\n'.encode()).hexdigest()
+
+    _write('lib/cells/or.lib', 'nor\n')
+    os.remove('lib/cells/old/buf.lib')
+    os.rmdir('lib/cells/old')
+    os.makedirs('lib/gds/cells')
+    _write('lib/gds/cells/and.gds', 'and\n')
+
+    new_hash = filehash.hash_directory('lib', cache=cache)
+    assert new_hash != old_hash
+    assert filehash.hash_directory('lib/lef') == lef_hash
+
+    assert filehash.get_directory_changes(cache, old_hash, new_hash) == [
+        ('cells/old', 'removed'),
+        ('cells/or.lib', 'modified'),
+        ('gds', 'added')]
+    assert filehash.get_directory_changes(cache, old_hash, '0' * 64) is None
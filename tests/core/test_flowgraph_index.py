@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler.flowgraph import _get_flowgraph_index, _get_flowgraph_node_outputs
+from siliconcompiler.tools.builtin import nop
+
+
+def _chain_chip(length):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.node(flow, 'n0', nop)
+    for n in range(1, length):
+        chip.node(flow, f'n{n}', nop)
+        chip.edge(flow, f'n{n - 1}', f'n{n}')
+    chip.set('option', 'flow', flow)
+    return chip
+
+
+def test_index_reused():
+    chip = _chain_chip(3)
+
+    index = _get_flowgraph_index(chip, 'test')
+    assert index.nodes == [('n0', '0'), ('n1', '0'), ('n2', '0')]
+    assert index.get_outputs(('n0', '0')) == [('n1', '0')]
+
+    # Settings of existing nodes do not change the flowgraph
+    chip.set('flowgraph', 'test', 'n1', '0', 'weight', 'errors', 1.0)
+    assert _get_flowgraph_index(chip, 'test') is index
+
+
+def test_index_node_added():
+    chip = _chain_chip(3)
+    index = _get_flowgraph_index(chip, 'test')
+
+    chip.node('test', 'n3', nop)
+    assert _get_flowgraph_index(chip, 'test') is not index
+    assert ('n3', '0') in _get_flowgraph_index(chip, 'test').nodes
+
+
+def test_index_edge_added():
+    chip = _chain_chip(3)
+    assert _get_flowgraph_node_outputs(chip, 'test', ('n0', '0')) == [('n1', '0')]
+
+    chip.edge('test', 'n0', 'n2')
+    assert _get_flowgraph_node_outputs(chip, 'test', ('n0', '0')) == [('n1', '0'), ('n2', '0')]
+
+    chip.unset('flowgraph', 'test', 'n2', '0', 'input')
+    assert _get_flowgraph_node_outputs(chip, 'test', ('n0', '0')) == [('n1', '0')]
+    assert chip.nodes_to_execute() == [('n0', '0'), ('n1', '0'), ('n2', '0')]
+
+
+def test_index_node_removed():
+    chip = _chain_chip(3)
+    assert chip.nodes_to_execute() == [('n0', '0'), ('n1', '0'), ('n2', '0')]
+
+    chip._remove_node('test', 'n1')
+    assert chip.nodes_to_execute() == [('n0', '0'), ('n2', '0')]
+    assert _get_flowgraph_node_outputs(chip, 'test', ('n0', '0')) == [('n2', '0')]
+
+
+def test_index_not_pickled():
+    chip = _chain_chip(3)
+    _get_flowgraph_index(chip, 'test')
+
+    schema = chip.schema.copy()
+    assert schema._get_flowgraph_index('test') is None
+
+
+def test_nodes_to_execute_diamonds():
+    '''
+    Chain of diamonds, with 2^100 paths from the first to the last node
+    n0 -- n1a -- n1 -- n2a -- n2 ...
+    |            |     |      |
+    ---- n1b -----     -- n2b -
+    '''
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.node(flow, 'n0', nop)
+    for n in range(1, 101):
+        for branch in ('a', 'b'):
+            chip.node(flow, f'n{n}{branch}', nop)
+            chip.edge(flow, f'n{n - 1}', f'n{n}{branch}')
+        chip.node(flow, f'n{n}', nop)
+        chip.edge(flow, f'n{n}a', f'n{n}')
+        chip.edge(flow, f'n{n}b', f'n{n}')
+    chip.set('option', 'flow', flow)
+
+    start = time.time()
+    nodes = chip.nodes_to_execute()
+    assert time.time() - start < 10
+
+    assert len(nodes) == 301
+    assert nodes[0] == ('n0', '0')
+    assert nodes[-1] == ('n100', '0')
+    assert nodes.index(('n50a', '0')) < nodes.index(('n50', '0'))
+
+
+def test_nodes_to_execute_cycle():
+    chip = _chain_chip(3)
+    chip.edge('test', 'n2', 'n1')
+
+    with pytest.raises(siliconcompiler.SiliconCompilerError, match='would form a circle'):
+        chip.nodes_to_execute()
@@ -93,7 +93,7 @@ def test_directory_hash():
     chip.set('option', 'idir', 'test1')
     print(chip.hash_files('option', 'idir'))
     assert chip.hash_files('option', 'idir') == \
-        ['6d9a946394ed8d2815169e42e225efc52cf6f92aa9f50e88fd05c0750d6c336c']
+        ['47434738f0895da4f483d812718fc40548fa341e9285e5169f314e82a46776d3']
 
 
 def test_directory_hash_rename():
@@ -111,12 +111,12 @@ def test_directory_hash_rename():
     chip.set('option', 'idir', 'test1')
 
     assert chip.hash_files('option', 'idir') == \
-        ['6d9a946394ed8d2815169e42e225efc52cf6f92aa9f50e88fd05c0750d6c336c']
+        ['47434738f0895da4f483d812718fc40548fa341e9285e5169f314e82a46776d3']
 
     os.rename('test1/foo1.txt', 'test1/foo2.txt')
     print(chip.hash_files('option', 'idir', check=False))
     assert chip.hash_files('option', 'idir', check=False) == \
-        ['e054f2dbdb854c8b7c96eca9b0e41acdaedc1f66b816c868338386d474b53a13']
+        ['819f42618b548e5b0cad8cbb2b2410e571f2c31a2e12a64e8f6c4ba8784a9132']
 
 
 def test_hash_no_check():
@@ -0,0 +1,111 @@
+import io
+
+import pytest
+
+from siliconcompiler import logscan
+
+
+@pytest.mark.parametrize('args,line,expected', [
+    ('ERROR', 'ERROR: failed\n', 'ERROR: failed\n'),
+    ('ERROR', 'error: failed\n', None),
+    ('-i ERROR', 'error: failed\n', 'error: failed\n'),
+    ('-v ERROR', 'ERROR: failed\n', None),
+    ('-v ERROR', 'INFO: passed\n', 'INFO: passed\n'),
+    ('-w ERR', 'ERROR: failed\n', None),
+    ('-w ERR', 'ERR: failed\n', 'ERR: failed\n'),
+    ('-x ERROR.*', 'ERROR: failed\n', 'ERROR: failed\n'),
+    ('-x ERROR', 'ERROR: failed\n', None),
+    ('-o [A-Z]+-[0-9]+', '[WARNING GRT-0043] No vias\n', 'GRT-0043'),
+    ('-i -o -w grt-[0-9]+', '[WARNING GRT-0043] No vias\n', 'GRT-0043'),
+    ('-e -DPL', 'use -DPL\n', 'use -DPL\n'),
+])
+def test_grep_command(args, line, expected):
+    assert logscan.compile_grep(args)(line) == expected
+
+
+def test_grep_command_unsupported():
+    assert logscan.compile_grep('-z -i ERROR').unsupported == ['-z']
+
+
+def test_log_scanner():
+    lines = [
+        'INFO: start\n',
+        '[WARNING GRT-0043] No vias\n',
+        '[WARNING DPL-0001] Placed\n',
+        '[ERROR XYZ-123] Test error\n',
+        'error: lower case\n',
+        '(\\1) backreference\n',
+    ]
+    scanner = logscan.LogScanner({
+        'errors': ['-i ERROR'],
+        'warnings': ['WARNING', '-v DPL'],
+        'codes': ['-o [A-Z]+-[0-9]+', '-v ^XYZ'],
+        'other': ['-v [][]', '-v (start|back)'],
+        # Patterns are wrapped in a group, as by grep()
+        'backref': [r'(\w)\2'],
+    })
+
+    count, matches = scanner.scan(io.StringIO(''.join(lines)))
+    assert count == 6
+    assert matches == {
+        'errors': [(4, '[ERROR XYZ-123] Test error\n'), (5, 'error: lower case\n')],
+        'warnings': [(2, '[WARNING GRT-0043] No vias\n')],
+        'codes': [(2, 'GRT-0043'), (3, 'DPL-0001')],
+        'other': [(5, 'error: lower case\n')],
+        'backref': [(2, '[WARNING GRT-0043] No vias\n'), (3, '[WARNING DPL-0001] Placed\n'),
+                    (4, '[ERROR XYZ-123] Test error\n'), (5, 'error: lower case\n')],
+    }
+
+    assert scanner.scan(io.StringIO('')) == (0, {name: [] for name in matches})
+
+
+def test_log_scanner_blocks(monkeypatch):
+    # Lines are split across reads, and the last line has no newline
+    monkeypatch.setattr(logscan, 'CHUNK_SIZE', 7)
+    log = 'ERROR a\nINFO b\nERROR\nc\n\nERROR d'
+    scanner = logscan.LogScanner({
+        'errors': ['ERROR'],
+        'spanning': [r'ERROR\s+c'],
+        'empty': ['-x '],
+        'inverted': ['-v ERROR']
+    })
+
+    assert scanner.scan(io.StringIO(log)) == (6, {
+        'errors': [(1, 'ERROR a\n'), (3, 'ERROR\n'), (6, 'ERROR d')],
+        'spanning': [],
+        'empty': [(5, '\n')],
+        'inverted': [(2, 'INFO b\n'), (4, 'c\n'), (5, '\n')]
+    })
+
+
+@pytest.mark.parametrize('log', [
+    'xWARN a\nWARN b\nwarn c\n',
+    # Lower case is not searched when it may change offsets
+    'xİWARN a\nWARN b\nwarn c\n'])
+def test_log_scanner_supersets(log):
+    scanner = logscan.LogScanner({
+        'anchored': ['^WARN'],
+        'nocase': ['-i -w warn'],
+    })
+
+    lines = log.splitlines(keepends=True)
+    assert scanner.scan(io.StringIO(log)) == (3, {
+        'anchored': [(2, lines[1])],
+        'nocase': [(2, lines[1]), (3, lines[2])]
+    })
+
+
+def test_log_scanner_handlers():
+    scanner = logscan.LogScanner({
+        'errors': ['ERROR'],
+        'warnings': ['WARNING'],
+    })
+
+    found = []
+    log = 'WARNING: first\nINFO: start\nERROR: failed\nWARNING: second'
+    count, matches = scanner.scan(io.StringIO(log), handlers={
+        'warnings': lambda num, output: found.append((num, output))})
+    assert count == 4
+    # Matches of chains with a handler are not collected
+    assert matches == {'errors': [(3, 'ERROR: failed\n')]}
+    assert found == [(1, 'WARNING: first\n'), (4, 'WARNING: second')]
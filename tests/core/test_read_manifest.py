@@ -78,6 +78,61 @@ def test_read_job():
     assert chip2.get('input', 'rtl', 'verilog', job='job1', step='import', index=0) == ['foo.v']
 
 
+def _write_run_manifest(path, schemaversion=None):
+    chip = siliconcompiler.Chip('foo')
+    chip.input('foo.v')
+    chip.set('constraint', 'outline', [(0, 0), (10, 10)])
+    chip.set('metric', 'errors', 2, step='syn', index='0')
+    chip.set('metric', 'cellarea', 10.5, step='place', index='1')
+    chip.set('option', 'define', 'FOO')
+    chip.set('tool', 'yosys', 'task', 'syn', 'option', '-foo', step='syn', index='0')
+    chip.set('input', 'rtl', 'verilog', False, field='copy')
+    if schemaversion:
+        chip.set('schemaversion', schemaversion)
+    chip.write_manifest(path)
+
+
+def test_read_manifest_trusted():
+    '''Ensure manifests from the same schema version merge like the set() replay'''
+    _write_run_manifest('trusted.json')
+    _write_run_manifest('untrusted.json', schemaversion='0.0.0')
+
+    trusted = siliconcompiler.Chip('foo')
+    trusted.read_manifest('trusted.json')
+    untrusted = siliconcompiler.Chip('foo')
+    untrusted.read_manifest('untrusted.json')
+
+    assert trusted.get('constraint', 'outline', step='syn', index='0') == [(0.0, 0.0), (10.0, 10.0)]
+    assert trusted.get('metric', 'errors', step='syn', index='0') == 2
+    assert trusted.get('metric', 'cellarea', step='place', index='1') == 10.5
+    assert trusted.get('option', 'define') == ['FOO']
+    assert trusted.get('tool', 'yosys', 'task', 'syn', 'option', step='syn', index='0') == \
+        ['-foo']
+    assert trusted.get('input', 'rtl', 'verilog', field='copy') is False
+
+    trusted.set('schemaversion', '0.0.0')
+    assert trusted.schema.cfg == untrusted.schema.cfg
+
+
+def test_read_manifest_trusted_append():
+    '''Ensure trusted manifests append to lists and respect clobber'''
+    _write_run_manifest('trusted.json')
+
+    chip = siliconcompiler.Chip('foo')
+    chip.input('bar.v')
+    chip.set('option', 'define', 'BAR')
+    chip.set('tool', 'yosys', 'task', 'syn', 'option', '-bar', step='syn', index='0')
+    chip.set('metric', 'errors', 1, step='syn', index='0')
+    chip.schema.read_manifest('trusted.json', clear=False, clobber=False)
+
+    assert chip.get('input', 'rtl', 'verilog', step='import', index='0') == ['bar.v', 'foo.v']
+    assert chip.get('option', 'define') == ['BAR', 'FOO']
+    assert chip.get('tool', 'yosys', 'task', 'syn', 'option', step='syn', index='0') == \
+        ['-bar', '-foo']
+    assert chip.get('metric', 'errors', step='syn', index='0') == 1
+    assert chip.get('metric', 'cellarea', step='place', index='1') == 10.5
+
+
 #########################
 if __name__ == "__main__":
     from tests.fixtures import datadir
@@ -16,8 +16,8 @@ def test_write_manifest():
     chip.input('b.v')
     chip.input('c.v')
 
-    for ext in ('pkg.json', 'tcl', 'csv', 'yaml',
-                'pkg.json.gz', 'tcl.gz', 'csv.gz', 'yaml.gz'):
+    for ext in ('pkg.json', 'tcl', 'csv', 'yaml', 'pkg.msgpack',
+                'pkg.json.gz', 'tcl.gz', 'csv.gz', 'yaml.gz', 'pkg.msgpack.gz'):
         manifest_path = f'top.{ext}'
         chip.write_manifest(manifest_path)
         assert os.path.exists(manifest_path)
@@ -112,6 +112,26 @@ def test_csv():
     assert data['asic,logiclib,syn,1'] == 'syn1lib'
 
 
+@pytest.mark.parametrize('ext', ('pkg.msgpack', 'pkg.msgpack.gz'))
+def test_msgpack(ext):
+    chip = siliconcompiler.Chip('top')
+    chip.input('top.v')
+    chip.set('constraint', 'outline', [(0, 0), (10, 10)])
+    chip.set('metric', 'cellarea', 10.5, step='place', index='0')
+    chip.write_manifest(f'top.{ext}')
+    chip.write_manifest('top.pkg.json')
+
+    assert os.path.getsize(f'top.{ext}') < os.path.getsize('top.pkg.json')
+
+    schema = siliconcompiler.Schema(manifest=f'top.{ext}')
+    assert schema.cfg == siliconcompiler.Schema(manifest='top.pkg.json').cfg
+    assert schema.get('constraint', 'outline') == [(0.0, 0.0), (10.0, 10.0)]
+
+    chip2 = siliconcompiler.Chip('top')
+    chip2.read_manifest(f'top.{ext}')
+    assert chip2.get('metric', 'cellarea', step='place', index='0') == 10.5
+
+
 #########################
 if __name__ == "__main__":
     test_write_manifest()
@@ -0,0 +1,29 @@
+import os
+
+
+def setup(chip):
+    step = chip.get('arg', 'step')
+    index = chip.get('arg', 'index')
+    chip.set('tool', 'dummy', 'task', 'generate', 'output', chip.top() + '.v',
+             step=step, index=index)
+    chip.add('tool', 'dummy', 'task', 'generate', 'require',
+             'tool,dummy,task,generate,var,module', step=step, index=index)
+
+
+def run(chip):
+    step = chip.get('arg', 'step')
+    index = chip.get('arg', 'index')
+
+    # Record each execution, so tests can tell when the task was skipped
+    with open(os.path.join(chip.cwd, 'generate.runs'), 'a') as f:
+        f.write(f'{chip.get("option", "jobname")} {step}{index}\n')
+
+    module = chip.get('tool', 'dummy', 'task', 'generate', 'var', 'module',
+                      step=step, index=index)[0]
+    with open(os.path.join('outputs', chip.top() + '.v'), 'w') as f:
+        f.write(f'module {module}();\nendmodule\n')
+    with open(os.path.join('reports', 'area.rpt'), 'w') as f:
+        f.write('cellarea 10\n')
+    chip._record_metric(step, index, 'cellarea', 10, 'reports/area.rpt', source_unit='um^2')
+
+    return 0
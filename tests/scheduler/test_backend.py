@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler.scheduler import backend
+from siliconcompiler.tools.builtin import nop
+
+
+class FakeBackend(backend.SchedulerBackend):
+    '''
+    Backend which records the calls made to it. Jobs are reported as running
+    when first polled, then as failed for the nodes in fail, and completed
+    otherwise.
+    '''
+
+    poll_interval = 0.1
+    calls = []
+    fail = []
+
+    def __init__(self, chip):
+        super().__init__(chip)
+        self.__nodes = {}
+        self.__polled = set()
+
+    def submit(self, nodes):
+        FakeBackend.calls.append(('submit', list(nodes)))
+        job_ids = []
+        for step, index in nodes:
+            job_id = f'job{len(self.__nodes)}'
+            self.__nodes[job_id] = (step, index)
+            job_ids.append(job_id)
+        return job_ids
+
+    def poll(self, job_ids):
+        FakeBackend.calls.append(('poll', list(job_ids)))
+        states = {}
+        for job_id in job_ids:
+            if job_id not in self.__polled:
+                self.__polled.add(job_id)
+                states[job_id] = backend.JOB_RUNNING
+            elif self.__nodes[job_id] in FakeBackend.fail:
+                states[job_id] = backend.JOB_FAILED
+            else:
+                states[job_id] = backend.JOB_COMPLETED
+        return states
+
+    def cancel(self, job_ids):
+        FakeBackend.calls.append(('cancel', list(job_ids)))
+
+    def fetch_logs(self, step, index):
+        FakeBackend.calls.append(('fetch_logs', (step, index)))
+        return None
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    monkeypatch.setitem(backend._backends, 'sge', FakeBackend)
+    monkeypatch.setattr(FakeBackend, 'calls', [])
+    monkeypatch.setattr(FakeBackend, 'fail', [])
+    return FakeBackend
+
+
+def _backend_chip(scheduler, width):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'nodisplay', True)
+    chip.set('option', 'scheduler', 'name', scheduler)
+    chip.node(flow, 'import', nop)
+    for index in range(width):
+        chip.node(flow, 'syn', nop, index=index)
+        chip.edge(flow, 'import', 'syn', head_index=index)
+    return chip
+
+
+@pytest.mark.timeout(300)
+def test_backend_jobs_tracked_together(fake_backend):
+    chip = _backend_chip('sge', 2)
+    chip.set('option', 'scheduler', 'jobarray', True)
+    fake_backend.fail = [('syn', '1')]
+    chip.run()
+
+    assert chip.get('flowgraph', 'test', 'syn', '0', 'status') == NodeStatus.SUCCESS
+    assert chip.get('flowgraph', 'test', 'syn', '1', 'status') == NodeStatus.ERROR
+
+    # The import node has no inputs, so it runs locally
+    submits = [call for call in fake_backend.calls if call[0] == 'submit']
+    assert submits == [('submit', [('syn', '0'), ('syn', '1')])]
+
+    polls = [call for call in fake_backend.calls if call[0] == 'poll']
+    assert polls[0] == ('poll', ['job0', 'job1'])
+
+    assert ('fetch_logs', ('syn', '1')) in fake_backend.calls
+    assert not [call for call in fake_backend.calls if call[0] == 'cancel']
+
+
+def test_backend_unknown():
+    with pytest.raises(ValueError):
+        backend.get_backend('unknown')
+
+
+@pytest.mark.timeout(300)
+def test_local_backend():
+    chip = _backend_chip('local', 2)
+    chip.run()
+
+    for index in ('0', '1'):
+        assert chip.get('flowgraph', 'test', 'syn', index, 'status') == NodeStatus.SUCCESS
+        files = backend.get_node_files(chip, 'syn', index)
+        assert os.path.isfile(files['script'])
+        assert os.path.isfile(files['log'])
+        assert os.path.isfile(os.path.join(chip._getworkdir(step='syn', index=index),
+                                           'outputs', 'test.pkg.json'))
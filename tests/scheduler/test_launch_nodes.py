@@ -0,0 +1,246 @@
+import multiprocessing
+import os
+import psutil
+import sys
+import time
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler import scheduler
+from siliconcompiler.scheduler import _launch_nodes, _get_node_memory, _get_node_tasktimes
+
+from siliconcompiler.tools.builtin import nop
+from tests.core.tools.dummy import dummy
+
+
+def _process(target, *args):
+    return multiprocessing.get_context('spawn').Process(target=target, args=args)
+
+
+class _Recorder:
+    '''
+    Wraps a process to record the order nodes are started in and how many
+    nodes were running at that time.
+    '''
+    started = []
+    running = set()
+
+    def __init__(self, node):
+        self.node = node
+        self.process = _process(time.sleep, 0.1)
+
+    def start(self):
+        _Recorder.running.add(self.node)
+        _Recorder.started.append((self.node, len(_Recorder.running)))
+        self.process.start()
+
+    @property
+    def sentinel(self):
+        return self.process.sentinel
+
+    def join(self):
+        self.process.join()
+        _Recorder.running.discard(self.node)
+
+    @property
+    def exitcode(self):
+        return self.process.exitcode
+
+
+def test_launch_nodes_propagates_failure(monkeypatch):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.node(flow, 'import', nop)
+    chip.node(flow, 'syn', dummy)
+    chip.node(flow, 'place', dummy)
+    chip.node(flow, 'export', nop)
+    chip.edge(flow, 'import', 'syn')
+    chip.edge(flow, 'syn', 'place')
+    chip.edge(flow, 'import', 'export')
+
+    nodes = [('import', '0'), ('syn', '0'), ('place', '0'), ('export', '0')]
+    nodes_to_run = {
+        ('import', '0'): [],
+        ('syn', '0'): [('import', '0')],
+        ('place', '0'): [('syn', '0')],
+        ('export', '0'): [('import', '0')]
+    }
+    processes = {
+        ('import', '0'): _process(time.sleep, 0.1),
+        ('syn', '0'): _process(sys.exit, 1),
+        ('place', '0'): _process(sys.exit, 0),
+        ('export', '0'): _process(sys.exit, 0)
+    }
+    status = {node: NodeStatus.PENDING for node in nodes}
+
+    class NoPollingTime:
+        @staticmethod
+        def sleep(_):
+            raise AssertionError('scheduler should wait on the running nodes')
+    monkeypatch.setattr(scheduler, 'time', NoPollingTime)
+
+    _launch_nodes(chip, nodes_to_run, processes, nodes, status)
+
+    assert status == {
+        ('import', '0'): NodeStatus.SUCCESS,
+        ('syn', '0'): NodeStatus.ERROR,
+        ('place', '0'): NodeStatus.ERROR,
+        ('export', '0'): NodeStatus.SUCCESS
+    }
+    # place is never started since its input failed
+    assert processes[('place', '0')].pid is None
+    assert not nodes_to_run
+
+
+def test_launch_nodes_many():
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'scheduler', 'maxnodes', 4)
+
+    nodes_to_run = {}
+    processes = {}
+    prev = None
+    for n in range(4):
+        step = f'step{n}'
+        for index in range(4):
+            chip.node(flow, step, nop, index=index)
+            node = (step, str(index))
+            nodes_to_run[node] = []
+            if prev:
+                chip.edge(flow, prev, step, tail_index=index, head_index=index)
+                nodes_to_run[node] = [(prev, str(index))]
+            processes[node] = _process(sys.exit, 0)
+        prev = step
+
+    status = {node: NodeStatus.PENDING for node in nodes_to_run}
+    _launch_nodes(chip, dict(nodes_to_run), processes, list(nodes_to_run), status)
+
+    assert all(node_status == NodeStatus.SUCCESS for node_status in status.values())
+
+
+def _fanout_chip(monkeypatch):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'scheduler', 'maxnodes', 4)
+    monkeypatch.setattr(_Recorder, 'started', [])
+    monkeypatch.setattr(_Recorder, 'running', set())
+
+    # import fans out to a short and a long chain
+    chip.node(flow, 'import', nop)
+    chip.node(flow, 'short', nop)
+    chip.node(flow, 'long0', nop)
+    chip.node(flow, 'long1', nop)
+    chip.edge(flow, 'import', 'short')
+    chip.edge(flow, 'import', 'long0')
+    chip.edge(flow, 'long0', 'long1')
+    for step in ('import', 'short', 'long0', 'long1'):
+        chip.set('tool', 'builtin', 'task', 'nop', 'threads', 1, step=step, index='0')
+
+    nodes_to_run = {
+        ('import', '0'): [],
+        ('short', '0'): [('import', '0')],
+        ('long0', '0'): [('import', '0')],
+        ('long1', '0'): [('long0', '0')]
+    }
+    return chip, nodes_to_run
+
+
+def test_launch_nodes_critical_path_first(monkeypatch):
+    chip, nodes_to_run = _fanout_chip(monkeypatch)
+    chip.set('option', 'scheduler', 'maxnodes', 1)
+
+    processes = {node: _Recorder(node) for node in nodes_to_run}
+    status = {node: NodeStatus.PENDING for node in nodes_to_run}
+    _launch_nodes(chip, dict(nodes_to_run), processes, list(nodes_to_run), status)
+
+    assert [node for node, _ in _Recorder.started] == [
+        ('import', '0'), ('long0', '0'), ('short', '0'), ('long1', '0')]
+
+
+def test_launch_nodes_critical_path_tasktime(monkeypatch):
+    chip, nodes_to_run = _fanout_chip(monkeypatch)
+    chip.set('option', 'scheduler', 'maxnodes', 1)
+
+    # short took longer than the long chain in a previous job
+    chip.set('option', 'jobname', 'job0')
+    for step, tasktime in (('import', 1), ('short', 100), ('long0', 1), ('long1', 1)):
+        chip.set('metric', 'tasktime', tasktime, step=step, index='0')
+    chip.schema.record_history()
+    chip.set('option', 'jobname', 'job1')
+
+    processes = {node: _Recorder(node) for node in nodes_to_run}
+    status = {node: NodeStatus.PENDING for node in nodes_to_run}
+    _launch_nodes(chip, dict(nodes_to_run), processes, list(nodes_to_run), status)
+
+    assert [node for node, _ in _Recorder.started] == [
+        ('import', '0'), ('short', '0'), ('long0', '0'), ('long1', '0')]
+
+
+def test_get_node_tasktimes():
+    chip = siliconcompiler.Chip('test')
+    assert _get_node_tasktimes(chip, [('syn', '0')]) == {}
+
+    # Previous job manifest in the build directory
+    chip.set('option', 'jobname', 'job0')
+    chip.set('metric', 'tasktime', 10, step='syn', index='0')
+    chip.write_manifest(os.path.join(chip._getworkdir(), 'test.pkg.json'))
+
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'jobname', 'job1')
+    assert _get_node_tasktimes(chip, [('syn', '0'), ('place', '0')]) == {('syn', '0'): 10}
+
+    # The manifest is only read again once it is modified
+    manifest = os.path.join(chip._getworkdir(jobname='job0'), 'test.pkg.json')
+    mtime = os.path.getmtime(manifest)
+    with open(manifest, 'w') as f:
+        f.write('{}')
+    os.utime(manifest, (mtime, mtime))
+    assert _get_node_tasktimes(chip, [('syn', '0')]) == {('syn', '0'): 10}
+    os.utime(manifest, (mtime + 1, mtime + 1))
+    assert _get_node_tasktimes(chip, [('syn', '0')]) == {}
+
+    # History of the chip is used instead of the build directory
+    chip.set('option', 'jobname', 'job2')
+    chip.set('metric', 'tasktime', 20, step='syn', index='0')
+    chip.schema.record_history()
+    chip.set('option', 'jobname', 'job3')
+    chip.set('metric', 'tasktime', 30, step='syn', index='0')
+    chip.schema.record_history()
+    assert _get_node_tasktimes(chip, [('syn', '0'), ('place', '0')]) == {('syn', '0'): 25}
+
+
+def test_launch_nodes_memory(monkeypatch):
+    chip, nodes_to_run = _fanout_chip(monkeypatch)
+
+    # short and long0 cannot fit in memory together
+    available_mb = psutil.virtual_memory().available // (1024 * 1024)
+    for step in ('short', 'long0'):
+        chip.set('option', 'scheduler', 'memory', int(available_mb * 0.6), step=step, index='0')
+
+    processes = {node: _Recorder(node) for node in nodes_to_run}
+    status = {node: NodeStatus.PENDING for node in nodes_to_run}
+    _launch_nodes(chip, dict(nodes_to_run), processes, list(nodes_to_run), status)
+
+    assert all(node_status == NodeStatus.SUCCESS for node_status in status.values())
+    running = dict(_Recorder.started)
+    assert running[('short', '0')] == 1 or running[('long0', '0')] == 1
+
+
+def test_get_node_memory():
+    chip = siliconcompiler.Chip('test')
+    assert _get_node_memory(chip, 'syn', '0') is None
+
+    # Learned from previous jobs
+    chip.set('option', 'jobname', 'job0')
+    chip.set('metric', 'memory', 2e9, step='syn', index='0')
+    chip.schema.record_history()
+    chip.set('option', 'jobname', 'job1')
+    chip.set('metric', 'memory', 1e9, step='syn', index='0')
+    assert _get_node_memory(chip, 'syn', '0') == 2e9
+
+    # Requested memory takes precedence
+    chip.set('option', 'scheduler', 'memory', 500, step='syn', index='0')
+    assert _get_node_memory(chip, 'syn', '0') == 500 * 1024 * 1024
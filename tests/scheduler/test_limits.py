@@ -0,0 +1,134 @@
+import logging
+import os
+import sys
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler.scheduler import limits
+
+import tests.core.tools.run.run as run
+
+
+def _run_chip(script):
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'nodisplay', True)
+
+    flow = siliconcompiler.Flow(chip, 'testflow')
+    flow.node('testflow', 'run', run)
+    chip.use(flow)
+    chip.set('option', 'flow', 'testflow')
+
+    with open('tool.sh', 'w') as f:
+        f.write(script)
+    chip.set('tool', 'run', 'task', 'run', 'option', os.path.abspath('tool.sh'),
+             step='run', index=0)
+    return chip
+
+
+@pytest.fixture
+def fake_cgroup(monkeypatch):
+    os.makedirs('cgroup')
+    with open('cgroup/cgroup.controllers', 'w') as f:
+        f.write('cpuset cpu io memory pids\n')
+    with open('cgroup/cgroup.subtree_control', 'w') as f:
+        f.write('')
+    monkeypatch.setattr(limits, '_get_own_cgroup', lambda: os.path.abspath('cgroup'))
+    return os.path.abspath('cgroup')
+
+
+def test_get_limits():
+    chip = _run_chip('')
+    assert limits.get_limits(chip, 'run', '0') == {}
+
+    chip.set('tool', 'run', 'task', 'run', 'limit', 'memory', 100)
+    chip.set('tool', 'run', 'task', 'run', 'limit', 'files', 32, step='run', index='0')
+    assert limits.get_limits(chip, 'run', '0') == {'memory': 100, 'files': 32}
+
+
+def test_cgroup_limits(fake_cgroup):
+    logger = logging.getLogger('test_cgroup_limits')
+    limiter = limits.ResourceLimiter({'memory': 100, 'cpu': 1.5}, 'run0', logger)
+
+    assert os.path.dirname(limiter.cgroup) == fake_cgroup
+    assert os.path.basename(limiter.cgroup).startswith('sc-run0-')
+    with open(os.path.join(fake_cgroup, 'cgroup.subtree_control')) as f:
+        assert f.read() == '+cpu +memory +io +pids'
+    with open(os.path.join(limiter.cgroup, 'memory.max')) as f:
+        assert f.read() == str(100 * 1024 * 1024)
+    with open(os.path.join(limiter.cgroup, 'cpu.max')) as f:
+        assert f.read() == '150000 100000'
+
+    assert limiter.exceeded() is None
+    with open(os.path.join(limiter.cgroup, 'memory.events'), 'w') as f:
+        f.write('low 0\nhigh 0\nmax 3\noom 1\noom_kill 1\n')
+    assert limiter.exceeded() == 'memory'
+
+    for name in os.listdir(limiter.cgroup):
+        os.remove(os.path.join(limiter.cgroup, name))
+    limiter.close()
+    assert not os.path.exists(limiter.cgroup)
+
+
+def test_cgroup_missing_controller(fake_cgroup):
+    with open(os.path.join(fake_cgroup, 'cgroup.controllers'), 'w') as f:
+        f.write('cpu pids\n')
+
+    logger = logging.getLogger('test_cgroup_missing_controller')
+    limiter = limits.ResourceLimiter({'memory': 100}, 'run0', logger)
+    assert limiter.cgroup is None
+    assert sorted(os.listdir(fake_cgroup)) == ['cgroup.controllers', 'cgroup.subtree_control']
+
+
+def test_cpu_limit_without_cgroup(monkeypatch, caplog):
+    monkeypatch.setattr(limits, '_get_own_cgroup', lambda: None)
+
+    logger = logging.getLogger('test_cpu_limit_without_cgroup')
+    limiter = limits.ResourceLimiter({'cpu': 2}, 'run0', logger)
+    assert limiter.cgroup is None
+    assert 'CPU limit requires a delegated cgroup v2 hierarchy' in caplog.text
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Uses posix rlimits')
+def test_rlimits(monkeypatch):
+    monkeypatch.setattr(limits, '_get_own_cgroup', lambda: None)
+
+    chip = _run_chip('ulimit -n\nulimit -v\n')
+    chip.set('tool', 'run', 'task', 'run', 'limit', 'memory', 512)
+    chip.set('tool', 'run', 'task', 'run', 'limit', 'files', 64)
+    chip.run()
+
+    with open(os.path.join(chip._getworkdir(step='run', index='0'), 'run.log')) as f:
+        assert f.read().splitlines() == ['64', str(512 * 1024)]
+    assert chip.get('record', 'resourcelimit', step='run', index='0') is None
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Uses a posix shell')
+def test_timeout_record():
+    chip = _run_chip('sleep 30\n')
+    chip.set('flowgraph', 'testflow', 'run', '0', 'timeout', 0.5)
+
+    with pytest.raises(siliconcompiler.SiliconCompilerError):
+        chip.run()
+
+    # The failed node records its state in its output manifest
+    manifest = os.path.join(chip._getworkdir(step='run', index='0'), 'outputs', 'test.pkg.json')
+    node = siliconcompiler.Chip('test')
+    node.read_manifest(manifest)
+    assert node.get('flowgraph', 'testflow', 'run', '0', 'status') == NodeStatus.ERROR
+    assert node.get('record', 'resourcelimit', step='run', index='0') == 'timeout'
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Uses posix rlimits')
+def test_memory_rlimit_exceeded(monkeypatch, capfd):
+    monkeypatch.setattr(limits, '_get_own_cgroup', lambda: None)
+
+    chip = _run_chip(f'{sys.executable} -c "bytearray(2 * 1024 ** 3)"\n')
+    chip.set('tool', 'run', 'task', 'run', 'limit', 'memory', 256)
+
+    with pytest.raises(siliconcompiler.SiliconCompilerError):
+        chip.run()
+
+    assert 'run may have exceeded its memory limit of 256 MB' in capfd.readouterr().out
@@ -0,0 +1,88 @@
+import glob
+import json
+import os
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler.tools.builtin import nop
+from tests.core.tools.dummy import generate
+
+
+def _cache_chip(jobname, module):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'nodisplay', True)
+    chip.set('option', 'jobname', jobname)
+    chip.set('option', 'nodecache', 'nodecache')
+    chip.node(flow, 'import', generate)
+    chip.node(flow, 'syn', nop)
+    chip.edge(flow, 'import', 'syn')
+    chip.set('tool', 'dummy', 'task', 'generate', 'var', 'module', module)
+    return chip
+
+
+def _runs():
+    with open('generate.runs') as f:
+        return f.read().splitlines()
+
+
+def test_nodecache():
+    chip = _cache_chip('job0', 'test')
+    chip.run()
+    for step in ('import', 'syn'):
+        assert chip.get('record', 'nodecache', step=step, index='0') == 'miss'
+    assert _runs() == ['job0 import0']
+    assert chip.get('metric', 'memory', step='import', index='0') is not None
+
+    # Metrics of the run are not stored
+    for entry in glob.glob(os.path.join('nodecache', '*', '*', 'node.json')):
+        with open(entry) as f:
+            metrics = json.load(f)['metric']
+        for metric in ('exetime', 'tasktime', 'cpuutilization', 'memory', 'peakrss'):
+            assert metric not in metrics
+
+    # Identical nodes of later jobs are restored from the cache
+    chip = _cache_chip('job1', 'test')
+    chip.run()
+    assert _runs() == ['job0 import0']
+    for step in ('import', 'syn'):
+        assert chip.get('flowgraph', 'test', step, '0', 'status') == NodeStatus.SUCCESS
+        assert chip.get('record', 'nodecache', step=step, index='0') == 'hit'
+    assert chip.get('metric', 'cellarea', step='import', index='0') == 10
+
+    # Metrics of the run which stored the results are not restored
+    for metric in ('exetime', 'cpuutilization', 'memory', 'peakrss'):
+        assert chip.get('metric', metric, step='import', index='0') is None
+
+    workdir = chip._getworkdir(step='syn', index='0')
+    with open(os.path.join(workdir, 'outputs', 'test.v')) as f:
+        assert f.read() == 'module test();\nendmodule\n'
+    assert os.path.isfile(os.path.join(workdir, 'outputs', 'test.pkg.json'))
+    assert os.path.isfile(os.path.join(chip._getworkdir(step='import', index='0'),
+                                       'reports', 'area.rpt'))
+
+    # A change of a required parameter misses the cache, and so do the nodes
+    # whose inputs changed as a result
+    chip = _cache_chip('job2', 'other')
+    chip.run()
+    assert _runs() == ['job0 import0', 'job2 import0']
+    for step in ('import', 'syn'):
+        assert chip.get('record', 'nodecache', step=step, index='0') == 'miss'
+    with open(os.path.join(chip._getworkdir(step='syn', index='0'), 'outputs', 'test.v')) as f:
+        assert f.read() == 'module other();\nendmodule\n'
+
+
+def test_nodecache_disabled():
+    chip = _cache_chip('job0', 'test')
+    chip.set('option', 'nodecache', None)
+    chip.run()
+
+    chip = _cache_chip('job1', 'test')
+    chip.set('option', 'nodecache', None)
+    chip.run()
+
+    assert _runs() == ['job0 import0', 'job1 import0']
+    assert chip.get('record', 'nodecache', step='import', index='0') is None
+    assert not os.path.exists('nodecache')
@@ -0,0 +1,105 @@
+import csv
+import os
+import subprocess
+import sys
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler.scheduler import resources
+
+import tests.core.tools.run.run as run
+
+
+def test_monitor_process():
+    code = 'import time\n' \
+        'data = bytearray(64 * 1024 * 1024)\n' \
+        'end = time.time() + 1\n' \
+        'while time.time() < end:\n' \
+        '    pass\n'
+    proc = subprocess.Popen([sys.executable, '-c', code])
+    monitor = resources.ResourceMonitor(proc.pid, path='usage.csv')
+    monitor.start()
+    proc.wait()
+    monitor.stop()
+
+    assert monitor.peak_rss >= 64 * 1024 * 1024
+    assert 0 < monitor.peak_memory <= monitor.peak_rss
+    assert monitor.cpu_time > 0
+    assert monitor.cpu_utilization > 0
+
+    with open('usage.csv') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0].keys()) == list(resources.COLUMNS)
+    assert len(rows) > 1
+    assert max(int(row['rss']) for row in rows) == monitor.peak_rss
+    assert all(int(row['threads']) >= 1 for row in rows)
+
+
+def test_monitor_exited_process():
+    proc = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proc.wait()
+
+    monitor = resources.ResourceMonitor(proc.pid)
+    monitor.start()
+    monitor.stop()
+
+    assert monitor.peak_rss == 0
+    assert monitor.cpu_utilization == 0
+
+
+def test_monitor_cgroup():
+    os.makedirs('group')
+    with open('group/cpu.stat', 'w') as f:
+        f.write('usage_usec 2500000\nuser_usec 2000000\nsystem_usec 500000\n')
+    with open('group/memory.stat', 'w') as f:
+        f.write('anon 1000\nfile 5000\nfile_mapped 200\n')
+    with open('group/io.stat', 'w') as f:
+        f.write('8:0 rbytes=100 wbytes=50 rios=1 wios=1\n'
+                '8:16 rbytes=20 wbytes=30 rios=1 wios=1\n')
+    with open('group/pids.current', 'w') as f:
+        f.write('4\n')
+
+    assert resources.read_cgroup('group') == {
+        'cpu': 2.5,
+        'rss': 1200,
+        'pss': 1200,
+        'read': 120,
+        'write': 80,
+        'threads': 4
+    }
+
+    monitor = resources.ResourceMonitor(0, cgroup='group')
+    assert monitor.sample()['threads'] == 4
+    assert monitor.peak_rss == 1200
+    assert monitor.cpu_time == 2.5
+    assert monitor.read_bytes + monitor.write_bytes == 200
+
+
+def test_read_cgroup_missing():
+    assert resources.read_cgroup('missing') is None
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Uses a posix shell')
+def test_resource_metrics():
+    chip = siliconcompiler.Chip('test')
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'nodisplay', True)
+
+    flow = siliconcompiler.Flow(chip, 'testflow')
+    flow.node('testflow', 'run', run)
+    chip.use(flow)
+    chip.set('option', 'flow', 'testflow')
+    with open('tool.sh', 'w') as f:
+        f.write('sleep 0.5\n')
+    chip.set('tool', 'run', 'task', 'run', 'option', os.path.abspath('tool.sh'),
+             step='run', index=0)
+
+    chip.run()
+
+    assert chip.get('metric', 'peakrss', step='run', index='0') > 0
+    assert chip.get('metric', 'memory', step='run', index='0') > 0
+    assert chip.get('metric', 'cpuutilization', step='run', index='0') is not None
+    assert chip.get('metric', 'iobytes', step='run', index='0') is not None
+    assert os.path.isfile(os.path.join(chip._getworkdir(step='run', index='0'),
+                                       'run.resources.csv'))
@@ -0,0 +1,232 @@
+import json
+import os
+import stat
+import sys
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler.scheduler import slurm
+from siliconcompiler.tools.builtin import nop
+
+
+# Stand-ins for the slurm commands, which run jobs synchronously when they
+# are submitted and record each call.
+FAKE_SBATCH = '''
+import json, os, subprocess, sys
+
+state = os.environ['FAKE_SLURM_DIR']
+args = sys.argv[1:]
+with open(os.path.join(state, 'calls.log'), 'a') as f:
+    f.write(json.dumps(['sbatch'] + args) + '\\n')
+
+jobs_file = os.path.join(state, 'jobs.json')
+jobs = {}
+if os.path.isfile(jobs_file):
+    with open(jobs_file) as f:
+        jobs = json.load(f)
+job_id = str(1000 + len(jobs))
+
+options = dict(zip(args[:-1], args[1:]))
+tasks = [None]
+if '--array' in options:
+    tasks = range(int(options['--array'].split('-')[1]) + 1)
+
+for task in tasks:
+    env = dict(os.environ)
+    if task is not None:
+        env['SLURM_ARRAY_TASK_ID'] = str(task)
+    with open(options['--output'], 'a') as out:
+        ret = subprocess.run([args[-1]], env=env, cwd=options['--chdir'],
+                             stdout=out, stderr=subprocess.STDOUT).returncode
+    element = job_id if task is None else f'{job_id}_{task}'
+    jobs[element] = 'COMPLETED' if ret == 0 else 'FAILED'
+
+with open(jobs_file, 'w') as f:
+    json.dump(jobs, f)
+print(job_id)
+'''
+
+FAKE_SQUEUE = '''
+import json, os, sys
+
+state = os.environ['FAKE_SLURM_DIR']
+args = sys.argv[1:]
+with open(os.path.join(state, 'calls.log'), 'a') as f:
+    f.write(json.dumps(['squeue'] + args) + '\\n')
+
+if os.path.isfile(os.path.join(state, 'unreachable')):
+    sys.stderr.write('slurm_load_jobs error: Unable to contact slurm controller\\n')
+    sys.exit(1)
+
+with open(os.path.join(state, 'jobs.json')) as f:
+    jobs = json.load(f)
+
+# Jobs are reported as running the first time they are queried, and are
+# purged afterwards
+seen_file = os.path.join(state, 'seen.json')
+seen = []
+if os.path.isfile(seen_file):
+    with open(seen_file) as f:
+        seen = json.load(f)
+query = args[args.index('--jobs') + 1].split(',')
+reported = False
+for job_id in jobs:
+    if job_id.split('_')[0] in query and job_id not in seen:
+        print(f'{job_id} RUNNING')
+        seen.append(job_id)
+        reported = True
+with open(seen_file, 'w') as f:
+    json.dump(seen, f)
+if not reported:
+    sys.stderr.write('slurm_load_jobs error: Invalid job id specified\\n')
+    sys.exit(1)
+'''
+
+FAKE_SACCT = '''
+import json, os, sys
+
+state = os.environ['FAKE_SLURM_DIR']
+args = sys.argv[1:]
+with open(os.path.join(state, 'calls.log'), 'a') as f:
+    f.write(json.dumps(['sacct'] + args) + '\\n')
+
+if os.path.isfile(os.path.join(state, 'no_accounting')):
+    sys.stderr.write('Slurm accounting storage is disabled\\n')
+    sys.exit(1)
+
+with open(os.path.join(state, 'jobs.json')) as f:
+    jobs = json.load(f)
+for job_id in args[args.index('--jobs') + 1].split(','):
+    print(f'{job_id}|{jobs[job_id]}')
+'''
+
+
+@pytest.fixture
+def fake_slurm(monkeypatch):
+    '''
+    Installs fake sbatch, squeue and sacct commands, and returns a function
+    which returns the commands called so far.
+    '''
+    bin_dir = os.path.abspath('fake_slurm')
+    os.makedirs(bin_dir)
+    for name, code in (('sbatch', FAKE_SBATCH),
+                       ('squeue', FAKE_SQUEUE),
+                       ('sacct', FAKE_SACCT)):
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w') as f:
+            f.write(f'#!{sys.executable}\n{code}')
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+    monkeypatch.setenv('PATH', bin_dir + os.pathsep + os.environ['PATH'])
+    monkeypatch.setenv('FAKE_SLURM_DIR', bin_dir)
+    monkeypatch.setattr(slurm, 'POLL_INTERVAL', 0.1)
+
+    def calls():
+        calls_file = os.path.join(bin_dir, 'calls.log')
+        if not os.path.isfile(calls_file):
+            return []
+        with open(calls_file) as f:
+            return [json.loads(line) for line in f]
+
+    return calls
+
+
+def _slurm_chip(width):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'nodisplay', True)
+    chip.set('option', 'scheduler', 'name', 'slurm')
+    chip.set('option', 'scheduler', 'queue', 'debug')
+    chip.node(flow, 'import', nop)
+    for index in range(width):
+        chip.node(flow, 'syn', nop, index=index)
+        chip.edge(flow, 'import', 'syn', head_index=index)
+    return chip
+
+
+@pytest.mark.timeout(300)
+def test_slurm_job_array(fake_slurm):
+    chip = _slurm_chip(3)
+    chip.set('option', 'scheduler', 'jobarray', True)
+    chip.run()
+
+    for index in range(3):
+        assert chip.get('flowgraph', 'test', 'syn', str(index), 'status') == NodeStatus.SUCCESS
+
+    calls = fake_slurm()
+    sbatch = [call for call in calls if call[0] == 'sbatch']
+    assert len(sbatch) == 1
+    assert sbatch[0][sbatch[0].index('--array') + 1] == '0-2'
+
+    # All the jobs are queried together
+    squeue = [call for call in calls if call[0] == 'squeue']
+    assert len(squeue) == 2
+    for call in squeue:
+        assert call[call.index('--jobs') + 1] == '1000'
+
+
+@pytest.mark.timeout(300)
+def test_slurm_failed_job(fake_slurm):
+    chip = _slurm_chip(2)
+    # Keeps the build directory, as when running on a server
+    chip.set('record', 'remoteid', '0123456789abcdef0123456789abcdef')
+
+    # Compute node script which fails
+    cfg_dir = slurm.get_configuration_directory(chip)
+    os.makedirs(cfg_dir)
+    with open(os.path.join(cfg_dir, 'syn1.sh'), 'w') as f:
+        f.write('#!/bin/bash\nexit 1\n')
+
+    chip.run()
+
+    assert chip.get('flowgraph', 'test', 'syn', '0', 'status') == NodeStatus.SUCCESS
+    assert chip.get('flowgraph', 'test', 'syn', '1', 'status') == NodeStatus.ERROR
+
+    calls = fake_slurm()
+    assert len([call for call in calls if call[0] == 'sbatch']) == 2
+    sacct = [call for call in calls if call[0] == 'sacct']
+    assert sacct
+    assert sacct[-1][sacct[-1].index('--jobs') + 1] in ('1000,1001', '1001')
+
+
+def test_query_job_states(fake_slurm):
+    with open(os.path.join('fake_slurm', 'jobs.json'), 'w') as f:
+        json.dump({'12_0': 'COMPLETED', '12_1': 'FAILED', '13': 'CANCELLED'}, f)
+
+    assert slurm._query_job_states(['12_0', '12_1', '13']) == {
+        '12_0': 'RUNNING', '12_1': 'RUNNING', '13': 'RUNNING'}
+    assert slurm._query_job_states(['12_0', '12_1', '13']) == {
+        '12_0': 'COMPLETED', '12_1': 'FAILED', '13': 'CANCELLED'}
+
+    squeue = [call for call in fake_slurm() if call[0] == 'squeue']
+    assert squeue[0][squeue[0].index('--jobs') + 1] == '12,13'
+
+
+def test_query_job_states_without_accounting(fake_slurm):
+    with open(os.path.join('fake_slurm', 'jobs.json'), 'w') as f:
+        json.dump({'12': 'COMPLETED', '13': 'COMPLETED'}, f)
+    with open(os.path.join('fake_slurm', 'no_accounting'), 'w') as f:
+        f.write('')
+
+    assert slurm._query_job_states(['12', '13']) == {'12': 'RUNNING', '13': 'RUNNING'}
+    # Jobs rejected by squeue were purged
+    assert slurm._query_job_states(['12', '13']) == {
+        '12': slurm.SLURM_PURGED_STATE, '13': slurm.SLURM_PURGED_STATE}
+
+    squeue = [call for call in fake_slurm() if call[0] == 'squeue']
+    assert [call[call.index('--jobs') + 1] for call in squeue] == ['12,13', '12,13', '12', '13']
+
+
+def test_poll_unreachable(fake_slurm):
+    with open(os.path.join('fake_slurm', 'jobs.json'), 'w') as f:
+        json.dump({'12': 'COMPLETED'}, f)
+    with open(os.path.join('fake_slurm', 'unreachable'), 'w') as f:
+        f.write('')
+
+    # Jobs keep their state while slurm cannot be queried
+    assert slurm.SlurmBackend(_slurm_chip(1)).poll(['12']) == {}
+    assert not [call for call in fake_slurm() if call[0] == 'sacct']
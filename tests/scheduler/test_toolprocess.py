@@ -0,0 +1,135 @@
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import siliconcompiler
+from siliconcompiler.scheduler import toolprocess
+
+
+@pytest.fixture
+def logger():
+    # The chip registers the codec error handlers used for tool output
+    chip = siliconcompiler.Chip('test')
+    chip.logger.setLevel(logging.INFO)
+    return chip.logger
+
+
+def _python(code):
+    return [sys.executable, '-c', code]
+
+
+def test_tee_output(logger, caplog):
+    code = 'import sys\n' \
+        'print("first")\n' \
+        'sys.stdout.flush()\n' \
+        'sys.stderr.write("problem\\n")\n' \
+        'sys.stdout.write("partial")\n'
+    with toolprocess.ToolProcess(_python(code), 'tool.log', 'tool.err', logger) as tool:
+        assert tool.wait() == 0
+
+    with open('tool.log') as f:
+        assert f.read() == 'first\npartial'
+    with open('tool.err') as f:
+        assert f.read() == 'problem\n'
+
+    records = [(record.levelno, record.getMessage()) for record in caplog.records]
+    assert (logging.INFO, 'first') in records
+    assert (logging.INFO, 'partial') in records
+    assert (logging.ERROR, 'problem') in records
+
+
+def test_merged_output(logger, caplog):
+    code = 'import sys\n' \
+        'sys.stderr.write("problem\\n")\n' \
+        'sys.stderr.flush()\n' \
+        'print("done")\n'
+    with toolprocess.ToolProcess(_python(code), 'tool.log', 'tool.log', logger) as tool:
+        assert tool.wait() == 0
+
+    with open('tool.log') as f:
+        assert f.read().splitlines() == ['problem', 'done']
+    assert [record.getMessage() for record in caplog.records
+            if record.levelno == logging.INFO] == ['problem', 'done']
+
+
+def test_not_logged(logger, caplog):
+    code = 'import sys\n' \
+        'print("output")\n' \
+        'sys.exit(3)\n'
+    with toolprocess.ToolProcess(_python(code), 'tool.log', os.devnull, logger,
+                                 log_stdout=False) as tool:
+        assert tool.wait() == 3
+
+    with open('tool.log') as f:
+        assert f.read() == 'output\n'
+    assert not caplog.records
+
+
+def test_invalid_characters(logger):
+    code = 'import sys\n' \
+        'sys.stdout.buffer.write(b"bad \\xff\\xfe\\n")\n'
+    with toolprocess.ToolProcess(_python(code), 'tool.log', 'tool.err', logger) as tool:
+        assert tool.wait() == 0
+
+    # The log keeps the output of the tool unchanged
+    with open('tool.log', 'rb') as f:
+        assert f.read() == b'bad \xff\xfe\n'
+
+
+def test_rate_limit(logger, caplog, monkeypatch):
+    monkeypatch.setattr(toolprocess, 'LOG_BURST', 10)
+    monkeypatch.setattr(toolprocess, 'LOG_RATE', 1)
+
+    code = 'for i in range(1000): print(i)'
+    with toolprocess.ToolProcess(_python(code), 'tool.log', 'tool.err', logger) as tool:
+        assert tool.wait() == 0
+
+    with open('tool.log') as f:
+        assert len(f.read().splitlines()) == 1000
+
+    info = [record.getMessage() for record in caplog.records if record.levelno == logging.INFO]
+    assert info[:10] == [str(i) for i in range(10)]
+    assert len(info) < 1000
+
+    warnings = [record.getMessage() for record in caplog.records
+                if record.levelno == logging.WARNING]
+    skipped = sum(int(message.split()[2]) for message in warnings)
+    assert len(info) + skipped == 1000
+
+
+def test_timeout(logger):
+    code = 'import time\n' \
+        'print("waiting", flush=True)\n' \
+        'time.sleep(30)\n'
+    with toolprocess.ToolProcess(_python(code), 'tool.log', 'tool.err', logger) as tool:
+        with pytest.raises(subprocess.TimeoutExpired):
+            tool.wait(timeout=0.5)
+        tool.proc.kill()
+        tool.proc.wait()
+
+
+def test_callback(logger):
+    calls = []
+    code = 'import time\n' \
+        'time.sleep(1)\n'
+    with toolprocess.ToolProcess(_python(code), 'tool.log', 'tool.err', logger) as tool:
+        tool.wait(interval=0.1, callback=lambda proc: calls.append(proc.pid))
+
+    assert len(calls) > 1
+    assert set(calls) == {tool.proc.pid}
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Uses a posix shell')
+def test_exit_with_open_pipes(logger, caplog):
+    # The background process keeps the pipes of the tool open after it exits
+    cmd = ['sh', '-c', 'sleep 30 & echo started']
+    start = time.time()
+    with toolprocess.ToolProcess(cmd, 'tool.log', 'tool.err', logger) as tool:
+        assert tool.wait() == 0
+    assert time.time() - start < 10
+
+    assert 'started' in [record.getMessage() for record in caplog.records]
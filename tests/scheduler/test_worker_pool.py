@@ -0,0 +1,69 @@
+import psutil
+import pytest
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+
+from siliconcompiler.tools.builtin import nop, join
+
+
+def _children():
+    return set(child.pid for child in psutil.Process().children())
+
+
+def _nop_chip(jobname):
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'jobname', jobname)
+    chip.set('option', 'scheduler', 'workerpool', True)
+    chip.set('option', 'scheduler', 'maxnodes', 2)
+    chip.node(flow, 'import', nop)
+    chip.node(flow, 'syn', nop, index=0)
+    chip.node(flow, 'syn', nop, index=1)
+    chip.node(flow, 'join', join)
+    chip.edge(flow, 'import', 'syn', head_index=0)
+    chip.edge(flow, 'import', 'syn', head_index=1)
+    chip.edge(flow, 'syn', 'join', tail_index=0)
+    chip.edge(flow, 'syn', 'join', tail_index=1)
+    return chip
+
+
+def test_worker_pool():
+    chip = _nop_chip('job0')
+    chip.run()
+
+    for step, index in (('import', '0'), ('syn', '0'), ('syn', '1'), ('join', '0')):
+        assert chip.get('flowgraph', 'test', step, index, 'status') == NodeStatus.SUCCESS
+        assert chip.get('metric', 'tasktime', step=step, index=index) is not None
+    workers = _children()
+    assert workers
+
+    # Workers are kept alive for the next job
+    chip = _nop_chip('job1')
+    chip.run()
+    assert chip.get('flowgraph', 'test', 'join', '0', 'status') == NodeStatus.SUCCESS
+    assert workers.issubset(_children())
+
+
+def test_worker_pool_exception():
+    chip = siliconcompiler.Chip('test')
+    chip.load_target('asic_demo')
+    chip.set('option', 'scheduler', 'workerpool', True)
+    chip.set('option', 'skipcheck', True)
+    chip.set('option', 'to', 'import')
+
+    flow = chip.get('option', 'flow')
+    chip.set('flowgraph', flow, 'import', '0', 'tool', 'dummy')
+    chip.set('flowgraph', flow, 'import', '0', 'taskmodule', 'tests.core.tools.dummy.import')
+    # parse_version() of the dummy tool raises an exception inside the worker
+    chip.set('tool', 'dummy', 'vswitch', '--version')
+
+    with pytest.raises(siliconcompiler.SiliconCompilerError):
+        chip.run()
+
+    # Workers remain usable after a failed node
+    chip = _nop_chip('job1')
+    chip.run()
+    assert chip.get('flowgraph', 'test', 'join', '0', 'status') == NodeStatus.SUCCESS
@@ -134,3 +134,229 @@ def test_merge_with_init_with_lib():
     chip.schema._merge_with_init_schema()
 
     assert 'sky130hd' in chip.getkeys('library')
+
+
+def test_keypath_index_default_insert():
+    schema = Schema()
+    keypath = ['tool', 'yosys', 'task', 'syn_asic', 'threads']
+
+    # Resolved through the 'default' branches
+    assert schema.get(*keypath, step='syn', index='0') is None
+
+    schema.set(*keypath, 4, step='syn', index='0')
+    assert schema.get(*keypath, step='syn', index='0') == 4
+    assert 'yosys' in schema.getkeys('tool')
+
+    # Sibling keypath still resolved through 'default'
+    assert schema.get('tool', 'yosys', 'task', 'syn_fpga', 'threads',
+                      step='syn', index='0') is None
+
+
+def test_keypath_index_remove():
+    schema = Schema()
+    schema.set('constraint', 'component', 'test_inst', 'placement', (0, 0, 0))
+    assert schema.get('constraint', 'component', 'test_inst', 'placement') == (0, 0, 0)
+
+    schema._remove('constraint', 'component', 'test_inst')
+
+    # Lookup falls back to the default value again
+    assert schema.get('constraint', 'component', 'test_inst', 'placement') is None
+    assert 'test_inst' not in schema.getkeys('constraint', 'component')
+
+
+def test_keypath_index_replace_cfg():
+    schema = Schema()
+    schema.set('option', 'jobname', 'job1')
+    assert schema.get('option', 'jobname') == 'job1'
+
+    schema.cfg = Schema().cfg
+    assert schema.get('option', 'jobname') == 'job0'
+
+
+def test_keypath_index_history():
+    schema = Schema()
+    schema.set('option', 'jobname', 'job1')
+    schema.set('option', 'flow', 'flow1')
+    schema.record_history()
+    assert schema.get('option', 'flow', job='job1') == 'flow1'
+
+    # Re-recording the job replaces the history entry
+    schema.set('option', 'flow', 'flow2')
+    schema.record_history()
+    assert schema.get('option', 'flow', job='job1') == 'flow2'
+
+
+def test_keypath_index_pickle():
+    import pickle
+
+    schema = Schema()
+    schema.set('option', 'jobname', 'job1')
+    new_schema = pickle.loads(pickle.dumps(schema))
+
+    assert new_schema.get('option', 'jobname') == 'job1'
+    new_schema.set('option', 'jobname', 'job2')
+    assert new_schema.get('option', 'jobname') == 'job2'
+    assert schema.get('option', 'jobname') == 'job1'
+
+
+def test_copy_on_write():
+    schema = Schema()
+    schema.set('option', 'jobname', 'job1')
+    schema.add('option', 'idir', 'dir0')
+
+    new_schema = schema.copy()
+    assert new_schema.get('option', 'jobname') == 'job1'
+
+    # Modifications to the copy
+    new_schema.set('option', 'jobname', 'job2')
+    new_schema.add('option', 'idir', 'dir1')
+    new_schema.set('tool', 'yosys', 'exe', 'yosys')
+    assert schema.get('option', 'jobname') == 'job1'
+    assert schema.get('option', 'idir') == ['dir0']
+    assert 'yosys' not in schema.getkeys('tool')
+
+    # Modifications to the original
+    schema.add('option', 'idir', 'dir2')
+    schema.unset('option', 'jobname')
+    assert new_schema.get('option', 'idir') == ['dir0', 'dir1']
+    assert new_schema.get('option', 'jobname') == 'job2'
+    assert schema.get('option', 'idir') == ['dir0', 'dir2']
+    assert schema.get('option', 'jobname') == 'job0'
+
+
+def test_copy_on_write_set_default():
+    schema = Schema()
+    new_schema = schema.copy()
+
+    new_schema.set_default('option', 'jobname', 'newjob')
+    assert new_schema.get('option', 'jobname') == 'newjob'
+    assert schema.get('option', 'jobname') == 'job0'
+
+
+def test_copy_on_write_remove():
+    schema = Schema()
+    schema.set('constraint', 'component', 'test_inst', 'placement', (0, 0, 0))
+
+    new_schema = schema.copy()
+    new_schema._remove('constraint', 'component', 'test_inst')
+
+    assert 'test_inst' not in new_schema.getkeys('constraint', 'component')
+    assert 'test_inst' in schema.getkeys('constraint', 'component')
+
+
+def test_copy_on_write_cfg():
+    schema = Schema()
+    new_schema = schema.copy()
+
+    # Direct access to cfg must not modify the other object
+    new_schema.cfg['option']['jobname']['node']['global'] = {'global': {'value': 'job1'}}
+    assert new_schema.get('option', 'jobname') == 'job1'
+    assert schema.get('option', 'jobname') == 'job0'
+
+
+def test_keypath_index_cfg_modified():
+    schema = Schema()
+    schema.cfg = Schema().getdict()
+    schema.set('option', 'jobname', 'job1')
+    assert schema.get('option', 'jobname') == 'job1'
+
+    # Replacing a subtree of the dictionary must not leave stale index entries
+    schema.cfg['option'] = Schema().getdict('option')
+    assert schema.get('option', 'jobname') == 'job0'
+
+
+def test_copy_on_write_getdict():
+    schema = Schema()
+    schema.set('option', 'jobname', 'job1')
+    new_schema = schema.copy()
+
+    cfg = new_schema.getdict('option')
+    cfg['jobname']['node']['global']['global']['value'] = 'job2'
+    assert new_schema.get('option', 'jobname') == 'job1'
+    assert schema.get('option', 'jobname') == 'job1'
+
+
+def test_import_history():
+    schema = Schema()
+    job = Schema()
+    job.set('option', 'flow', 'flow1')
+
+    new_schema = schema.copy()
+    new_schema._import_history('job1', job.getdict())
+    assert new_schema.get('option', 'flow', job='job1') == 'flow1'
+    assert 'job1' not in schema.getkeys('history')
+
+    new_schema.history('job1').set('option', 'flow', 'flow2')
+    assert new_schema.get('option', 'flow', job='job1') == 'flow2'
+    assert job.get('option', 'flow') == 'flow1'
+
+
+def test_copy_on_write_history():
+    schema = Schema()
+    schema.set('option', 'jobname', 'job1')
+    schema.set('option', 'flow', 'flow1')
+    schema.record_history()
+
+    new_schema = schema.copy()
+    new_schema.history('job1').set('option', 'flow', 'flow2')
+    new_schema.set('option', 'flow', 'flow3')
+    new_schema.record_history()
+
+    assert schema.get('option', 'flow', job='job1') == 'flow1'
+    assert new_schema.get('option', 'flow', job='job1') == 'flow3'
+
+
+def test_copy_on_write_history_view():
+    schema = Schema()
+    schema.set('option', 'entrypoint', 'a')
+    schema.record_history()
+
+    # View taken before the copy
+    history = schema.history('job0')
+    new_schema = schema.copy()
+    history.set('option', 'entrypoint', 'b')
+    assert schema.get('option', 'entrypoint', job='job0') == 'b'
+    assert new_schema.history('job0').get('option', 'entrypoint') == 'a'
+
+    # The view stays attached when the schema stops sharing its cfg
+    schema.set('option', 'entrypoint', 'c')
+    schema.cfg
+    history.set('option', 'entrypoint', 'd')
+    assert schema.get('option', 'entrypoint', job='job0') == 'd'
+    assert new_schema.get('option', 'entrypoint', job='job0') == 'a'
+
+    # Copies of the view are not attached
+    history.copy().set('option', 'entrypoint', 'e')
+    assert schema.get('option', 'entrypoint', job='job0') == 'd'
+
+
+def test_default_cfg_shared():
+    schema = Schema()
+    other = Schema()
+    schema.set('option', 'jobname', 'job1')
+    schema.add('option', 'idir', 'dir0')
+
+    assert other.get('option', 'jobname') == 'job0'
+    assert other.get('option', 'idir') == []
+    assert Schema().get('option', 'jobname') == 'job0'
+
+
+def test_schema_init_benchmark():
+    import time
+    from siliconcompiler.schema.schema_cfg import schema_cfg
+
+    # Prime the shared default configuration
+    Schema()
+
+    start = time.perf_counter()
+    for _ in range(10):
+        schema_cfg()
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(100):
+        Schema()
+    init_time = time.perf_counter() - start
+
+    # Objects share the default configuration instead of building it
+    assert init_time < build_time
@@ -1,4 +1,8 @@
+import asyncio
+import threading
+
 import pytest
+from aiohttp import web
 
 
 @pytest.fixture
@@ -19,3 +23,30 @@ def gcd_remote_test(gcd_chip, scserver, scserver_credential):
         return gcd_chip
 
     return setup
+
+
+@pytest.fixture
+def threaded_server(unused_tcp_port):
+    '''
+    Runs the app of a server in a background thread, and returns its port.
+    '''
+    loop = asyncio.new_event_loop()
+    runner = None
+    thread = None
+
+    def start(app):
+        nonlocal runner, thread
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, 'localhost', unused_tcp_port).start())
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        return unused_tcp_port
+
+    yield start
+
+    if thread:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+    loop.close()
@@ -0,0 +1,98 @@
+import asyncio
+import io
+import json
+import os
+import tarfile
+import time
+
+import pytest
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+
+import siliconcompiler
+from siliconcompiler.remote.server import Server
+from siliconcompiler.tools.builtin import nop
+
+
+def _job_cfg():
+    # Stand-in flow which runs without any EDA tools
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'nodisplay', True)
+    chip.set('option', 'quiet', True)
+    chip.node(flow, 'import', nop)
+    chip.node(flow, 'syn', nop)
+    chip.edge(flow, 'import', 'syn')
+    return chip.schema.cfg
+
+
+def _import_archive():
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz'):
+        pass
+    return archive.getvalue()
+
+
+async def _remote_run(client, username):
+    data = FormData()
+    data.add_field('params', json.dumps({
+        'chip_cfg': _job_cfg(),
+        'params': {'username': username, 'key': 'key'}
+    }))
+    data.add_field('import', _import_archive(), filename='import.tar.gz')
+    resp = await client.post('/remote_run/', data=data)
+    assert resp.status == 200
+    return (await resp.json())['job_hash']
+
+
+async def _check_progress(client, username, job_hash):
+    start = time.time()
+    resp = await client.post('/check_progress/', data=json.dumps({
+        'username': username,
+        'key': 'key',
+        'job_hash': job_hash,
+        'job_id': 'job0'
+    }))
+    assert resp.status == 200
+    return (await resp.json())['status'], time.time() - start
+
+
+@pytest.mark.asyncio
+@pytest.mark.timeout(300)
+async def test_server_job_queue():
+    server = Server()
+    os.makedirs('nfs')
+    server.set('option', 'nfsmount', 'nfs')
+    server.set('option', 'maxjobs', 2)
+    server.set('option', 'maxuserjobs', 1)
+
+    async with TestClient(TestServer(server._create_app())) as client:
+        jobs = []
+        for username in ('user0', 'user0', 'user1', 'user2'):
+            jobs.append((username, await _remote_run(client, username)))
+
+        # user0 is limited to one job, so user1 takes the second slot
+        statuses = [(await _check_progress(client, *job))[0] for job in jobs]
+        assert statuses == ['running', 'queued', 'running', 'queued']
+
+        max_running = 0
+        pending = list(jobs)
+        while pending:
+            running = [job for job in server.sc_jobs.values() if job['status'] == 'running']
+            max_running = max(max_running, len(running))
+            assert len(set([job['username'] for job in running])) == len(running)
+
+            # Status requests are answered while jobs run
+            status, latency = await _check_progress(client, *pending[0])
+            assert latency < 1.0
+            if status == 'completed':
+                pending.pop(0)
+            else:
+                await asyncio.sleep(0.2)
+
+        assert max_running == 2
+
+    for _, job_hash in jobs:
+        assert os.path.isfile(os.path.join('nfs', job_hash, f'{job_hash}_syn0.tar.gz'))
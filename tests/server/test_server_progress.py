@@ -0,0 +1,111 @@
+import os
+import time
+
+import pytest
+from aiohttp import web
+
+import siliconcompiler
+from siliconcompiler import NodeStatus
+from siliconcompiler.remote import client
+from siliconcompiler.remote import server as sc_server
+from siliconcompiler.remote.server import Server
+from siliconcompiler.tools.builtin import nop
+
+
+@pytest.mark.timeout(300)
+def test_remote_progress_push(scserver_credential, threaded_server, monkeypatch):
+    server = Server()
+    os.makedirs('nfs')
+    server.set('option', 'nfsmount', 'nfs')
+
+    requests = []
+
+    @web.middleware
+    async def record_requests(request, handler):
+        requests.append(request.path)
+        return await handler(request)
+
+    app = server._create_app()
+    app.middlewares.append(record_requests)
+    port = threaded_server(app)
+
+    # Stand-in flow which runs without any EDA tools
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.set('option', 'mode', 'asic')
+    chip.set('option', 'nodisplay', True)
+    chip.node(flow, 'import', nop)
+    chip.node(flow, 'syn', nop)
+    chip.node(flow, 'place', nop)
+    chip.edge(flow, 'import', 'syn')
+    chip.edge(flow, 'syn', 'place')
+    scserver_credential(port, chip=chip)
+
+    sleeps = []
+    sleep = time.sleep
+
+    def record_sleep(seconds):
+        sleeps.append(seconds)
+        sleep(seconds)
+
+    monkeypatch.setattr(time, 'sleep', record_sleep)
+
+    manifests = []
+    write_result_manifest = sc_server._write_result_manifest
+
+    def record_manifest(chip, nfs_mount, job_hash, step, index):
+        manifests.append((step, index))
+        return write_result_manifest(chip, nfs_mount, job_hash, step, index)
+
+    monkeypatch.setattr(sc_server, '_write_result_manifest', record_manifest)
+
+    chip.run()
+
+    # Completion is pushed instead of waiting for the 30 second polling interval
+    assert all(seconds < 30 for seconds in sleeps)
+    assert requests.count('/check_progress/') < 10
+    assert chip.get('flowgraph', flow, 'place', '0', 'status') == NodeStatus.SUCCESS
+    assert os.path.isfile(os.path.join(chip._getworkdir(step='place', index='0'),
+                                       'outputs', 'test.pkg.json'))
+
+    job_hash = chip.get('record', 'remoteid')
+    assert os.path.isfile(os.path.join('nfs', job_hash, f'{job_hash}_place0.files.json'))
+
+    # Result manifests of running jobs are written once, not on every request
+    assert manifests
+    assert len(manifests) == len(set(manifests))
+
+
+def test_remote_progress_polling_fallback(scserver_credential, threaded_server, monkeypatch):
+    # Server which does not support pushing status changes
+    bodies = []
+
+    async def check_progress(request):
+        body = await request.json()
+        bodies.append(body)
+        if 'status_version' in body:
+            return web.json_response({'message': 'Invalid parameters'}, status=400)
+        if len(bodies) < 4:
+            return web.json_response({'status': 'running', 'message': 'Running'})
+        return web.json_response({'status': 'completed', 'message': 'Job has no running steps.'})
+
+    app = web.Application()
+    app.add_routes([web.post('/check_progress/', check_progress)])
+    port = threaded_server(app)
+
+    chip = siliconcompiler.Chip('test')
+    flow = 'test'
+    chip.set('option', 'flow', flow)
+    chip.node(flow, 'import', nop)
+    chip.node(flow, 'syn', nop)
+    chip.edge(flow, 'import', 'syn')
+    chip.set('record', 'remoteid', '0123456789abcdef0123456789abcdef')
+    scserver_credential(port, chip=chip)
+
+    monkeypatch.setattr(client, 'fetch_results', lambda chip, node: None)
+    client.remote_run_loop(chip, 0.1)
+
+    assert len(bodies) == 4
+    assert 'status_version' in bodies[0]
+    assert all('status_version' not in body for body in bodies[1:])
@@ -0,0 +1,136 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from aiohttp import web
+
+import siliconcompiler
+from siliconcompiler.remote import client, transfer
+from siliconcompiler.remote.server import Server
+
+
+@pytest.fixture
+def result_server(request, scserver_credential, threaded_server):
+    '''
+    Runs a server in a thread, with the results of a completed job.
+    '''
+    server = Server()
+    os.makedirs('nfs')
+    nfs_mount = getattr(request, 'param', 'nfs')
+    if nfs_mount == 'nfs_link':
+        os.symlink('nfs', nfs_mount)
+    server.set('option', 'nfsmount', nfs_mount)
+
+    job_hash = '0123456789abcdef0123456789abcdef'
+    workdir = os.path.join('nfs', job_hash, 'test', 'job0', 'syn', '0')
+    os.makedirs(os.path.join(workdir, 'outputs'))
+    os.makedirs(os.path.join(workdir, 'reports'))
+    with open(os.path.join(workdir, 'outputs', 'test.v'), 'w') as f:
+        f.write('module test();\nendmodule\n' * 1000)
+    with open(os.path.join(workdir, 'reports', 'metrics.json'), 'w') as f:
+        f.write('{}')
+    with open(os.path.join(workdir, 'syn.log'), 'w') as f:
+        f.write('log')
+    transfer.write_file_manifest(
+        os.path.join('nfs', job_hash, f'{job_hash}_syn0.files.json'),
+        os.path.join('nfs', job_hash),
+        [os.path.join(workdir, 'reports'),
+         os.path.join(workdir, 'outputs'),
+         os.path.join(workdir, 'syn.log')])
+
+    ranges = []
+
+    @web.middleware
+    async def record_ranges(request, handler):
+        ranges.append(request.headers.get('Range'))
+        return await handler(request)
+
+    app = server._create_app()
+    app.middlewares.append(record_ranges)
+
+    port = threaded_server(app)
+
+    chip = siliconcompiler.Chip('test')
+    scserver_credential(port, chip=chip)
+    chip.set('record', 'remoteid', job_hash)
+
+    return chip, workdir, ranges
+
+
+@pytest.mark.parametrize('result_server', ['nfs', 'nfs/', 'nfs_link'], indirect=True)
+def test_fetch_result_files(result_server):
+    chip, server_workdir, ranges = result_server
+    local_workdir = chip._getworkdir(step='syn', index='0')
+
+    client.fetch_results(chip, 'syn0')
+
+    for path in ('outputs/test.v', 'reports/metrics.json', 'syn.log'):
+        with open(os.path.join(server_workdir, path)) as expect, \
+                open(os.path.join(local_workdir, path)) as result:
+            assert result.read() == expect.read()
+
+    # Files which are already present are not transferred again
+    del ranges[:]
+    os.remove(os.path.join(local_workdir, 'syn.log'))
+    client.fetch_results(chip, 'syn0')
+    assert len(ranges) == 2
+    assert os.path.isfile(os.path.join(local_workdir, 'syn.log'))
+
+
+def test_fetch_result_files_resume(result_server):
+    chip, server_workdir, ranges = result_server
+    local_workdir = chip._getworkdir(step='syn', index='0')
+
+    with open(os.path.join(server_workdir, 'outputs', 'test.v'), 'rb') as f:
+        data = f.read()
+
+    # Interrupted transfer
+    os.makedirs(os.path.join(local_workdir, 'outputs'))
+    partial = os.path.join(local_workdir, 'outputs', 'test.v') + transfer.PARTIAL_SUFFIX
+    with open(partial, 'wb') as f:
+        f.write(data[:100])
+
+    client.fetch_results(chip, 'syn0')
+
+    assert 'bytes=100-' in ranges
+    assert not os.path.exists(partial)
+    with open(os.path.join(local_workdir, 'outputs', 'test.v'), 'rb') as f:
+        assert f.read() == data
+
+
+def test_fetch_result_file_range_error(scserver_credential, threaded_server):
+    # Server rejecting the range of a fresh download
+    async def get_file(request):
+        return web.Response(status=416)
+
+    app = web.Application()
+    app.add_routes([web.post('/get_results/{job_hash}/{node}/files/{file_hash}', get_file)])
+    port = threaded_server(app)
+
+    chip = siliconcompiler.Chip('test')
+    scserver_credential(port, chip=chip)
+    chip.set('record', 'remoteid', '0123456789abcdef0123456789abcdef')
+
+    entry = {'path': 'syn/0/syn.log', 'hash': '0' * 64, 'size': 3}
+    path = os.path.join(chip._getworkdir(step='syn', index='0'), 'syn.log')
+    assert client.fetch_result_file_request(chip, 'syn0', entry, path) == 416
+    assert not os.path.exists(path + transfer.PARTIAL_SUFFIX)
+
+
+def test_write_file_manifest_concurrent():
+    os.makedirs('results')
+    for n in range(10):
+        with open(os.path.join('results', f'{n}.txt'), 'w') as f:
+            f.write(str(n) * 1000)
+
+    # Several processes may write the manifest of a node at once
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        writes = [executor.submit(transfer.write_file_manifest,
+                                  'files.json', '.', ['results']) for _ in range(32)]
+        for write in writes:
+            write.result()
+
+    with open('files.json') as f:
+        assert len(json.load(f)) == 10
+    assert sorted(os.listdir()) == ['files.json', 'results']
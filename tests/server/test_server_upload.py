@@ -0,0 +1,132 @@
+import os
+
+import pytest
+import requests
+from aiohttp import web
+
+import siliconcompiler
+from siliconcompiler.remote import client, server as sc_server
+from siliconcompiler.remote.server import Server
+
+
+@pytest.fixture
+def upload_server(scserver_credential, threaded_server):
+    '''
+    Runs a server in a thread, and records the files uploaded to it.
+    '''
+    server = Server()
+    os.makedirs('nfs')
+    server.set('option', 'nfsmount', 'nfs')
+
+    uploads = []
+
+    @web.middleware
+    async def record_uploads(request, handler):
+        if request.path.startswith('/upload_file/'):
+            uploads.append(request.match_info['file_hash'])
+        return await handler(request)
+
+    app = server._create_app()
+    app.middlewares.append(record_uploads)
+    port = threaded_server(app)
+
+    def make_chip(jobname):
+        chip = siliconcompiler.Chip('test')
+        chip.set('option', 'jobname', jobname)
+        scserver_credential(port, chip=chip)
+        return chip
+
+    return server, port, make_chip, uploads
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def test_upload_files_deduplicated(upload_server):
+    server, _, make_chip, uploads = upload_server
+
+    chip = make_chip('job0')
+    workdir = chip._getworkdir()
+    _write(os.path.join(workdir, 'import', '0', 'outputs', 'test.v'), 'module test();\n')
+    _write(os.path.join(workdir, 'sc_collected_files', 'ip.v'), 'module ip();\n' * 1000)
+    _write(os.path.join(workdir, 'sc_collected_files', 'copy.v'), 'module ip();\n' * 1000)
+
+    manifest = client.upload_files(chip)
+    assert len(manifest) == 3
+    # Identical files are only uploaded once
+    assert len(uploads) == 2
+
+    # Files the server already has are not uploaded again by later jobs
+    del uploads[:]
+    chip = make_chip('job1')
+    workdir = chip._getworkdir()
+    _write(os.path.join(workdir, 'import', '0', 'outputs', 'test.v'), 'module test2();\n')
+    _write(os.path.join(workdir, 'sc_collected_files', 'ip.v'), 'module ip();\n' * 1000)
+
+    manifest = client.upload_files(chip)
+    assert len(uploads) == 1
+
+    job_dir = os.path.join('nfs', 'job')
+    sc_server._link_uploaded_files(server._get_file_store(None), manifest, job_dir)
+    with open(os.path.join(job_dir, 'import', '0', 'outputs', 'test.v')) as f:
+        assert f.read() == 'module test2();\n'
+    with open(os.path.join(job_dir, 'sc_collected_files', 'ip.v')) as f:
+        assert f.read() == 'module ip();\n' * 1000
+
+
+def test_upload_files_per_user(upload_server, scserver_credential):
+    server, port, make_chip, uploads = upload_server
+    server.set('option', 'auth', True)
+    server.user_keys = {
+        'alice': {'password': 'alice_key'},
+        'bob': {'password': 'bob_key'}
+    }
+
+    chip = make_chip('job0')
+    chip.set('option', 'credentials', scserver_credential(port, username='alice',
+                                                          password='alice_key'))
+    _write(os.path.join(chip._getworkdir(), 'import', '0', 'outputs', 'test.v'),
+           'module secret();\n')
+    manifest = client.upload_files(chip)
+    assert len(uploads) == 1
+
+    # Other users cannot use the files of alice
+    resp = requests.post(f'http://localhost:{port}/check_files/',
+                         json={'username': 'bob', 'key': 'bob_key',
+                               'hashes': [manifest[0]['hash']]})
+    assert resp.json() == {'missing': [manifest[0]['hash']]}
+    with pytest.raises(FileNotFoundError):
+        sc_server._link_uploaded_files(server._get_file_store('bob'), manifest,
+                                       os.path.join('nfs', 'job'))
+
+    sc_server._link_uploaded_files(server._get_file_store('alice'), manifest,
+                                   os.path.join('nfs', 'job'))
+
+
+def test_upload_file_hash_mismatch(upload_server):
+    _, port, _, _ = upload_server
+
+    file_hash = '0' * 64
+    resp = requests.post(f'http://localhost:{port}/upload_file/{file_hash}',
+                         files={'params': '{}', 'file': b'module test();\n'})
+    assert resp.status_code == 400
+
+    resp = requests.post(f'http://localhost:{port}/check_files/',
+                         json={'hashes': [file_hash]})
+    assert resp.json() == {'missing': [file_hash]}
+
+
+def test_upload_files_unsupported(scserver_credential, threaded_server):
+    # Server without a file store
+    app = web.Application()
+    port = threaded_server(app)
+
+    chip = siliconcompiler.Chip('test')
+    scserver_credential(port, chip=chip)
+    _write(os.path.join(chip._getworkdir(), 'import', '0', 'outputs', 'test.v'),
+           'module test();\n')
+
+    assert client.upload_files(chip) is None